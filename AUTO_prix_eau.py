@@ -1,70 +1,47 @@
+import asyncio
 import pandas as pd
 from datetime import datetime
-import requests
 from bs4 import BeautifulSoup
-import os
+from ecoyield.collecte import collect
+from ecoyield.stockage import exists, read_frame, write_table
 
 #________________________________
 #  CONFIGURATION 
 #________________________________
-# Utiliser le nom de ton fichier actuel
-FICHIER_EAU = 'Prix_eau.csv'
 
-def get_latest_water_price(year):
+BASE_URL = "https://www.eaufrance.fr"
+PREMIERE_ANNEE = 2009
+
+
+def lire_prix_eau(response):
+    if response.status_code != 200:
+        return None
+    soup = BeautifulSoup(response.text, 'html.parser')
+    # Recherche de la balise contenant le prix
+    price_tag = soup.find('div', class_='figure')
+    if price_tag:
+        # On extrait "4,34" de "4,34 €/m3"
+        price_text = price_tag.text.split('€')[0].replace(',', '.').strip()
+        return float(price_text)
+    return None
+
+
+async def get_latest_water_price(collector, year, base_url=BASE_URL):
     """
     Scrape le prix moyen du m3 d'eau pour une année donnée
     """
-    url = f"https://www.eaufrance.fr/chiffres-cles/prix-moyen-global-de-leau-au-1er-janvier-{year}"
+    url = f"{base_url}/chiffres-cles/prix-moyen-global-de-leau-au-1er-janvier-{year}"
     try:
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            # Recherche de la balise contenant le prix
-            price_tag = soup.find('div', class_='figure')
-            if price_tag:
-                # On extrait "4,34" de "4,34 €/m3"
-                price_text = price_tag.text.split('€')[0].replace(',', '.').strip()
-                return float(price_text)
+        return await collector.parse(url, lire_prix_eau)
     except Exception as e:
         print(f"Erreur lors du scraping de {year} : {e}")
     return None
 
-#________________________________
-
-# CHARGEMENT ET NETTOYAGE INITIAL
-#________________________________
 
-
-if os.path.exists(FICHIER_EAU):
-    # On lit le fichier existant
-    df = pd.read_csv(FICHIER_EAU)
-    
-    # Sécurité : On s'assure que 'Annee' ne contient que le chiffre de l'année (ex: 2026)
-    # On corrige  le format "2009-01-01" en "2009"
-    df['Annee'] = pd.to_datetime(df['Annee']).dt.year
-else:
-    # Si le fichier n'existe pas, on crée une base vide
-    df = pd.DataFrame(columns=['Annee', 'Prix_m3'])
-
-#________________________________
-
-# MISE À JOUR (SCRAPING)
-#________________________________
-
-current_year = datetime.now().year
-
-# On vérifie si l'année en cours est déjà présente
-if current_year not in df['Annee'].values:
-    new_price = get_latest_water_price(current_year)
-    
-    if new_price:
-        new_row = pd.DataFrame({'Annee': [current_year], 'Prix_m3': [new_price]})
-        df = pd.concat([df, new_row], ignore_index=True)
-        print(f"Prix {current_year} ajouté : {new_price} €/m3")
-    else:
-        print(f"Le prix pour {current_year} n'est pas encore publié sur le site.")
-else:
-    print(f"L'année {current_year} est déjà à jour dans le fichier.")
+async def get_water_prices(collector, years, base_url=BASE_URL):
+    # Toutes les années manquantes sont demandées en parallèle
+    prices = await asyncio.gather(*(get_latest_water_price(collector, year, base_url) for year in years))
+    return dict(zip(years, prices))
 
 #________________________________
 
@@ -91,14 +68,55 @@ def finalize_cleaning(df_input):
     
     return df_c
 
-df_final = finalize_cleaning(df)
 
-#________________________________
+def mettre_a_jour_prix_eau():
+    #________________________________
 
-# SAUVEGARDE
-#________________________________
+    # CHARGEMENT ET NETTOYAGE INITIAL
+    #________________________________
+
+    if exists("Prix_eau"):
+        # On lit la table typée existante ('Annee' est déjà un entier)
+        df = read_frame("Prix_eau")
+    else:
+        # Si le fichier n'existe pas, on crée une base vide
+        df = pd.DataFrame(columns=['Annee', 'Prix_m3'])
+
+    #________________________________
+
+    # MISE À JOUR (SCRAPING)
+    #________________________________
+
+    current_year = datetime.now().year
+
+    # On complète toutes les années absentes jusqu'à l'année en cours
+    derniere_annee = int(df['Annee'].max()) if len(df) else PREMIERE_ANNEE - 1
+    annees_manquantes = [a for a in range(derniere_annee + 1, current_year + 1) if a not in df['Annee'].values]
+
+    if annees_manquantes:
+        nouveaux_prix = {a: p for a, p in collect(get_water_prices, annees_manquantes).items() if p}
+
+        if nouveaux_prix:
+            new_rows = pd.DataFrame({'Annee': list(nouveaux_prix), 'Prix_m3': list(nouveaux_prix.values())})
+            df = pd.concat([df, new_rows], ignore_index=True)
+            for annee, prix in nouveaux_prix.items():
+                print(f"Prix {annee} ajouté : {prix} €/m3")
+        if current_year not in nouveaux_prix:
+            print(f"Le prix pour {current_year} n'est pas encore publié sur le site.")
+    else:
+        print(f"L'année {current_year} est déjà à jour dans le fichier.")
+
+    #________________________________
+
+    # SAUVEGARDE
+    #________________________________
+
+    df_final = finalize_cleaning(df)
+    write_table(df_final, "Prix_eau")
+
+    print("Fichier eau mis à jour")
+    print(df_final.tail())
 
-df_final.to_csv(FICHIER_EAU, index=False, sep=';')
 
-print("Fichier eau mis à jour")
-print(df_final.tail())
\ No newline at end of file
+if __name__ == "__main__":
+    mettre_a_jour_prix_eau()
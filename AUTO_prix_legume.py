@@ -1,142 +1,334 @@
-import pandas as pd
-import time
+import asyncio
+import hashlib
+import json
 import os
-import numpy as np
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import queue
+import threading
+import pandas as pd
+from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urljoin
+from ecoyield.collecte import collect
+from ecoyield.canonique import decomposer_produits, supprimer_accents
+from ecoyield.unites import convertir_en_kg
+from ecoyield.stockage import DATA_DIR, arrow_path, csv_path, exists, partition_years, read_frame, remove_partition, write_partitions
 
 #___________________________________
 # CONFIGURATION 
 #___________________________________
 
 LEGUMES_RECHERCHE = ["CAROTTE", "TOMATE", "COURGETTE", "CONCOMBRE", "POIREAU", "POMME DE TERRE", "LAITUE", "COURGE", "HARICOTS VERTS"]
-FICHIER_MASTER = "Prix_legumes_historique_clean.csv"
+URL_RECENT = "https://rnm.franceagrimer.fr/prix?M3027:12MOIS"
+HISTORIQUE = "Prix_legumes_historique_clean"   # partitionné par année
+MOYENNE = "Prix_legume_moyen"                  # partitionné par année
+CLE = ['Date', 'Legume']
+# Attente maximale (s) d'un navigateur libre dans le pool Selenium
+ATTENTE_NAVIGATEUR = 120
+# Empreinte de chaque année de l'historique au dernier calcul de ses moyennes
+EMPREINTES_MOYENNES = os.path.join(DATA_DIR, "moyennes_empreintes.json")
 
 def nettoyer_data(df):
     """Appliquer le même nettoyage avec dissociation des courges"""
-    # 1. Split initial pour le nom et l'unité
-    df_split = df['Produit'].str.split("(", expand=True)
-    df['Legume'] = df_split[0].str.strip()
-    df['Unite'] = df_split[1].str.replace(")", "", regex=False).str.strip()
-
-    #___________________________________
-    # LOGIQUE POUR LA CATÉGORIE 
-    #___________________________________
-    # On définit les conditions
-    conditions = [
-        df['Produit'].str.contains('BUTTERNUT', case=False, na=False),
-        df['Produit'].str.contains('POTIMARRON', case=False, na=False),
-        df['Produit'].str.contains('POMME', case=False, na=False)
-    ]
-    
-    # On définit les noms de catégories correspondants
-    choix = ['Butternut', 'Potimarron', 'Pomme de terre']
-    
-    # Par défaut, on prend le premier mot 
-    par_defaut = df['Produit'].str.split(" ").str[0].str.capitalize()
-
-    # On applique la logique
-    df['Categorie'] = np.select(conditions, choix, default=par_defaut)
-    # ------------------------------------------
-
-    # 2. Nettoyage textes
-    df['Unite'] = df['Unite'].str.replace(r'^(la |le |l\'|les )', '', regex=True, case=False)
-    df['Legume'] = df['Legume'].str.replace(r' France biologique|France|biologique', '', regex=True, case=False)
-
-    # 3. Suppression Bottes
-    df = df[df['Unite'] != "botte"].copy()
-
-    # 4. Normalisation 
-    def normaliser(df, cat, poids):
-        mask = (df['Unite'] == "pièce") & (df['Categorie'] == cat)
-        df.loc[mask, 'Prix'] = df.loc[mask, 'Prix'] * 1000 / poids
-        df.loc[mask, 'Unite'] = "kg"
-        return df
-
-    df = normaliser(df, "Concombre", 400)
-    df = normaliser(df, "Laitue", 450)
-
-    # 5. Finition
+    # 1. Catégorie, nom et unité : chaque libellé distinct n'est analysé qu'une fois
+    df = df.join(decomposer_produits(df['Produit']))
+
+    # 2. Conversion au kg (pièce, botte, barquette...) : table partagée avec l'historique
+    df = convertir_en_kg(df)
+
+    # 3. Finition
     df['Prix'] = df['Prix'].round(2)
-    df['Categorie'] = df['Categorie'].str.strip()
-    df["Legume"] = df['Legume'].str.strip().str.capitalize()
 
     return df[['Date', 'Categorie', 'Legume', 'Prix', 'Unite']]
 
 
 
+#___________________________________
+#  COLLECTE HTTP (SANS NAVIGATEUR)
+#___________________________________
+
+def lire_liens(response, base_url=URL_RECENT):
+    """Liens de la page d'accueil RNM dont le texte contient un légume recherché : [(nom, url)]."""
+    soup = BeautifulSoup(response.text, 'html.parser')
+    liens = []
+    for lien in soup.find_all('a', href=True):
+        nom = lien.get_text(strip=True)
+        if any(leg in supprimer_accents(nom) for leg in LEGUMES_RECHERCHE):
+            liens.append((nom, urljoin(base_url, lien['href'])))
+    return list(dict.fromkeys(liens))
+
+
+def lire_cellules(lignes, nom):
+    """Convertit les lignes [date, ..., prix] du tableau de cotations (en-tête exclu)."""
+    prix = []
+    for cols in lignes[1:]:
+        if len(cols) >= 3:
+            try:
+                prix.append({
+                    "Date": pd.to_datetime(cols[0].strip(), format='%d/%m/%y'),
+                    "Produit": nom,
+                    "Prix": float(cols[2].strip().replace(',', '.'))
+                })
+            except ValueError:
+                continue
+    return prix
+
+
+def lire_tabcot(response, nom):
+    soup = BeautifulSoup(response.text, 'html.parser')
+    lignes = [[td.get_text() for td in tr.find_all('td')] for tr in soup.select("table.tabcot tr")]
+    return lire_cellules(lignes, nom)
+
+
+async def scan_recent_http(collector, url=URL_RECENT):
+    """Page d'accueil puis pages produit en parallèle, analysées sans exécuter de JavaScript."""
+    accueil = await collector.get(url)
+    accueil.raise_for_status()
+    liens = lire_liens(accueil, url)
+    pages = await asyncio.gather(*(collector.parse(lien, lire_tabcot, nom) for nom, lien in liens))
+    return liens, [ligne for page in pages for ligne in page]
+
+#___________________________________
+#  REPLI SELENIUM (POOL DE NAVIGATEURS)
+#___________________________________
+
+class DriverPool:
+    """
+    Petit pool de Chrome headless réutilisables, créés à la demande.
+    Selenium n'est importé qu'ici : il n'est pas nécessaire au fonctionnement normal.
+    """
+
+    def __init__(self, size=2, attente=ATTENTE_NAVIGATEUR):
+        self.size = size
+        self.attente = attente
+        self.created = 0
+        self.libres = queue.Queue()
+        self.lock = threading.Lock()
+
+    def _creer(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+    @contextmanager
+    def driver(self):
+        with self.lock:
+            creer = self.libres.empty() and self.created < self.size
+            if creer:
+                self.created += 1
+        if creer:
+            try:
+                driver = self._creer()
+            except Exception:
+                # Chrome ou selenium absent : la place est rendue, sinon les tâches suivantes attendraient sans fin
+                with self.lock:
+                    self.created -= 1
+                raise
+        else:
+            try:
+                driver = self.libres.get(timeout=self.attente)
+            except queue.Empty:
+                raise RuntimeError(f"aucun navigateur libéré en {self.attente} s") from None
+        try:
+            yield driver
+        finally:
+            self.libres.put(driver)
+
+    def close(self):
+        while not self.libres.empty():
+            self.libres.get().quit()
+
+
+def lire_page_selenium(pool, url, nom=None, attente=10):
+    """Charge `url` dans un navigateur du pool ; renvoie les liens (nom=None) ou les cotations."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    with pool.driver() as driver:
+        driver.get(url)
+        if nom is None:
+            WebDriverWait(driver, attente).until(EC.presence_of_element_located((By.TAG_NAME, "a")))
+            liens = driver.find_elements(By.TAG_NAME, "a")
+            return [(l.text.strip(), l.get_attribute("href")) for l in liens
+                    if l.get_attribute("href") and any(leg in supprimer_accents(l.text) for leg in LEGUMES_RECHERCHE)]
+        WebDriverWait(driver, attente).until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.tabcot")))
+        lignes = driver.find_elements(By.CSS_SELECTOR, "table.tabcot tr")
+        return lire_cellules([[td.text for td in l.find_elements(By.TAG_NAME, "td")] for l in lignes], nom)
+
+
+def scan_recent_selenium(liens=None, url=URL_RECENT, taille_pool=2):
+    """Repli : pages produit ouvertes directement (sans clic ni retour) par un pool de navigateurs."""
+    pool = DriverPool(taille_pool)
+    try:
+        if not liens:
+            liens = list(dict.fromkeys(lire_page_selenium(pool, url)))
+        with ThreadPoolExecutor(max_workers=taille_pool) as executor:
+            pages = executor.map(lambda lien: lire_page_selenium(pool, lien[1], lien[0]), liens)
+            return [ligne for page in pages for ligne in page]
+    finally:
+        pool.close()
+
+
 def scan_recent():
     print("Lancement du scraping (12 derniers mois)")
-    url = "https://rnm.franceagrimer.fr/prix?M3027:12MOIS"
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    driver.get(url)
-    time.sleep(5)
-    
-    nouveaux_prix = []
-    liens = driver.find_elements(By.TAG_NAME, "a")
-    
-    # On filtre les liens selon la liste LEGUMES_RECHERCHE
-    noms_valides = [l.text.strip() for l in liens if any(leg in l.text.upper() for leg in LEGUMES_RECHERCHE)]
-    
-    for nom in noms_valides:
+    liens = []
+    try:
+        liens, nouveaux_prix = collect(scan_recent_http)
+    except Exception as e:
+        print(f"Collecte HTTP impossible : {e}")
+        nouveaux_prix = []
+
+    # Si les cotations ne sont pas dans le HTML (rendu JavaScript), on passe par le navigateur
+    if not nouveaux_prix:
+        print("Aucune cotation lue en HTTP : repli sur Selenium")
         try:
-            driver.find_element(By.LINK_TEXT, nom).click()
-            time.sleep(2)
-            lignes = driver.find_elements(By.CSS_SELECTOR, "table.tabcot tr")
-            for ligne in lignes[1:]:
-                cols = ligne.find_elements(By.TAG_NAME, "td")
-                if len(cols) >= 3:
-                    nouveaux_prix.append({
-                        "Date": pd.to_datetime(cols[0].text.strip(), format='%d/%m/%y'),
-                        "Produit": nom,
-                        "Prix": float(cols[2].text.strip().replace(',', '.'))
-                    })
-            driver.back()
-        except: continue
-    
-    driver.quit()
+            nouveaux_prix = scan_recent_selenium(liens)
+        except Exception as e:
+            # Conteneur sans Chrome : la collecte s'arrête proprement, l'historique reste tel quel
+            print(f"Repli Selenium impossible : {e}")
+            nouveaux_prix = []
+
     return pd.DataFrame(nouveaux_prix)
 
+#___________________________________
+#  INGESTION INCRÉMENTALE
+#___________________________________
+
+def lignes_modifiees(df_hist, df_nouveau):
+    """
+    Observations de `df_nouveau` absentes de l'historique ou différentes
+    (prix, catégorie, unité), par jointure sur l'index (Date, Legume).
+    """
+    def indexer(df):
+        df = df.astype({'Legume': str, 'Categorie': str, 'Unite': str, 'Prix': float})
+        df['Date'] = pd.to_datetime(df['Date']).astype('datetime64[ns]')
+        return df.drop_duplicates(subset=CLE, keep='last').set_index(CLE)
+
+    nouveau = indexer(df_nouveau)
+    ancien = indexer(df_hist).reindex(nouveau.index)
+    inchange = (
+        (ancien['Prix'] == nouveau['Prix'])
+        & (ancien['Categorie'] == nouveau['Categorie'])
+        & (ancien['Unite'] == nouveau['Unite'])
+    )
+    return nouveau[~inchange].reset_index()[df_nouveau.columns]
+
+
+def moyennes(df):
+    """Prix moyen par date et par catégorie."""
+    # Catégories en texte : ordre alphabétique dans chaque date, quel que soit le dictionnaire Arrow
+    df = df.assign(Categorie=df['Categorie'].astype(str)).sort_values(by='Date')
+    return df.groupby(['Date', 'Categorie'], observed=True)['Prix'].mean().round(2).reset_index()
+
+
+def mettre_a_jour_moyennes(df_hist, dates):
+    """
+    Recalcule les moyennes des seules `dates` modifiées et les remplace dans les
+    partitions annuelles concernées. `df_hist` doit contenir toutes les lignes de ces dates.
+    """
+    df_moyenne = read_frame(MOYENNE, years={d.year for d in dates})
+    df_moyenne = df_moyenne[~df_moyenne['Date'].isin(dates)]
+    df_moyenne = pd.concat([df_moyenne, moyennes(df_hist[df_hist['Date'].isin(dates)])])
+    write_partitions(df_moyenne.astype({'Categorie': str}).sort_values(by=['Date', 'Categorie']), MOYENNE)
+
+
+def empreinte_historique(annee):
+    """Empreinte du contenu d'une année de l'historique (export CSV, à défaut fichier Arrow)."""
+    for path in (csv_path(HISTORIQUE, annee), arrow_path(HISTORIQUE, annee)):
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+    return None
+
+
+def lire_empreintes(path=EMPREINTES_MOYENNES):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def enregistrer_empreintes(empreintes, path=EMPREINTES_MOYENNES):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(empreintes, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
 #___________________________________
 #  EXECUTION 
 #___________________________________
-if os.path.exists(FICHIER_MASTER):
+
+def mettre_a_jour_historique():
+    if not exists(HISTORIQUE):
+        print("Erreur : Le fichier historique n'existe pas. Lance d'abord ton premier code !")
+        return
+
     # 1. Récupérer le récent
     df_nouveau_sale = scan_recent()
-    
-    if not df_nouveau_sale.empty:
-        # 2. Nettoyer le récent pour qu'il ressemble à l'historique
-        df_nouveau_propre = nettoyer_data(df_nouveau_sale)
-        
-        # 3. Charger l'historique
-        df_hist = pd.read_csv(FICHIER_MASTER, sep=";")
-        df_hist['Date'] = pd.to_datetime(df_hist['Date'])
-        
-        # 4. Fusionner et supprimer les doublons
-        df_final = pd.concat([df_hist, df_nouveau_propre])
-        df_final = df_final.drop_duplicates(subset=['Date', 'Legume'], keep='last')
-        
-        # 5. Sauvegarder
-        df_final.sort_values(by=['Categorie', 'Date']).to_csv(FICHIER_MASTER, index=False, sep=";")
-        print(f" Mise à jour réussie ! Le fichier {FICHIER_MASTER} contient maintenant {len(df_final)} lignes.")
-    else:
+    if df_nouveau_sale.empty:
         print("Aucun nouveau prix trouvé sur le site.")
-else:
-    print("Erreur : Le fichier historique n'existe pas. Lance d'abord ton premier code !")
+        return
+
+    # 2. Nettoyer le récent pour qu'il ressemble à l'historique
+    df_nouveau = nettoyer_data(df_nouveau_sale)
+
+    # 3. Charger uniquement les années touchées et garder les observations nouvelles ou corrigées
+    df_hist = read_frame(HISTORIQUE, years=set(df_nouveau['Date'].dt.year))
+    df_modif = lignes_modifiees(df_hist, df_nouveau)
+    if df_modif.empty:
+        print("Historique déjà à jour : aucun prix nouveau ou modifié.")
+        return
+
+    # 4. Réécrire seulement les partitions annuelles modifiées
+    annees = set(df_modif['Date'].dt.year)
+    avant = {annee: empreinte_historique(annee) for annee in annees}
+    df_hist = df_hist[df_hist['Date'].dt.year.isin(annees)].astype({'Legume': str, 'Categorie': str, 'Unite': str})
+    df_hist['Date'] = df_hist['Date'].astype('datetime64[ns]')
+    df_final = pd.concat([df_hist, df_modif]).drop_duplicates(subset=CLE, keep='last')
+    write_partitions(df_final.sort_values(by=['Categorie', 'Date']), HISTORIQUE)
 
+    # 5. Mettre à jour les moyennes des seules dates modifiées
+    mettre_a_jour_moyennes(df_final, df_modif['Date'].unique())
+    # Ces années restent à jour pour calculer_moyennes si leurs moyennes l'étaient avant la collecte
+    empreintes = lire_empreintes()
+    for annee in annees:
+        if empreintes.get(str(annee)) == avant[annee]:
+            empreintes[str(annee)] = empreinte_historique(annee)
+    enregistrer_empreintes(empreintes)
+    print(f" Mise à jour réussie ! {len(df_modif)} prix ajoutés ou corrigés (années {', '.join(map(str, sorted(annees)))}).")
 
 
-    #________________________________
-    #CREATION D'UN DATA FRAME MOYENNE
-    #________________________________
+#________________________________
+#CREATION D'UN DATA FRAME MOYENNE
+#________________________________
+
+def calculer_moyennes():
+    """
+    Reconstruit les moyennes des années dont le contenu de l'historique a changé
+    depuis leur dernier calcul, ou dont la partition de moyennes manque. Sans
+    empreintes enregistrées (donnees/ neuf), toutes les années sont recalculées.
+    """
+    connues = lire_empreintes()
+    empreintes = {annee: empreinte_historique(annee) for annee in partition_years(HISTORIQUE)}
+    calculees = set(partition_years(MOYENNE))
+    annees = [a for a, empreinte in empreintes.items() if a not in calculees or connues.get(str(a)) != empreinte]
+    for annee in calculees - set(empreintes):
+        remove_partition(MOYENNE, annee)
+
+    if annees:
+        #Exporter les partitions (sauvegarder)
+        write_partitions(moyennes(read_frame(HISTORIQUE, years=annees)), MOYENNE)
+        print(f"Fichier prix legumes mis à jour (années {', '.join(map(str, annees))})")
+    else:
+        print("Moyennes déjà à jour")
+    enregistrer_empreintes({str(a): empreinte for a, empreinte in empreintes.items()})
 
-    
-df_moyenne = pd.read_csv(FICHIER_MASTER, sep=";")
-df_moyenne = df_moyenne.sort_values(by='Date')
-df_moyenne = df_moyenne.groupby(['Date', 'Categorie'])['Prix'].mean().round(2).reset_index()
 
-#Exporter le Df en csv (sauvergarder)
-df_moyenne.to_csv('Prix_legume_moyen.csv', index=False)
-print("Fichier prix legumes mis à jour")
\ No newline at end of file
+if __name__ == "__main__":
+    mettre_a_jour_historique()
+    calculer_moyennes()
@@ -1,42 +1,55 @@
-import requests
+import asyncio
 import pandas as pd
-import time
+from io import StringIO
+from ecoyield.collecte import collect
+from ecoyield.canonique import categories
+from ecoyield.stockage import write_table
 
 # __________________________________________
 # LA FONCTION DE RÉCUPÉRATION
 # __________________________________________
 
-def recuperer_tableau_impact(nom_du_legume):
+BASE_URL = "https://impactco2.fr"
 
+# Voici ta liste de légumes
+LISTE_DES_LEGUMES = [
+    "tomate", "carotte", "courgette", "concombre",
+    "poireau", "pomme-de-terre", "laitue",
+    "potiron", "courge"
+]
+
+
+def url_impact(nom_du_legume, base_url=BASE_URL):
     # Cas particulier : l'URL de la pomme de terre est différente sur le site
     if nom_du_legume == "pomme-de-terre":
-        url = "https://impactco2.fr/outils/alimentation/pommedeterre"
-    else:
-        url = f"https://impactco2.fr/outils/fruitsetlegumes/{nom_du_legume}"
-        
-    headers = {"User-Agent": "Mozilla/5.0"}
-    
+        return f"{base_url}/outils/alimentation/pommedeterre"
+    return f"{base_url}/outils/fruitsetlegumes/{nom_du_legume}"
+
+
+def lire_tableau_impact(response, nom_du_legume):
+    # pd.read_html lit tous les tableaux présents sur la page
+    tous_les_tableaux = pd.read_html(StringIO(response.text))
+
+    if not tous_les_tableaux:
+        return None
+
+    # On récupère le premier tableau de la page
+    tableau_brut = tous_les_tableaux[0]
+
+    # Nettoyage : si le tableau a 3 colonnes, on supprime celle du milieu (le visuel)
+    if tableau_brut.shape[1] >= 3:
+        tableau_brut = tableau_brut.iloc[:, [0, -1]]
+
+    tableau_brut.columns = ['Etape', 'Valeur']
+
+    # On ajoute le nom du légume dans une colonne pour s'en souvenir
+    tableau_brut.insert(0, 'Legume', nom_du_legume.capitalize())
+    return tableau_brut
+
+
+async def recuperer_tableau_impact(collector, nom_du_legume, base_url=BASE_URL):
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        # pd.read_html lit tous les tableaux présents sur la page
-        tous_les_tableaux = pd.read_html(response.text)
-        
-        if not tous_les_tableaux:
-            return None
-        
-        # On récupère le premier tableau de la page
-        tableau_brut = tous_les_tableaux[0]
-        
-        # Nettoyage : si le tableau a 3 colonnes, on supprime celle du milieu (le visuel)
-        if tableau_brut.shape[1] >= 3:
-            tableau_brut = tableau_brut.iloc[:, [0, -1]]
-        
-        tableau_brut.columns = ['Etape', 'Valeur']
-        
-        # On ajoute le nom du légume dans une colonne pour s'en souvenir
-        tableau_brut.insert(0, 'Legume', nom_du_legume.capitalize())
-        return tableau_brut
-            
+        return await collector.parse(url_impact(nom_du_legume, base_url), lire_tableau_impact, nom_du_legume)
     except Exception as e:
         print(f"Erreur sur {nom_du_legume}: {e}")
     return None
@@ -45,22 +58,18 @@ def recuperer_tableau_impact(nom_du_legume):
 # LA BOUCLE PRINCIPALE
 # __________________________________________
 
+async def recuperer_tous_les_tableaux(collector, base_url=BASE_URL):
+    # Toutes les pages sont demandées en parallèle ; la pause de 0.5 s entre
+    # légumes est remplacée par la limite de débit de l'hôte dans le collecteur
+    return await asyncio.gather(*(recuperer_tableau_impact(collector, legume, base_url) for legume in LISTE_DES_LEGUMES))
+
+
 def lancer_le_scraping():
-    # Voici ta liste de légumes
-    liste_des_legumes = [
-        "tomate", "carotte", "courgette", "concombre", 
-        "poireau", "pomme-de-terre", "laitue", 
-        "potiron", "courge"
-    ]
-    
     toutes_les_lignes_finales = []
-    
-    # Boucle qui parcourt chaque nom de la liste
-    for chaque_legume in liste_des_legumes:
-        
-        # On appelle la fonction avec le nom du legume
-        resultat_tableau = recuperer_tableau_impact(chaque_legume)
-        
+
+    # Boucle qui parcourt chaque tableau récupéré
+    for chaque_legume, resultat_tableau in zip(LISTE_DES_LEGUMES, collect(recuperer_tous_les_tableaux)):
+
         if resultat_tableau is not None:
             # On transforme le tableau vertical en une seule ligne horizontale
             try:
@@ -72,9 +81,6 @@ def lancer_le_scraping():
                 toutes_les_lignes_finales.append(ligne_horizontale)
             except:
                 print(f"Problème de format pour {chaque_legume}")
-        
-        # Pause de 0.5 seconde pour le site web
-        time.sleep(0.5)
 
     # Une fois la boucle finie, on rassemble tout
     if toutes_les_lignes_finales:
@@ -99,19 +105,11 @@ def lancer_le_scraping():
     else:
         print("Aucune donnée n'a pu être récupérée.")
 
-# Lancement du programme
-if __name__ == "__main__":
-    lancer_le_scraping()
-
 #__________________________________________
 #  CLEANING DU DF
 #__________________________________________
 
-df_co2 = pd.read_csv("impact_co2_complet.csv", sep=";")
-df_co2_clean = df_co2.copy()
-df_co2_clean = df_co2_clean.rename(columns={'Supermarché et distribution': 'Distribution'})
-
-def supprimer_unite(nom_colonne):
+def supprimer_unite(df_co2_clean, nom_colonne):
     # 1. On supprime le texte qu'on ne veut plus
     # 2. Remplace ',' avec '.' pour pouvoir le transformer un float
     df_co2_clean[nom_colonne] = (
@@ -123,36 +121,35 @@ def supprimer_unite(nom_colonne):
     df_co2_clean[nom_colonne] = df_co2_clean[nom_colonne].astype(float)
 
 
- # On applique la fonction sur toutes les colonnes sauf 'Legume'
-colonnes_impact = [c for c in df_co2_clean.columns if c != 'Legume']
-for col in colonnes_impact:
-    supprimer_unite(col)
+def nettoyer_co2():
+    df_co2 = pd.read_csv("impact_co2_complet.csv", sep=";")
+    df_co2_clean = df_co2.copy()
+    df_co2_clean = df_co2_clean.rename(columns={'Supermarché et distribution': 'Distribution'})
 
-# remplacer les vides
-moyenne_transformation = df_co2_clean['Transformation'].mean()
-moyenne_consommation = df_co2_clean['Consommation'].mean()
+    # On applique la fonction sur toutes les colonnes sauf 'Legume'
+    colonnes_impact = [c for c in df_co2_clean.columns if c != 'Legume']
+    for col in colonnes_impact:
+        supprimer_unite(df_co2_clean, col)
 
-df_co2_clean['Transformation'] = df_co2_clean['Transformation'].fillna(moyenne_transformation).round(1)
-df_co2_clean['Consommation'] = df_co2_clean['Consommation'].fillna(moyenne_consommation).round(1)
+    # remplacer les vides
+    moyenne_transformation = df_co2_clean['Transformation'].mean()
+    moyenne_consommation = df_co2_clean['Consommation'].mean()
 
+    df_co2_clean['Transformation'] = df_co2_clean['Transformation'].fillna(moyenne_transformation).round(1)
+    df_co2_clean['Consommation'] = df_co2_clean['Consommation'].fillna(moyenne_consommation).round(1)
 
-#Changer le nom des legumes 
-def modifier_legume(legume):
-  if legume == 'Potiron':
-    return 'Potimarron'
-  if legume == 'Pomme-de-terre':
-    return 'Pomme de terre'
-  elif legume == 'Courge':
-    return 'Butternut'
-  else: 
-    return legume
+    # Noms du site (Potiron, Pomme-de-terre, Courge) -> catégories communes aux autres tables
+    df_co2_clean['Legume'] = categories(df_co2_clean['Legume'])
 
+    #__________________________________________
+    # SAUVEGARDE DU DF FINAL
+    #__________________________________________
 
-df_co2_clean['Legume'] = df_co2_clean['Legume'].apply(modifier_legume)
+    write_table(df_co2_clean, "Impact_co2_Clean")
+    print(" Le fichier 'Impact_co2_Clean.csv' est prêt.")
 
-#__________________________________________
-# SAUVEGARDE DU DF FINAL
-#__________________________________________
 
-df_co2_clean.to_csv("Impact_co2_Clean.csv", index=False, sep=";", encoding='utf-8-sig')
-print(" Le fichier 'Impact_co2_Clean.csv' est prêt.")
\ No newline at end of file
+# Lancement du programme
+if __name__ == "__main__":
+    lancer_le_scraping()
+    nettoyer_co2()
@@ -1,68 +1,39 @@
 import pandas as pd
 import re
+from ecoyield.stockage import write_table
 
 
 #___________
 # SCRAPING 
 #___________
 
-url = "https://nopanic.fr/rendements-legumes/"
+URL_RENDEMENT = "https://nopanic.fr/rendements-legumes/"
+FICHIER_BRUT = "rendement_3_tableaux.csv"
+FICHIER_CLEAN = "Rendement_clean.csv"
 
-# 1. Récupérer tous les tableaux
-tableaux = pd.read_html(url)
+def scraper_rendement():
+    # 1. Récupérer tous les tableaux
+    tableaux = pd.read_html(URL_RENDEMENT)
 
-# Vérifier si on a bien au moins 3 tableaux avant de continuer
-if len(tableaux) >= 3:
-    # 2. On ne garde que les indices 0, 1 et 2 (les 3 premiers)
-    selection = tableaux[:3]
+    # Vérifier si on a bien au moins 3 tableaux avant de continuer
+    if len(tableaux) >= 3:
+        # 2. On ne garde que les indices 0, 1 et 2 (les 3 premiers)
+        selection = tableaux[:3]
     
-    # 3. Fusionner la sélection
-    df_final = pd.concat(selection, ignore_index=True)
+        # 3. Fusionner la sélection
+        df_final = pd.concat(selection, ignore_index=True)
 
-    # 4. Sauvegarder
-    df_final.to_csv("rendement_3_tableaux.csv", index=False)
-    print("Succès : Les 3 premiers tableaux ont été fusionnés.")
-else:
-    print(f"Attention : Seulement {len(tableaux)} tableau(x) trouvé(s).")
+        # 4. Sauvegarder
+        df_final.to_csv(FICHIER_BRUT, index=False)
+        print("Succès : Les 3 premiers tableaux ont été fusionnés.")
+    else:
+        print(f"Attention : Seulement {len(tableaux)} tableau(x) trouvé(s).")
 
 
 #___________
 # CLEANING 
 #___________
 
-df_rendement = pd.read_csv("rendement_3_tableaux.csv")
-
-# 1 . MERGE LES COLONNES LEGUMES
-
-# Identifier les colonnes "Légumes"
-# On cherche toutes les colonnes qui commencent par 'Légumes'
-cols_legumes = [c for c in df_rendement.columns if c.startswith('Légumes')]
-
-# Identifier les autres colonnes (celles qu'on veut garder telles quelles)
-cols_fixes = [c for c in df_rendement.columns if not c.startswith('Légumes')]
-
-# Fusionner les colonnes
-df_fusion = pd.melt(df_rendement, 
-                    id_vars=cols_fixes,       # Les colonnes qui restent fixes 
-                    value_vars=cols_legumes,  # Les colonnes à fusionner
-                    var_name='Type_ok',  # Nom de la colonne qui contiendra l'ancien nom de la colonne
-                    value_name='Legume')      # Nom de la clonne
-
-
-# Nettoyer les lignes vides
-# Comme on a fusionné 3 colonnes, on a créé beaucoup de lignes vides (NaN)
-df_fusion = df_fusion.dropna(subset=['Legume'])
-
-#Renommer les colonnes
-df_fusion.columns = ['Type_supp', 'Rendement_kg_m2', 'Densite_pied_m2', 'Levée_jours', 'Recolte_jours', 'qté_1pers', 'Type','Legumes']
-df_fusion = df_fusion.drop(columns=['Type_supp'])
-
-#__________________________________________
-
-#  NORMALISER LES VALEURS
-#__________________________________________
-
-
 #Creer une fonction pour faire une moyenne
 def extraire_moyenne_num(valeur):
     """
@@ -85,15 +56,6 @@ def extraire_moyenne_num(valeur):
     # On retourne la moyenne (si c'est '10-20', ça donne 15.0)
     return sum(nombres) / len(nombres)
 
-# Appliquer la fonction :
-
-df_fusion['Densite_pied_m2'] = df_fusion['Densite_pied_m2'].apply(extraire_moyenne_num)
-df_fusion['Levée_jours'] = df_fusion['Levée_jours'].apply(extraire_moyenne_num)
-df_fusion['Recolte_jours'] = df_fusion['Recolte_jours'].apply(extraire_moyenne_num)
-df_fusion['qté_1pers'] = df_fusion['qté_1pers'].apply(extraire_moyenne_num)
-
-
-# 3 . TRAITEMENT DE LA COLONNE RENDEMENT
 
 #creation de la fonction
 
@@ -128,26 +90,76 @@ def convertir_en_kg_m2(row):
     
     return round(moyenne_rendement, 2)
 
-#Application de la fonction
-df_fusion['Rendement_kg_m2'] = df_fusion.apply(convertir_en_kg_m2, axis=1)
 
-# 4. DIVISER LA COLONNE 2 PERSONNES
-df_fusion['qté_1pers']= df_fusion['qté_1pers']/2
+def nettoyer_rendement():
+    df_rendement = pd.read_csv(FICHIER_BRUT)
+
+    # 1 . MERGE LES COLONNES LEGUMES
+
+    # Identifier les colonnes "Légumes"
+    # On cherche toutes les colonnes qui commencent par 'Légumes'
+    cols_legumes = [c for c in df_rendement.columns if c.startswith('Légumes')]
+
+    # Identifier les autres colonnes (celles qu'on veut garder telles quelles)
+    cols_fixes = [c for c in df_rendement.columns if not c.startswith('Légumes')]
+
+    # Fusionner les colonnes
+    df_fusion = pd.melt(df_rendement, 
+                        id_vars=cols_fixes,       # Les colonnes qui restent fixes 
+                        value_vars=cols_legumes,  # Les colonnes à fusionner
+                        var_name='Type_ok',  # Nom de la colonne qui contiendra l'ancien nom de la colonne
+                        value_name='Legume')      # Nom de la clonne
+
+
+    # Nettoyer les lignes vides
+    # Comme on a fusionné 3 colonnes, on a créé beaucoup de lignes vides (NaN)
+    df_fusion = df_fusion.dropna(subset=['Legume'])
+
+    #Renommer les colonnes
+    df_fusion.columns = ['Type_supp', 'Rendement_kg_m2', 'Densite_pied_m2', 'Levée_jours', 'Recolte_jours', 'qté_1pers', 'Type','Legumes']
+    df_fusion = df_fusion.drop(columns=['Type_supp'])
+
+    #__________________________________________
+
+    #  NORMALISER LES VALEURS
+    #__________________________________________
+
+
+    # Appliquer la fonction :
+
+    df_fusion['Densite_pied_m2'] = df_fusion['Densite_pied_m2'].apply(extraire_moyenne_num)
+    df_fusion['Levée_jours'] = df_fusion['Levée_jours'].apply(extraire_moyenne_num)
+    df_fusion['Recolte_jours'] = df_fusion['Recolte_jours'].apply(extraire_moyenne_num)
+    df_fusion['qté_1pers'] = df_fusion['qté_1pers'].apply(extraire_moyenne_num)
+
+
+    # 3 . TRAITEMENT DE LA COLONNE RENDEMENT
+
+    #Application de la fonction
+    df_fusion['Rendement_kg_m2'] = df_fusion.apply(convertir_en_kg_m2, axis=1)
+
+    # 4. DIVISER LA COLONNE 2 PERSONNES
+    df_fusion['qté_1pers']= df_fusion['qté_1pers']/2
+
+    # 5. ORGANISER ET SAUVEGARDER 
+
+    df_rendement_clean = df_fusion.copy()
+    df_rendement_clean = df_rendement_clean.drop(columns=['Type'])
 
-# 5. ORGANISER ET SAUVEGARDER 
+    # On définit l'ordre que tu souhaites dans une liste
+    ordre_colonne = ['Legumes', 'Rendement_kg_m2', 'Densite_pied_m2', 'Levée_jours', 'Recolte_jours','qté_1pers']
 
-df_rendement_clean = df_fusion.copy()
-df_rendement_clean = df_rendement_clean.drop(columns=['Type'])
+    # On réassigne le dataframe avec ce nouvel ordre
+    df_rendement_clean = df_rendement_clean[ordre_colonne]
 
-# On définit l'ordre que tu souhaites dans une liste
-ordre_colonne = ['Legumes', 'Rendement_kg_m2', 'Densite_pied_m2', 'Levée_jours', 'Recolte_jours','qté_1pers']
+    #__________________________________________
+    # SAUVEGARDE 
+    #__________________________________________
 
-# On réassigne le dataframe avec ce nouvel ordre
-df_rendement_clean = df_rendement_clean[ordre_colonne]
+    write_table(df_rendement_clean, "Rendement_clean")
+    print("Le fichier Rendement_clean.csv a été créé avec succès.")
 
-#__________________________________________
-# SAUVEGARDE 
-#__________________________________________
 
-df_rendement_clean.to_csv("Rendement_clean.csv", index=False)
-print("Le fichier Rendement_clean.csv a été créé avec succès.")
\ No newline at end of file
+if __name__ == "__main__":
+    scraper_rendement()
+    nettoyer_rendement()
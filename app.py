@@ -2,6 +2,11 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import os
+from ecoyield.simulation import allocation_matrix, simulate
+from ecoyield.coefficients import load_coefficient_table, coefficients_from_table, select
+from ecoyield.epargne import LABELS, load_rate_history, simulate_savings, start_choices
+from ecoyield.graphique import add_series, live_chart, template_from_figure
+from ecoyield import stockage
 
 # =============================
 # ⚙️ CONFIG PAGE
@@ -23,37 +28,50 @@ def retour_accueil():
 # =============================
 # 📂 Charger légumes
 # =============================
-@st.cache_data
+CLES_LEGUMES = ("rendement", "prix", "co2", "eau", "graines")
+LEGUMES_DEFAUT = {
+    "Tomate": {"rendement": 9, "prix": 6, "co2": 4, "eau": 2, "graines": 2},
+    "Carotte": {"rendement": 6, "prix": 3, "co2": 2, "eau": 1, "graines": 2},
+    "Courgette": {"rendement": 15, "prix": 4, "co2": 5, "eau": 2, "graines": 2},
+}
+
+@st.cache_resource
 def charger_legumes():
-    fichier = "FACT_potager.csv"
-
-    if not os.path.exists(fichier):
-        return {
-            "Tomate": {"rendement": 9, "prix": 6, "co2": 4, "eau": 2, "graines": 2},
-            "Carotte": {"rendement": 6, "prix": 3, "co2": 2, "eau": 1, "graines": 2},
-            "Courgette": {"rendement": 15, "prix": 4, "co2": 5, "eau": 2, "graines": 2},
-        }
-
-    df = pd.read_csv(fichier)
-    df.columns = df.columns.str.strip()
-
-    donnees = {}
-    for _, ligne in df.iterrows():
-        nom = ligne["Nom_Legume"]
-        rendement = float(ligne["Rendement_kg_m2"])
-        co2_par_kg = (float(ligne["CO2_Economise_m2"]) / 1000) / rendement
-
-        donnees[nom] = {
-            "rendement": rendement,
-            "prix": float(ligne["Prix_Marche_kg"]),
-            "co2": co2_par_kg,
-            "eau": float(ligne["Cout_Eau_m2"]),
-            "graines": float(ligne["Prix_graine"]),
-        }
-
-    return donnees
+    # Table précalculée, partagée en lecture seule par toutes les sessions
+    return coefficients_from_table(load_coefficient_table(LEGUMES_DEFAUT, keys=CLES_LEGUMES))
 
 LEGUMES = charger_legumes()
+INDEX_LEGUMES = {nom: i for i, nom in enumerate(LEGUMES.names)}
+
+@st.cache_resource
+def charger_taux():
+    return load_rate_history() if stockage.exists("Taux_bancaires_clean") else None
+
+@st.cache_data
+def calculer_livrets(montant, annees, debut):
+    # Livret A, LDDS et LEP en un seul calcul vectorisé
+    return simulate_savings(montant, annees * 12, charger_taux(), debut)
+
+# Traces du graphique : styles envoyés une fois, puis seulement les séries modifiées
+TRACES = ("Potager", "Banque", "Livret_A", "LDDS", "LEP")
+
+@st.cache_resource
+def gabarit_graphique():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(name="Potager", line=dict(color="#022601", width=4), fill="tozeroy", fillcolor="rgba(2,38,1,0.1)"))
+    fig.add_trace(go.Scatter(name="Banque", line=dict(color="#f59e0b", width=3, dash="dash")))
+    for produit in TRACES[2:]:
+        fig.add_trace(go.Scatter(name=LABELS[produit], line=dict(width=2, dash="dot")))
+    fig.update_layout(
+        hovermode="x unified",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis=dict(title="Années"),
+        yaxis=dict(title="Valeur (€)")
+    )
+    return template_from_figure(fig, TRACES)
+
+GABARIT = gabarit_graphique()
 
 # =====================================================
 # 🎨 CSS DESIGN PREMIUM
@@ -148,12 +166,18 @@ else:
     annees = st.sidebar.slider("Nombre d'années", 1, 5, 3)
     taux_banque = st.sidebar.number_input("Taux bancaire (%)", value=1.7)
     investissement = st.sidebar.number_input("Investissement initial (€)", value=200.0)
+    livrets = charger_taux() is not None and st.sidebar.toggle("Comparer aux livrets réglementés")
+    if livrets:
+        # Un début dans l'historique rejoue les taux réellement servis
+        debuts = start_choices(charger_taux())
+        debut_livrets = debuts[st.sidebar.selectbox("Début du placement", list(debuts))]
+    graphique_partiel = st.sidebar.toggle("Mise à jour partielle du graphique", value=True)
 
     # =============================
     # CHOIX LÉGUMES
     # =============================
     st.sidebar.header("Vos légumes")
-    selection = st.sidebar.multiselect("Choisis tes légumes", list(LEGUMES.keys()), default=list(LEGUMES.keys())[:2])
+    selection = st.sidebar.multiselect("Choisis tes légumes", list(LEGUMES.names), default=list(LEGUMES.names[:2]))
     allocations = {}
     surface_restante = surface_totale
     for legume in selection:
@@ -172,58 +196,32 @@ else:
     # =============================
     # CALCULS
     # =============================
-    profit_cumule = 0
-    valeur_banque = investissement
-    production_kg = 0
-    co2_total = 0
-    valeur_annuelle = 0
-    historique = []
-    details = []
+    noms = list(allocations.keys())
+    resultat = simulate(
+        allocation_matrix(allocations, noms, annees),
+        select(LEGUMES, noms),
+        investissement,
+        taux_banque,
+    )
+    valeur_annuelle = resultat.annual_value[-1]
+    co2_total = resultat.co2[-1]
+    production_kg = resultat.kilos[-1]
 
-    for annee in range(annees + 1):
-        if annee == 0:
-            historique.append({"Année": 0, "Potager": -investissement, "Banque": investissement})
+    details = []
+    for legume, m2 in allocations.items():
+        if m2 == 0:
             continue
-
-        valeur, couts, kg_annee, co2_annee = 0, 0, 0, 0
-
-        for legume, m2 in allocations.items():
-            if m2 == 0:
-                continue
-
-            d = LEGUMES[legume]
-            kg = m2 * d["rendement"]
-            val = kg * d["prix"]
-            co2 = kg * d["co2"]
-            cout = m2 * (d["eau"] + d["graines"])
-
-            kg_annee += kg
-            valeur += val
-            co2_annee += co2
-            couts += cout
-
-            if annee == 1:
-                details.append({
-                    "Légume": legume,
-                    "Surface (m²)": m2,
-                    "Production (kg/an)": int(kg),
-                    "Valeur (€/an)": int(val),
-                    "CO2 économisé (kg/an)": int(co2),
-                })
-
-        profit_cumule += (valeur - couts)
-        valeur_banque *= (1 + taux_banque / 100)
-
-        production_kg = kg_annee
-        co2_total = co2_annee * annee
-        valeur_annuelle = valeur
-
-        historique.append({
-            "Année": annee,
-            "Potager": profit_cumule - investissement,
-            "Banque": valeur_banque
+        i = INDEX_LEGUMES[legume]
+        kg = m2 * LEGUMES.kg_m2[i]
+        details.append({
+            "Légume": legume,
+            "Surface (m²)": m2,
+            "Production (kg/an)": int(kg),
+            "Valeur (€/an)": int(kg * LEGUMES.price[i]),
+            "CO2 économisé (kg/an)": int(kg * LEGUMES.co2[i]),
         })
 
+    historique = {"Année": resultat.years, "Potager": resultat.garden_net, "Banque": resultat.bank_value}
     df = pd.DataFrame(historique)
 
     # =============================
@@ -236,19 +234,15 @@ else:
     col3.metric("Production / an", f"{int(production_kg)} kg")
 
     # graphique
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df["Année"], y=df["Potager"], name="Potager",
-                             line=dict(color="#022601", width=4), fill="tozeroy", fillcolor="rgba(2,38,1,0.1)"))
-    fig.add_trace(go.Scatter(x=df["Année"], y=df["Banque"], name="Banque",
-                             line=dict(color="#f59e0b", width=3, dash="dash")))
-    fig.update_layout(
-        hovermode="x unified",
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        xaxis=dict(title="Années"),
-        yaxis=dict(title="Valeur (€)")
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    series = {"Potager": (df["Année"].to_numpy(), df["Potager"].to_numpy()), "Banque": (df["Année"].to_numpy(), df["Banque"].to_numpy())}
+    if livrets:
+        epargne = calculer_livrets(float(investissement), annees, debut_livrets)
+        for j, produit in enumerate(epargne.products):
+            series[produit] = (epargne.months / 12, epargne.nominal[0, j])
+    if graphique_partiel:
+        live_chart(GABARIT, series, key="graphique")
+    else:
+        st.plotly_chart(add_series(go.Figure(layout=GABARIT.layout), GABARIT, series), use_container_width=True)
 
     # tableau
     if details:
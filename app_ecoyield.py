@@ -1,7 +1,22 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+import numpy as np
 import os
+import functools
+from typing import NamedTuple
+from ecoyield.simulation import allocation_matrix, simulate, simulate_monthly, yearly_summary
+from ecoyield.coefficients import load_coefficient_table, coefficients_from_table, load_crop_calendar, select
+from ecoyield.prix import build_price_index
+from ecoyield.epargne import LABELS, load_rate_history, simulate_savings, start_choices
+from ecoyield.cache import ResultCache, canonical_key
+from ecoyield.partage import DataPlane
+from ecoyield.graphique import add_series, live_chart, template_from_figure
+from ecoyield.mesures import Metrics, enabled_by_env, serve
+from ecoyield.optimisation import consumption_caps, optimize_allocation
+from ecoyield.scenarios import investment_rule
+from ecoyield.monte_carlo import estimate_risk_model, run_monte_carlo
+from ecoyield import stockage
 
 # --- 1. CONFIGURATION DE LA PAGE ---
 st.set_page_config(page_title="Eco-Yield Simulator", page_icon="🌱", layout="wide")
@@ -17,48 +32,300 @@ def go_home():
     st.session_state.page = 'home'
 
 # --- 3. CHARGEMENT DES DONNÉES ---
-@st.cache_data
-def load_garden_data():
-    fact_file = "FACT_potager.csv"
-    if not os.path.exists(fact_file):
-        return {
-            "Tomate": {"yield": 9, "price": 6, "co2": 4000, "water": 2, "seeds": 2},
-            "Carotte": {"yield": 6, "price": 3, "co2": 2000, "water": 1, "seeds": 2},
-            "Courgette": {"yield": 15, "price": 4, "co2": 5000, "water": 2, "seeds": 2},
-        }
-    df = pd.read_csv(fact_file)
-    df.columns = df.columns.str.strip()
-    data = {}
-    for _, row in df.iterrows():
-        name = str(row['Nom_Legume']).strip()
-        y_val = float(row['Rendement_kg_m2'])
-        # CONVERSION : On divise par 1000 pour passer de g à kg
-        co2_kg_m2 = float(row['CO2_Economise_m2']) / 1000
-        
-        data[name] = {
-            "yield": y_val,
-            "price": float(row['Prix_Marche_kg']),
-            "co2": co2_kg_m2 / y_val if y_val > 0 else 0,
-            "water": float(row['Cout_Eau_m2']),
-            "seeds": float(row['Prix_graine'])
-        }
-    return data
-
-@st.cache_data
+# Valeurs de repli quand FACT_potager n'a pas encore été construit
+DEFAULT_GARDEN_DATA = {
+    "Tomate": {"yield": 9, "price": 6, "co2": 4000, "water": 2, "seeds": 2},
+    "Carotte": {"yield": 6, "price": 3, "co2": 2000, "water": 1, "seeds": 2},
+    "Courgette": {"yield": 15, "price": 4, "co2": 5000, "water": 2, "seeds": 2},
+}
+
+@st.cache_resource
+def get_data_plane():
+    # Un plan de données par processus : tables en mémoire mappée, partagées par toutes les sessions
+    return DataPlane()
+
+@st.cache_resource
+def get_result_cache():
+    # Un seul cache par processus : toutes les sessions profitent des plans déjà calculés
+    return ResultCache()
+
+# Version des données pour tout ce rerun ; une publication du pipeline est prise au rerun suivant
+DATA = get_data_plane().current()
+RESULT_CACHE = get_result_cache()
+
+@st.cache_resource
+def get_metrics():
+    # Mesures du processus ; le point d'accès /metrics démarre si ECOYIELD_METRICS_PORT est défini
+    metrics, plane = Metrics(), get_data_plane()
+    metrics.register("result_cache", RESULT_CACHE.stats)
+    metrics.register("data", lambda: {"version": plane.current().version, "swaps": plane.swaps, **plane.current().counts})
+    serve(metrics)
+    return metrics
+
+# Instrumentation opt-in : ECOYIELD_METRICS=1 (ligne JSON par rerun), et seulement alors
+# ?debug=1 (panneau de diagnostic) : un visiteur ne peut pas l'ouvrir sur un déploiement public
+METRICS = get_metrics()
+METRICS_ENABLED = enabled_by_env()
+DEBUG_PANEL = METRICS_ENABLED and st.query_params.get("debug") == "1"
+
+def load_investment_table():
+    return stockage.read_frame("Investissement_Materiel") if stockage.exists("Investissement_Materiel") else None
+
 def calculate_default_investment(surface):
-    inv_file = "Investissement_Materiel.csv"
-    if not os.path.exists(inv_file):
-        return float(int(round(150.0 + (surface * 5.0))))
-    df_inv = pd.read_csv(inv_file, sep=';')
-    df_inv.columns = df_inv.columns.str.strip()
-    fixed = df_inv[df_inv['Type_Cout'] == 'Fixe']['Prix_Estime'].sum()
-    var_items = df_inv[df_inv['Type_Cout'] == 'Variable']
-    variable = var_items['Prix_Estime'].sum() * (surface / 10) if not var_items.empty else surface * 5.0
-    return float(int(round(fixed + variable)))
-
-VEGETABLE_DATA = load_garden_data()
-
-# --- 4. CSS PERSONNALISÉ ---
+    # Même règle que la CLI (ecoyield.scenarios), calculée une fois par version
+    rule = DATA.get("investment", lambda: investment_rule(load_investment_table()))
+    return rule.amount(surface)
+
+def load_consumption_caps(names, persons):
+    return DATA.get(("caps", names, persons), lambda: consumption_caps(names, persons))
+
+OPTIMIZER_OBJECTIVES = {"Profit net": "profit", "CO₂ évité": "co2", "Mix profit / CO₂": "mix"}
+
+# Objets construits une fois par version de données, en lecture seule
+VEGETABLE_COEFS = DATA.get("coefficients", lambda: coefficients_from_table(load_coefficient_table(DEFAULT_GARDEN_DATA)))
+VEGETABLE_INDEX = {name: i for i, name in enumerate(VEGETABLE_COEFS.names)}
+
+def load_crop_calendar_for_app():
+    # Index des prix et calendrier construits une fois par version
+    def build():
+        price_index = build_price_index() if stockage.exists("Prix_legume_moyen") else None
+        return load_crop_calendar(VEGETABLE_COEFS, price_index)
+    return DATA.get("crop_calendar", build)
+
+def load_savings_history():
+    return DATA.get("rate_history", lambda: load_rate_history() if stockage.exists("Taux_bancaires_clean") else None)
+
+def run_savings(amount, years, start):
+    # Tous les livrets en un seul calcul : basculer l'affichage ne relance rien
+    key = canonical_key(kind="savings", data=DATA.version, investment=amount, years=years, start=str(start))
+    return RESULT_CACHE.get_or_compute(key, lambda: simulate_savings(amount, years * 12, load_savings_history(), start))
+
+# Traces du graphique de performance, dans l'ordre d'empilement (P95 juste avant P5 pour « tonexty »)
+CHART_TRACES = ("garden", "bank", "Livret_A", "LDDS", "LEP", "garden_p95", "garden_p5", "bank_p95", "bank_p5")
+
+@st.cache_resource
+def load_chart_template():
+    # Styles construits une fois : les reruns n'envoient plus que les séries
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(name="Profit Potager", line=dict(color='#022601', width=4), fill='tozeroy', fillcolor='rgba(2, 38, 1, 0.1)'))
+    fig.add_trace(go.Scatter(name="Épargne", line=dict(color='#f59e0b', width=3, dash='dash')))
+    for product, color in zip(("Livret_A", "LDDS", "LEP"), ('#f59e0b', '#b45309', '#7c3aed')):
+        fig.add_trace(go.Scatter(name=LABELS[product], line=dict(color=color, width=2, dash='dot')))
+    fig.add_trace(go.Scatter(name="Potager P95", line=dict(color='rgba(2, 38, 1, 0.3)', width=1)))
+    fig.add_trace(go.Scatter(name="Potager P5", line=dict(color='rgba(2, 38, 1, 0.3)', width=1), fill='tonexty', fillcolor='rgba(2, 38, 1, 0.15)'))
+    fig.add_trace(go.Scatter(name="Épargne P95", line=dict(color='rgba(245, 158, 11, 0.4)', width=1)))
+    fig.add_trace(go.Scatter(name="Épargne P5", line=dict(color='rgba(245, 158, 11, 0.4)', width=1), fill='tonexty', fillcolor='rgba(245, 158, 11, 0.1)'))
+    fig.update_layout(hovermode="x unified", plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(title="Années"), yaxis=dict(title="Valeur (€)"))
+    return template_from_figure(fig, CHART_TRACES)
+
+CHART_TEMPLATE = load_chart_template()
+
+def build_simulation_view(allocations, years, initial_investment, bank_rate, seasonal):
+    """Résultat, tableau annuel, figure de base et détails pour un jeu d'entrées (mis en cache)."""
+    with METRICS.timer("simulation"):
+        alloc = allocation_matrix(allocations, VEGETABLE_COEFS.names, years)
+        if seasonal:
+            # Récoltes placées au mois près et vendues au prix de saison, eau facturée chaque semaine
+            monthly = simulate_monthly(alloc, VEGETABLE_COEFS, load_crop_calendar_for_app(), initial_investment, bank_rate)
+            result = yearly_summary(monthly)
+        else:
+            result = simulate(alloc, VEGETABLE_COEFS, initial_investment, bank_rate)
+    df = pd.DataFrame({
+        "Année": result.years,
+        "Potager (Net)": np.rint(result.garden_net).astype(int),
+        "Placement Bancaire": np.rint(result.bank_value).astype(int),
+        "CO2": np.rint(result.co2).astype(int),
+        "Kilos": np.rint(result.kilos).astype(int),
+        "Valeur Annuelle": np.rint(result.annual_value).astype(int),
+    })
+
+    if seasonal:
+        x, garden, bank = monthly.months / 12, monthly.garden_net, monthly.bank_value
+    else:
+        x, garden, bank = df["Année"].to_numpy(), df["Potager (Net)"].to_numpy(), df["Placement Bancaire"].to_numpy()
+    series = {"garden": (x, garden), "bank": (x, bank)}
+    with METRICS.timer("figure"):
+        fig = add_series(go.Figure(layout=CHART_TEMPLATE.layout), CHART_TEMPLATE, series)
+
+    c, i = VEGETABLE_COEFS, VEGETABLE_INDEX
+    details = pd.DataFrame([{"Légume": v, "Surface (m²)": s, "Poids (kg/an)": int(s*c.kg_m2[i[v]]), "Valeur (€/an)": int(s*c.kg_m2[i[v]]*c.price[i[v]]), "CO2 économisé (kg/an)": int(s*c.kg_m2[i[v]]*c.co2[i[v]])} for v, s in allocations.items() if s > 0])
+    return {"result": result, "chart_data": df.to_dict("records"), "series": series, "figure": fig, "details": details}
+
+def load_risk_model(names):
+    return DATA.get(("risk_model", names), lambda: estimate_risk_model(names))
+
+def run_risk_analysis(surfaces, years, initial_investment, bank_rate):
+    key = canonical_key(kind="risk", data=DATA.version, surfaces=surfaces, years=years, investment=initial_investment, rate=bank_rate)
+    model = load_risk_model(VEGETABLE_COEFS.names)
+    return RESULT_CACHE.get_or_compute(
+        key, lambda: run_monte_carlo(np.array(surfaces), VEGETABLE_COEFS, model, years, initial_investment, bank_rate, seed=42)
+    )
+
+@st.cache_resource
+def load_logo():
+    # Lu une fois par processus : les reruns ne relisent plus le PNG
+    if not os.path.exists("logo_eco-yield.png"):
+        return None
+    with open("logo_eco-yield.png", "rb") as f:
+        return f.read()
+
+LOGO = load_logo()
+
+def instrumented(scope):
+    """Mesure chaque appel comme un run `scope` (étape du rerun complet quand il y en a un)."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with METRICS.run(scope, st.session_state, METRICS_ENABLED):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# --- 4. FRAGMENTS DU SIMULATEUR ---
+# Un widget placé dans un fragment ne relance que ce fragment : bouger un slider de
+# surface recalcule les indicateurs, le graphique et le tableau, sans CSS, logo ni sidebar.
+# Les options du graphique (risque, livrets) ne relancent que le graphique.
+# Le choix des légumes et les sliders de surface ont quitté la sidebar : Streamlit refuse
+# qu'un fragment écrive un widget dans st.sidebar (conteneur créé hors du fragment), et
+# appeler le fragment sous `with st.sidebar:` y afficherait aussi le graphique et le tableau.
+# Les laisser dans la sidebar hors fragment ferait relancer toute la page à chaque slider.
+
+class ProjectSettings(NamedTuple):
+    """Paramètres de la sidebar, fixés pour toutes les relances des fragments."""
+    surface: int
+    years: int
+    bank_rate: float
+    investment: float
+    seasonal: bool
+
+
+def allocation_inputs(settings):
+    """Choix des légumes et surfaces (optimisées ou non) : {légume: m²}."""
+    st.subheader("Vos légumes")
+    selected_vegs = st.multiselect(
+        "Choisissez vos légumes", 
+        list(VEGETABLE_COEFS.names),
+        default=list(VEGETABLE_COEFS.names[:2])
+    )
+
+    optimizer_mode = st.toggle("Optimiser la répartition")
+    if optimizer_mode:
+        opt_c1, opt_c2, opt_c3, opt_c4 = st.columns(4)
+        objective = OPTIMIZER_OBJECTIVES[opt_c1.selectbox("Objectif", list(OPTIMIZER_OBJECTIVES.keys()))]
+        weight = opt_c2.slider("Part du profit dans le mix (%)", 0, 100, 50) / 100 if objective == "mix" else 0.5
+        persons = opt_c3.number_input("Personnes au foyer", min_value=1, value=2)
+        cap_to_needs = opt_c4.checkbox("Limiter à la consommation du foyer", value=True)
+
+    allocations = {}
+    remaining_surface = settings.surface
+
+    slider_columns = st.columns(3)
+    for k, veg in enumerate(selected_vegs):
+        # En mode optimiseur, les sliders deviennent des surfaces minimales imposées
+        label = f"{veg} minimum (m²)" if optimizer_mode else f"{veg} (m²)"
+        val = slider_columns[k % 3].slider(label, 0, settings.surface, 0 if optimizer_mode else 1)
+        allocations[veg] = val
+        remaining_surface -= val
+
+    if optimizer_mode and selected_vegs and remaining_surface >= 0:
+        surfaces = optimize_allocation(
+            select(VEGETABLE_COEFS, selected_vegs),
+            settings.surface,
+            objective,
+            weight,
+            minimums=[allocations[veg] for veg in selected_vegs],
+            caps=load_consumption_caps(tuple(selected_vegs), persons) if cap_to_needs else None,
+        )
+        allocations = {veg: int(surf) for veg, surf in zip(selected_vegs, surfaces)}
+        remaining_surface = settings.surface - sum(allocations.values())
+
+    if remaining_surface < 0:
+        st.error(f"Excès : {abs(remaining_surface)} m²")
+    else:
+        st.success(f"Libre : {remaining_surface} m²")
+    return allocations
+
+
+def kpis(chart_data):
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Valeur récolte / an", f"{chart_data[-1]['Valeur Annuelle']} €")
+    # Affichage en kg
+    col2.metric("Économie CO₂ Totale", f"{chart_data[-1]['CO2']} kg")
+    col3.metric("Production / an", f"{chart_data[-1]['Kilos']} kg")
+
+
+@st.fragment
+@instrumented("financial_chart")
+def financial_chart(view, settings, allocations):
+    """Graphique de performance ; ses options ne relancent que lui (avec la vue du dernier calcul)."""
+    st.subheader("Performance Financière")
+
+    opt_c1, opt_c2, opt_c3, opt_c4 = st.columns(4)
+    risk_mode = opt_c1.toggle("Analyse de risque (Monte Carlo)")
+    savings_mode = load_savings_history() is not None and opt_c2.toggle("Comparer aux livrets réglementés")
+    real_terms = savings_mode and opt_c3.checkbox("Livrets en euros constants")
+    if savings_mode:
+        # Un début dans l'historique rejoue les taux réellement servis
+        starts = start_choices(load_savings_history())
+        savings_start = starts[opt_c2.selectbox("Début du placement", list(starts))]
+    live_mode = opt_c4.toggle("Mise à jour partielle", value=True, help="Le graphique reste dans le navigateur ; seules les séries modifiées sont envoyées.")
+
+    series = {}
+    if savings_mode:
+        with METRICS.timer("savings"):
+            savings = run_savings(settings.investment, settings.years, savings_start)
+        values = savings.real if real_terms else savings.nominal
+        suffix = " (€ constants)" if real_terms else ""
+        for j, product in enumerate(savings.products):
+            series[product] = (savings.months / 12, values[0, j], LABELS[product] + suffix)
+
+    if risk_mode:
+        surfaces = allocation_matrix(allocations, VEGETABLE_COEFS.names, 1)[:, 0]
+        with METRICS.timer("risk"):
+            risk = run_risk_analysis(tuple(surfaces), settings.years, settings.investment, settings.bank_rate)
+        series["garden_p95"], series["garden_p5"] = (risk.years, risk.garden_net[-1]), (risk.years, risk.garden_net[0])
+        series["bank_p95"], series["bank_p5"] = (risk.years, risk.bank_value[-1]), (risk.years, risk.bank_value[0])
+        st.caption(f"Probabilité que le potager dépasse l'épargne en année {settings.years} : {risk.beat_probability[-1]:.0%} (100 000 trajectoires)")
+
+    with METRICS.timer("chart"):
+        if live_mode:
+            live_chart(CHART_TEMPLATE, {**view["series"], **series}, key="financial_chart")
+        else:
+            # Copie de la figure en cache : les traces ajoutées ne la modifient pas
+            st.plotly_chart(add_series(go.Figure(view["figure"]), CHART_TEMPLATE, series), use_container_width=True)
+
+
+def details_table(view, allocations):
+    if allocations:
+        st.subheader("Rendements détaillés")
+        with METRICS.timer("table"):
+            st.table(view["details"])
+
+
+@st.fragment
+@instrumented("simulator")
+def simulator(settings):
+    """Surfaces, indicateurs, graphique et tableau : relancé seul quand une surface change."""
+    with METRICS.timer("inputs"):
+        allocations = allocation_inputs(settings)
+
+    # Les entrées déjà vues (par cette session ou une autre) ne sont pas recalculées
+    view_key = canonical_key(
+        data=DATA.version, surface=settings.surface, years=settings.years, rate=settings.bank_rate,
+        investment=settings.investment, allocations=allocations, seasonal=settings.seasonal,
+    )
+    with METRICS.timer("view"):
+        view = RESULT_CACHE.get_or_compute(
+            view_key, lambda: build_simulation_view(allocations, settings.years, settings.investment, settings.bank_rate, settings.seasonal)
+        )
+
+    st.markdown("")
+    kpis(view["chart_data"])
+    st.markdown("")
+    financial_chart(view, settings, allocations)
+    details_table(view, allocations)
+
+# --- 5. CSS PERSONNALISÉ ---
 st.markdown("""
     <style>
     [data-testid="stSidebarUserContent"] {
@@ -107,135 +374,69 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- 5. LOGIQUE D'AFFICHAGE ---
-
-# --- A. PAGE DE BIENVENUE ---
-if st.session_state.page == 'home':
-    st.markdown("<br><br>", unsafe_allow_html=True)
-    c1, c2, c3 = st.columns([1, 1, 1])
-    with c2:
-        if os.path.exists("logo_eco-yield.png"):
-            st.image("logo_eco-yield.png", use_container_width=True)
-
-    st.markdown("""
-        <h1 style='text-align: center; color: #022601;'>Bienvenue sur Eco-Yield Simulator</h1>
-        <p style='text-align: center; font-size: 1.3rem; color: #31333F;'>
-            L'outil intelligent pour simuler les gains de vos récoltes <br>
-            et mesurer votre impact écologique et bientôt planifier votre potager.
-        </p>
-        <br>
-    """, unsafe_allow_html=True)
+# --- 6. LOGIQUE D'AFFICHAGE ---
+with METRICS.run("app", st.session_state, METRICS_ENABLED):
+
+    # --- A. PAGE DE BIENVENUE ---
+    if st.session_state.page == 'home':
+        st.markdown("<br><br>", unsafe_allow_html=True)
+        c1, c2, c3 = st.columns([1, 1, 1])
+        with c2:
+            if LOGO is not None:
+                st.image(LOGO, use_container_width=True)
+
+        st.markdown("""
+            <h1 style='text-align: center; color: #022601;'>Bienvenue sur Eco-Yield Simulator</h1>
+            <p style='text-align: center; font-size: 1.3rem; color: #31333F;'>
+                L'outil intelligent pour simuler les gains de vos récoltes <br>
+                et mesurer votre impact écologique et bientôt planifier votre potager.
+            </p>
+            <br>
+        """, unsafe_allow_html=True)
     
-    bc1, bc2, bc3 = st.columns([1, 1, 1])
-    with bc2:
-        st.button("Commencer mon potager", on_click=start_app, use_container_width=True)
-
-# --- B. PAGE DU SIMULATEUR ---
-else:
-    # Sidebar : Logo en haut
-    side_c1, side_c2, side_c3 = st.sidebar.columns([1, 4, 1])
-    with side_c2:
-        if os.path.exists("logo_eco-yield.png"):
-            st.image("logo_eco-yield.png", use_container_width=True)
-    
-    st.sidebar.markdown("")
-
-    st.sidebar.header("Paramètres du Projet")
-    total_surface = st.sidebar.number_input("Surface totale (m²)", min_value=1, value=30)
-    years = st.sidebar.slider("Simulation (Années)", 1, 5, 3)
-    bank_rate = st.sidebar.number_input("Taux d'intérêt (%)", value=1.7, step=0.1)
-
-    suggested_inv = calculate_default_investment(total_surface)
-    initial_investment = st.sidebar.number_input(
-        "Investissement Initial (€)", 
-        min_value=0.0, 
-        value=float(int(round(suggested_inv)))
-    )
+        bc1, bc2, bc3 = st.columns([1, 1, 1])
+        with bc2:
+            st.button("Commencer mon potager", on_click=start_app, use_container_width=True)
 
-    st.sidebar.markdown("---")
-    st.sidebar.header("Vos légumes")
-
-    selected_vegs = st.sidebar.multiselect(
-        "Choisissez vos légumes", 
-        list(VEGETABLE_DATA.keys()),
-        default=list(VEGETABLE_DATA.keys())[:2]
-    )
-
-    allocations = {}
-    remaining_surface = int(total_surface)
-
-    for veg in selected_vegs:
-        val = st.sidebar.slider(f"{veg} (m²)", 0, int(total_surface), 1)
-        allocations[veg] = val
-        remaining_surface -= val
-
-    if remaining_surface < 0:
-        st.sidebar.error(f"Excès : {abs(remaining_surface)} m²")
+    # --- B. PAGE DU SIMULATEUR ---
     else:
-        st.sidebar.success(f"Libre : {remaining_surface} m²")
-        
-    # Sidebar : Bouton retour en bas
-    st.sidebar.markdown("<br>" * 5, unsafe_allow_html=True)
-    st.sidebar.markdown("---")
-    st.sidebar.button(" Retour à l'accueil", on_click=go_home, use_container_width=True)
-
-    # --- CALCULS ---
-    chart_data = []
-    cumul_profit_garden = 0
-    bank_value = float(initial_investment)
-
-    for yr in range(years + 1):
-        if yr == 0:
-            chart_data.append({"Année": 0, "Potager (Net)": int(-initial_investment), "Placement Bancaire": int(initial_investment), "CO2": 0, "Kilos": 0, "Valeur Annuelle": 0})
-            continue
-
-        y_val, y_co2, y_costs, y_kg = 0, 0, 0, 0
-        for veg, surf in allocations.items():
-            s = VEGETABLE_DATA[veg]
-            kg = surf * s["yield"]
-            y_kg += kg
-            y_val += kg * s["price"]
-            y_co2 += kg * s["co2"] # Déjà converti en kg dans load_garden_data
-            y_costs += (surf * s["water"]) + (surf * s["seeds"])
-
-        cumul_profit_garden += (y_val - y_costs)
-        bank_value *= (1 + bank_rate / 100)
-
-        chart_data.append({
-            "Année": yr,
-            "Potager (Net)": int(round(cumul_profit_garden - initial_investment)),
-            "Placement Bancaire": int(round(bank_value)),
-            "CO2": int(round(y_co2 * yr)),
-            "Kilos": int(round(y_kg)),
-            "Valeur Annuelle": int(round(y_val))
-        })
-
-    df = pd.DataFrame(chart_data)
-
-    # --- AFFICHAGE PRINCIPAL ---
-
-
-    st.title("Votre Simulateur Eco-Yield")
-    st.markdown("")
-
-    col1, col2, col3 = st.columns(3)
-    col1.metric("Valeur récolte / an", f"{chart_data[-1]['Valeur Annuelle']} €")
-    # Affichage en kg
-    col2.metric("Économie CO₂ Totale", f"{chart_data[-1]['CO2']} kg")
-    col3.metric("Production / an", f"{chart_data[-1]['Kilos']} kg")
-
-    st.markdown("")
-    st.markdown("")
-    st.subheader("Performance Financière")
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df["Année"], y=df["Potager (Net)"], name="Profit Potager", line=dict(color='#022601', width=4), fill='tozeroy', fillcolor='rgba(2, 38, 1, 0.1)'))
-    fig.add_trace(go.Scatter(x=df["Année"], y=df["Placement Bancaire"], name="Épargne", line=dict(color='#f59e0b', width=3, dash='dash')))
-
-    fig.update_layout(hovermode="x unified", plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(title="Années"), yaxis=dict(title="Valeur (€)"))
-    st.plotly_chart(fig, use_container_width=True)
-
-    if allocations:
-        st.subheader("Rendements détaillés")
-        details = [{"Légume": v, "Surface (m²)": s, "Poids (kg/an)": int(s*VEGETABLE_DATA[v]["yield"]), "Valeur (€/an)": int(s*VEGETABLE_DATA[v]["yield"]*VEGETABLE_DATA[v]["price"]), "CO2 économisé (kg/an)": int(s*VEGETABLE_DATA[v]["yield"]*VEGETABLE_DATA[v]["co2"])} for v, s in allocations.items() if s > 0]
-        st.table(pd.DataFrame(details))
\ No newline at end of file
+        # Sidebar : Logo en haut
+        side_c1, side_c2, side_c3 = st.sidebar.columns([1, 4, 1])
+        with side_c2:
+            if LOGO is not None:
+                st.image(LOGO, use_container_width=True)
+    
+        st.sidebar.markdown("")
+
+        # Paramètres du projet : les modifier relance toute la page
+        st.sidebar.header("Paramètres du Projet")
+        total_surface = st.sidebar.number_input("Surface totale (m²)", min_value=1, value=30)
+        years = st.sidebar.slider("Simulation (Années)", 1, 5, 3)
+        bank_rate = st.sidebar.number_input("Taux d'intérêt (%)", value=1.7, step=0.1)
+        seasonal_mode = st.sidebar.toggle("Saisonnalité (mois par mois)")
+
+        with METRICS.timer("investment"):
+            suggested_inv = calculate_default_investment(total_surface)
+        initial_investment = st.sidebar.number_input(
+            "Investissement Initial (€)", 
+            min_value=0.0, 
+            value=float(int(round(suggested_inv)))
+        )
+
+        # Sidebar : Bouton retour en bas
+        st.sidebar.markdown("<br>" * 5, unsafe_allow_html=True)
+        st.sidebar.markdown("---")
+        st.sidebar.button(" Retour à l'accueil", on_click=go_home, use_container_width=True)
+
+        st.title("Votre Simulateur Eco-Yield")
+        st.markdown("")
+
+        simulator(ProjectSettings(int(total_surface), years, bank_rate, float(initial_investment), seasonal_mode))
+
+    # --- C. DIAGNOSTIC (?debug=1) ---
+    if DEBUG_PANEL:
+        with st.sidebar.expander("Diagnostic", expanded=False):
+            run = METRICS.current()
+            st.caption(f"Session {run.session} · rerun n°{run.rerun} · reruns : {dict(st.session_state.metrics_reruns)}")
+            st.dataframe(pd.DataFrame({"Étape": list(run.stages), "ms": [round(ms, 2) for ms in run.stages.values()]}), hide_index=True)
+            st.json(METRICS.snapshot(), expanded=False)
@@ -0,0 +1 @@
+"""Eco-Yield : moteur de simulation du potager comme produit d'épargne."""
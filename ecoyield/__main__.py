@@ -0,0 +1,5 @@
+import sys
+from ecoyield.cli import main
+
+# python -m ecoyield : même point d'entrée que la commande eco-yield
+sys.exit(main())
@@ -0,0 +1,375 @@
+import argparse
+import contextlib
+import glob
+import hashlib
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, NamedTuple
+import numpy as np
+import pandas as pd
+import requests
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+HTTP_FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures", "http")
+REFERENCE_FILE = os.path.join(BENCH_DIR, "reference.json")
+RESULTS_FILE = os.path.join(BENCH_DIR, "resultats.json")
+
+# Écart toléré sur la médiane avant de signaler une régression (0.5 = 50 % plus lent)
+TOLERANCE = 0.5
+# Marge absolue minimale (ms) : sous quelques microsecondes, le bruit dépasse tout pourcentage
+MIN_SLACK_MS = 0.01
+
+REPEAT = 5
+# Chaque échantillon enchaîne assez d'appels pour durer au moins MIN_SAMPLE_S
+MIN_SAMPLE_S = 0.05
+MAX_LOOPS = 10_000
+
+SIMULATION_VEGETABLES = (3, 15, 150)
+SIMULATION_YEARS = (1, 10, 50)
+
+
+class Benchmark(NamedTuple):
+    """
+    Mesure reproductible : `prepare()` s'exécute dans un dossier temporaire où
+    `files` (motifs relatifs à la racine du dépôt) ont été copiés, et renvoie la
+    fonction chronométrée. `fixtures` liste les URL rejouées depuis les
+    enregistrements HTTP ; sans enregistrement, la mesure est sautée.
+    """
+    name: str
+    prepare: Callable
+    files: tuple = ()
+    fixtures: tuple = ()
+
+#___________________________________
+# ENREGISTREMENTS HTTP
+#___________________________________
+
+def fixture_path(url):
+    return os.path.join(HTTP_FIXTURES_DIR, hashlib.sha256(url.encode()).hexdigest()[:16] + ".json")
+
+
+def record(urls, session=None):
+    """Télécharge `urls` une fois et enregistre statut, en-têtes et corps (mode --record)."""
+    session = session or requests.Session()
+    session.headers.setdefault("User-Agent", "Mozilla/5.0")
+    os.makedirs(HTTP_FIXTURES_DIR, exist_ok=True)
+    for url in urls:
+        response = session.get(url, timeout=30)
+        with open(fixture_path(url), "w", encoding="utf-8") as f:
+            json.dump({
+                "url": url,
+                "synthetic": False,
+                "status": response.status_code,
+                "headers": dict(response.headers),
+                "encoding": response.encoding,
+                "body": response.text,
+            }, f, ensure_ascii=False)
+        print(f"[rec] {response.status_code} {url}")
+
+
+def load_fixture(url):
+    with open(fixture_path(url), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_synthetic(urls):
+    """Vrai si une des pages rejouées a été construite à la main plutôt qu'enregistrée."""
+    return any(os.path.exists(fixture_path(url)) and load_fixture(url).get("synthetic", False) for url in urls)
+
+
+class ReplaySession(requests.Session):
+    """Session qui sert les réponses enregistrées, sans réseau ; une URL inconnue lève une erreur."""
+
+    def request(self, method, url, params=None, **kwargs):
+        prepared = requests.Request(method, url, params=params).prepare()
+        fixture = load_fixture(prepared.url)
+        response = requests.Response()
+        response.status_code = fixture["status"]
+        response.headers = requests.structures.CaseInsensitiveDict(fixture["headers"])
+        response.encoding = fixture["encoding"] or "utf-8"
+        response._content = fixture["body"].encode(response.encoding)
+        response.url = prepared.url
+        response.request = prepared
+        return response
+
+#___________________________________
+# MESURES
+#___________________________________
+
+def bench_simulation(n_vegetables, n_years):
+    from ecoyield.simulation import Coefficients, simulate
+
+    def prepare():
+        rng = np.random.default_rng(0)
+        coefs = Coefficients(
+            tuple(f"Legume_{i}" for i in range(n_vegetables)),
+            rng.uniform(1, 15, n_vegetables), rng.uniform(1, 8, n_vegetables),
+            rng.uniform(0.1, 1, n_vegetables), rng.uniform(0.5, 3, n_vegetables), rng.uniform(0.5, 3, n_vegetables),
+        )
+        allocations = rng.integers(0, 10, (n_vegetables, n_years)).astype(np.float64)
+        return lambda: simulate(allocations, coefs, 500.0, 1.7)
+    return Benchmark(f"simulation.yearly[v={n_vegetables},y={n_years}]", prepare)
+
+
+def _load_garden_data():
+    from ecoyield.coefficients import coefficients_from_table, load_coefficient_table
+    return coefficients_from_table(load_coefficient_table())
+
+
+def prepare_garden_cold():
+    # Ni fichier Arrow ni table précalculée : lecture du CSV FACT_potager et calcul
+    return _load_garden_data
+
+
+def prepare_garden_npy():
+    from ecoyield.coefficients import build_coefficients
+    build_coefficients()
+    return _load_garden_data
+
+
+def prepare_garden_warm():
+    # Objet déjà construit dans la version servie (cas de tous les reruns après le premier)
+    from ecoyield.partage import Snapshot
+    snapshot = Snapshot("bench", os.getcwd())
+    snapshot.get("coefficients", _load_garden_data)
+    return lambda: snapshot.get("coefficients", _load_garden_data)
+
+
+def prepare_extractions(workers):
+    def prepare():
+        module = importlib.import_module("FIXE_prix_legumes_historique")
+        return lambda: module.lire_extractions("extractions", workers=workers)
+    return prepare
+
+
+def prepare_co2_clean():
+    module = importlib.import_module("FIXE_Empreinte_Carbone")
+    return module.nettoyer_co2
+
+
+def prepare_rendement_clean():
+    module = importlib.import_module("FIXE_rendement")
+    return module.nettoyer_rendement
+
+
+def prepare_co2_scrape():
+    from ecoyield.collecte import HostPolicy, collect
+    module = importlib.import_module("FIXE_Empreinte_Carbone")
+    # Rejeu sans limite de débit ni cache disque : on mesure la collecte et l'analyse des pages
+    options = dict(session=ReplaySession(), cache_path=None, policies={}, default=HostPolicy(concurrency=16, rate=1e6, burst=1000))
+    return lambda: collect(module.recuperer_tous_les_tableaux, **options)
+
+
+def prepare_rendement_scrape():
+    module = importlib.import_module("FIXE_rendement")
+    with open("page_rendement.html", "w", encoding="utf-8") as f:
+        f.write(load_fixture(module.URL_RENDEMENT)["body"])
+
+    def run():
+        url = module.URL_RENDEMENT
+        module.URL_RENDEMENT = os.path.abspath("page_rendement.html")
+        try:
+            module.scraper_rendement()
+        finally:
+            module.URL_RENDEMENT = url
+    return run
+
+
+def co2_urls():
+    module = importlib.import_module("FIXE_Empreinte_Carbone")
+    return tuple(module.url_impact(legume) for legume in module.LISTE_DES_LEGUMES)
+
+
+def rendement_urls():
+    return (importlib.import_module("FIXE_rendement").URL_RENDEMENT,)
+
+
+def scrape_name(source, urls):
+    # Les pages fournies avec le dépôt sont synthétiques (reconstruites à partir des CSV) :
+    # leur mesure porte un autre nom que celle des pages réelles, pour ne pas comparer les deux
+    return f"{source}.scrape_synthetic" if is_synthetic(urls) else f"{source}.scrape"
+
+
+def benchmarks():
+    suite = [bench_simulation(v, y) for v in SIMULATION_VEGETABLES for y in SIMULATION_YEARS]
+    suite += [
+        Benchmark("load_garden_data.cold", prepare_garden_cold, ("FACT_potager.csv",)),
+        Benchmark("load_garden_data.npy", prepare_garden_npy, ("FACT_potager.csv",)),
+        Benchmark("load_garden_data.warm", prepare_garden_warm, ("FACT_potager.csv",)),
+        Benchmark("extractions.parse", prepare_extractions(1), ("extractions/*.txt",)),
+        Benchmark("extractions.parse_parallel", prepare_extractions(None), ("extractions/*.txt",)),
+        Benchmark("co2.clean", prepare_co2_clean, ("impact_co2_complet.csv",)),
+        Benchmark("rendement.clean", prepare_rendement_clean, ("rendement_3_tableaux.csv",)),
+        Benchmark(scrape_name("co2", co2_urls()), prepare_co2_scrape, fixtures=co2_urls()),
+        Benchmark(scrape_name("rendement", rendement_urls()), prepare_rendement_scrape, fixtures=rendement_urls()),
+    ]
+    return suite
+
+#___________________________________
+# EXÉCUTION
+#___________________________________
+
+@contextlib.contextmanager
+def sandbox(files):
+    """Dossier de travail temporaire contenant une copie de `files` : les étapes n'écrivent pas dans le dépôt."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ecoyield-bench-") as tmp:
+        for pattern in files:
+            for path in glob.glob(os.path.join(ROOT, pattern)):
+                destination = os.path.join(tmp, os.path.relpath(path, ROOT))
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.copy2(path, destination)
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def measure(function, repeat=REPEAT):
+    """Durées par appel (s) : `repeat` échantillons de `loops` appels, `loops` calibré sur MIN_SAMPLE_S."""
+    start = time.perf_counter()
+    function()
+    first = time.perf_counter() - start
+    loops = int(min(MAX_LOOPS, max(1, MIN_SAMPLE_S // max(first, 1e-9))))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        samples.append((time.perf_counter() - start) / loops)
+    return samples, loops
+
+
+def run_benchmark(bench, repeat=REPEAT):
+    missing = [url for url in bench.fixtures if not os.path.exists(fixture_path(url))]
+    if missing:
+        return {"status": "skipped", "reason": f"{len(missing)} enregistrement(s) HTTP absent(s), lancer --record"}
+    try:
+        # Les étapes affichent leur progression : on la coupe pendant la mesure
+        with sandbox(bench.files), contextlib.redirect_stdout(io.StringIO()):
+            samples, loops = measure(bench.prepare(), repeat)
+    except Exception as exc:
+        return {"status": "error", "reason": f"{type(exc).__name__}: {exc}"}
+    ms = [s * 1000 for s in samples]
+    return {
+        "status": "ok",
+        "median_ms": round(statistics.median(ms), 4),
+        "min_ms": round(min(ms), 4),
+        "max_ms": round(max(ms), 4),
+        "stdev_ms": round(statistics.stdev(ms), 4) if len(ms) > 1 else 0.0,
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def load_reference(path=REFERENCE_FILE):
+    if not os.path.exists(path):
+        return {"tolerance": TOLERANCE, "benchmarks": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(result, reference, tolerance):
+    """Ajoute la référence et la limite au résultat ; « regression » si la médiane dépasse la limite."""
+    if result["status"] != "ok" or reference is None:
+        if result["status"] == "ok":
+            result["status"] = "new"
+        return result
+    tolerance = reference.get("tolerance", tolerance)
+    result["reference_ms"] = reference["median_ms"]
+    result["limit_ms"] = round(max(reference["median_ms"] * (1 + tolerance), reference["median_ms"] + MIN_SLACK_MS), 4)
+    if result["median_ms"] > result["limit_ms"]:
+        result["status"] = "regression"
+    return result
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def write_json(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def run_suite(pattern=None, repeat=REPEAT, output=RESULTS_FILE, reference_path=REFERENCE_FILE, update_reference=False):
+    """Exécute la suite, écrit les résultats en JSON et renvoie le nombre de régressions et d'erreurs."""
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    reference = load_reference(reference_path)
+    tolerance = reference.get("tolerance", TOLERANCE)
+    results = {}
+    for bench in benchmarks():
+        if pattern and pattern not in bench.name:
+            continue
+        result = compare(run_benchmark(bench, repeat), reference["benchmarks"].get(bench.name), tolerance)
+        results[bench.name] = result
+        timing = f"{result['median_ms']:.3f} ms" if "median_ms" in result else result.get("reason", "")
+        limit = f" (limite {result['limit_ms']:.3f} ms)" if "limit_ms" in result else ""
+        print(f"[{result['status']:>10}] {bench.name} : {timing}{limit}")
+
+    write_json({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(), "tolerance": tolerance, "benchmarks": results}, output)
+    print(f"Résultats -> {output}")
+
+    if update_reference:
+        measured = {name: {"median_ms": r["median_ms"]} for name, r in results.items() if "median_ms" in r}
+        for name, r in measured.items():
+            # Une tolérance propre à une mesure est conservée
+            if "tolerance" in reference["benchmarks"].get(name, {}):
+                r["tolerance"] = reference["benchmarks"][name]["tolerance"]
+        reference["benchmarks"].update(measured)
+        reference["environment"] = environment()
+        reference.setdefault("tolerance", TOLERANCE)
+        write_json(reference, reference_path)
+        print(f"Référence mise à jour -> {reference_path}")
+        return 0
+    return sum(r["status"] in ("regression", "error") for r in results.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesures de performance d'Eco-Yield (simulation, chargements, étapes du pipeline).")
+    parser.add_argument("-k", dest="pattern", help="ne lance que les mesures dont le nom contient ce texte")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="échantillons par mesure")
+    parser.add_argument("--output", default=RESULTS_FILE, help="fichier JSON des résultats")
+    parser.add_argument("--reference", default=REFERENCE_FILE, help="fichier JSON des références (seuils)")
+    parser.add_argument("--update-reference", action="store_true", help="enregistre les médianes mesurées comme référence")
+    parser.add_argument("--record", action="store_true", help="enregistre les pages HTTP rejouées par les mesures réseau")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        if ROOT not in sys.path:
+            sys.path.insert(0, ROOT)
+        record(co2_urls() + rendement_urls())
+        return
+    failures = run_suite(args.pattern, args.repeat, args.output, args.reference, args.update_reference)
+    if failures:
+        print(f"{failures} régression(s) ou erreur(s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+MAX_ENTRIES = 512
+MAX_BYTES = 64 * 1024 * 1024
+
+#___________________________________
+# CLÉ CANONIQUE
+#___________________________________
+
+def _canonical(value):
+    """Forme JSON stable : dicts triés, nombres normalisés."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        # 30 et 30.0 donnent la même clé ; on arrondit le bruit des widgets flottants
+        return round(float(value), 9)
+    return value
+
+
+def canonical_key(allocations=None, **inputs):
+    """
+    Empreinte des entrées d'une simulation. Deux jeux d'entrées équivalents (ordre
+    des légumes, 30 contre 30.0, légume à 0 m²) donnent la même clé.
+    """
+    if allocations is not None:
+        inputs["allocations"] = {veg: surface for veg, surface in allocations.items() if surface}
+    text = json.dumps(_canonical(inputs), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+#___________________________________
+# CACHE LRU BORNÉ
+#___________________________________
+
+def estimate_size(value):
+    """Taille approximative (octets) : tableaux NumPy et DataFrames comptés pour leur contenu."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if hasattr(value, "to_plotly_json"):
+        # Figure Plotly : le poids vient des traces
+        return estimate_size(value.to_plotly_json())
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Résultats de simulation par clé canonique, partagés par toutes les sessions du processus.
+
+    Borné en nombre d'entrées et en octets estimés, avec éviction LRU. Les valeurs
+    sont rendues telles quelles : elles ne doivent pas être modifiées par l'appelant.
+    Compteurs : "hit", "miss", "evicted".
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.counts = {"hit": 0, "miss": 0, "evicted": 0}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self.entries:
+                self.counts["miss"] += 1
+                return default
+            self.entries.move_to_end(key)
+            self.counts["hit"] += 1
+            return self.entries[key][0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.counts["evicted"] += 1
+
+    def get_or_compute(self, key, compute):
+        """Valeur en cache, sinon `compute()` (calculée hors verrou : deux sessions peuvent la calculer en même temps)."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counts["hit"] + self.counts["miss"]
+            return {
+                **self.counts,
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "hit_rate": self.counts["hit"] / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,93 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+# Nombre de libellés distincts gardés en mémoire par fonction (quelques centaines en pratique)
+TAILLE_CACHE = 4096
+
+# Noms complets (majuscules sans accents) qui désignent une autre catégorie
+CATEGORIES_EXACTES = {
+    "POTIRON": "Potimarron",     # impactco2
+    "COURGE": "Butternut",       # impactco2 : la courge de référence est la butternut
+}
+
+# Mots-clés cherchés dans tout le nom (le premier trouvé l'emporte) ; à défaut, la catégorie est le premier mot
+CATEGORIES_MOTS_CLES = {
+    "BUTTERNUT": "Butternut",
+    "POTIMARRON": "Potimarron",
+    "POMME": "Pomme de terre",
+    "HARICOTS? VERTS?": "Haricots verts",
+}
+
+# Une seule expression compilée : le groupe trouvé donne l'indice de la catégorie
+MOTIF_CATEGORIES = re.compile("|".join(rf"(?P<c{i}>\b{motif}\b)" for i, motif in enumerate(CATEGORIES_MOTS_CLES)))
+_CATEGORIES = list(CATEGORIES_MOTS_CLES.values())
+
+ARTICLES = re.compile(r"^(la |le |l'|les )")
+MENTIONS_ORIGINE = re.compile(r" France biologique|France|biologique", re.IGNORECASE)
+
+#___________________________________
+# TEXTE
+#___________________________________
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def supprimer_accents(texte):
+    """Majuscules sans accents ni espaces de bord : « Pomme de terre » -> « POMME DE TERRE »."""
+    if not texte:
+        return ""
+    nfkd_form = unicodedata.normalize('NFKD', texte)
+    return "".join(c for c in nfkd_form if not unicodedata.combining(c)).upper().strip()
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def categorie(nom):
+    """Catégorie canonique d'un nom brut (produit RNM, recherche de graines, page impactco2)."""
+    cle = supprimer_accents(nom)
+    exacte = CATEGORIES_EXACTES.get(" ".join(cle.replace("-", " ").split()))
+    if exacte:
+        return exacte
+    trouve = MOTIF_CATEGORIES.search(cle)
+    if trouve:
+        return _CATEGORIES[int(trouve.lastgroup[1:])]
+    mots = cle.split()
+    return mots[0].capitalize() if mots else ""
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def analyser_produit(produit):
+    """
+    Décompose un libellé RNM « Tomate ronde France (le kg) » en (Categorie, Legume, Unite) :
+    ("Tomate", "Tomate ronde", "kg"). Unite vaut None si le libellé n'en indique pas.
+    """
+    morceaux = produit.split("(")
+    legume = MENTIONS_ORIGINE.sub("", morceaux[0].strip())
+    legume = " ".join(legume.split()).capitalize()
+    unite = None
+    if len(morceaux) > 1:
+        unite = ARTICLES.sub("", morceaux[1].replace(")", "").strip().lower())
+    return categorie(produit), legume, unite
+
+#___________________________________
+# COLONNES
+#___________________________________
+
+def categories(noms):
+    """Catégories d'une colonne de noms, calculées une fois par nom distinct."""
+    codes, uniques = pd.factorize(noms)
+    valeurs = pd.Series([categorie(nom) for nom in uniques] + [None], dtype=object)
+    return pd.Series(valeurs.to_numpy()[codes], index=noms.index, name=noms.name)
+
+
+def decomposer_produits(produits):
+    """Colonnes Categorie / Legume / Unite d'une colonne de libellés, analysés une fois par libellé distinct."""
+    codes, uniques = pd.factorize(produits)
+    lignes = [analyser_produit(produit) for produit in uniques] + [(None, None, None)]
+    table = pd.DataFrame(lignes, columns=["Categorie", "Legume", "Unite"])
+    # Le code -1 (libellé manquant) désigne la dernière ligne, vide
+    return table.iloc[codes].set_axis(produits.index)
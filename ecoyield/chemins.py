@@ -0,0 +1,32 @@
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+#___________________________________
+# RÉPERTOIRE DES DONNÉES
+#___________________________________
+
+# Sans dépendance : partagé par stockage (pandas/pyarrow), partage et la CLI (NumPy seul)
+DATA_DIR = "donnees"
+
+# Répertoire lu par le contexte courant : une version publiée (ecoyield.partage) ou DATA_DIR
+_data_dir = ContextVar("data_dir", default=None)
+
+
+def data_dir():
+    return _data_dir.get() or DATA_DIR
+
+
+@contextmanager
+def reading_from(path):
+    """Lit les fichiers Arrow de `path` au lieu de DATA_DIR, pour le thread (ou la tâche) en cours."""
+    token = _data_dir.set(path)
+    try:
+        yield path
+    finally:
+        _data_dir.reset(token)
+
+
+def working_dir():
+    """Vrai si l'on lit DATA_DIR lui-même : ses fichiers Arrow sont tirés des exports CSV du projet."""
+    return os.path.abspath(data_dir()) == os.path.abspath(DATA_DIR)
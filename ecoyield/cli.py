@@ -0,0 +1,148 @@
+import argparse
+import json
+import sys
+
+# Les modules de calcul (NumPy, ecoyield.scenarios) sont importés dans les commandes :
+# `eco-yield --help` ne charge rien, `simulate` et `batch` ne chargent ni streamlit ni
+# plotly, et pandas seulement s'il faut recalculer les coefficients ou l'investissement.
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+# Colonnes de la sortie CSV de `batch` (dans l'ordre), l'erreur en dernier
+CSV_FIELDS = (
+    "name", "surface", "allocated_m2", "years", "investment", "bank_rate", "garden_net",
+    "bank_value", "gap", "co2_kg", "kilos_per_year", "value_per_year", "error",
+)
+
+#___________________________________
+# COMMANDES
+#___________________________________
+
+def cmd_simulate(args):
+    from ecoyield.scenarios import Scenario, load_coefficients, load_investment_rule, parse_allocations, run_scenarios
+
+    try:
+        allocations = parse_allocations(args.alloc)
+    except ValueError as exc:
+        raise SystemExit(f"eco-yield simulate: {exc}")
+    scenario = Scenario("cli", allocations, args.surface, args.years, args.rate, args.investment)
+    record = next(run_scenarios([scenario], load_coefficients(args.data_dir), lambda: load_investment_rule(args.data_dir), series=True))
+    if "error" in record:
+        raise SystemExit(f"eco-yield simulate: {record['error']}")
+
+    if args.format == "json":
+        print(json.dumps(record, ensure_ascii=False))
+        return 0
+    print(f"Surface {record['allocated_m2']:g}/{record['surface']:g} m² · investissement {record['investment']:.0f} € · taux {record['bank_rate']:g} %")
+    print(f"{'Année':>5} {'Potager (Net)':>14} {'Placement Bancaire':>19} {'CO2 (kg)':>9}")
+    for year, (garden, bank, co2) in enumerate(zip(record["garden_net_by_year"], record["bank_value_by_year"], record["co2_by_year"])):
+        print(f"{year:>5} {garden:>14.0f} {bank:>19.0f} {co2:>9.0f}")
+    print(f"Valeur récolte / an : {record['value_per_year']:.0f} € · Production / an : {record['kilos_per_year']:.0f} kg · Écart avec le placement : {record['gap']:+.0f} €")
+    return 0
+
+
+def cmd_batch(args):
+    import csv
+    from itertools import chain
+    from ecoyield.scenarios import load_coefficients, load_investment_rule, read_scenarios, run_scenarios
+
+    defaults = {"surface": args.surface, "years": args.years, "rate": args.rate, "investment": args.investment}
+    scenarios = chain.from_iterable(read_scenarios(path, defaults) for path in args.files)
+    records = run_scenarios(
+        scenarios, load_coefficients(args.data_dir), lambda: load_investment_rule(args.data_dir),
+        chunk_size=args.chunk_size, series=args.series,
+    )
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    errors = 0
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(out, CSV_FIELDS, restval="", extrasaction="ignore")
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            write = lambda record: out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Écrit au fil du calcul : la mémoire ne dépend pas du nombre de scénarios
+        for n, record in enumerate(records, start=1):
+            errors += "error" in record
+            write(record)
+            if n % args.chunk_size == 0:
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if errors:
+        print(f"{errors} scénario(s) en erreur", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def cmd_legumes(args):
+    from ecoyield.scenarios import load_coefficients
+
+    coefs = load_coefficients(args.data_dir)
+    for i, name in enumerate(coefs.names):
+        print(f"{name:<25} {coefs.kg_m2[i]:>6.2f} kg/m² {coefs.price[i]:>6.2f} €/kg")
+    return 0
+
+#___________________________________
+# LIGNE DE COMMANDE
+#___________________________________
+
+def add_plan_options(parser, defaults):
+    parser.add_argument("--surface", type=float, default=defaults.get("surface"), help="surface totale (m²)")
+    parser.add_argument("--years", type=int, default=defaults.get("years"), help="durée de la simulation (années)")
+    parser.add_argument("--rate", type=float, default=defaults.get("rate"), help="taux du placement bancaire (%%)")
+    parser.add_argument("--investment", type=float, help="investissement initial (€ ; défaut : règle de l'app selon la surface)")
+
+
+def build_parser():
+    # Valeurs par défaut de l'app, répétées ici pour ne pas importer NumPy avant l'analyse des options
+    app_defaults = {"surface": 30, "years": 3, "rate": 1.7}
+
+    parser = argparse.ArgumentParser(prog="eco-yield", description="Simulation Eco-Yield sans interface (potager contre placement bancaire).")
+    parser.add_argument("--data-dir", help="répertoire des données (défaut : donnees/, version publiée)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulate = commands.add_parser("simulate", help="simule un plan", description="Simule un plan d'allocation et affiche le bilan annuel.")
+    simulate.add_argument("--alloc", required=True, help="surfaces par légume : Tomate=10,Carotte=5")
+    add_plan_options(simulate, app_defaults)
+    simulate.add_argument("--format", choices=("table", "json"), default="table")
+    simulate.set_defaults(handler=cmd_simulate)
+
+    batch = commands.add_parser(
+        "batch", help="simule des fichiers de scénarios",
+        description="Simule des scénarios JSON Lines, JSON ou CSV et écrit une ligne de résultat par scénario, au fil du calcul. "
+                    "Les options --surface, --years, --rate et --investment s'appliquent aux scénarios qui ne les précisent pas.",
+    )
+    batch.add_argument("files", nargs="+", metavar="FICHIER", help="scénarios (.jsonl, .json, .csv ; - pour l'entrée standard en JSON Lines)")
+    add_plan_options(batch, {"years": app_defaults["years"], "rate": app_defaults["rate"]})
+    batch.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    batch.add_argument("--output", default="-", help="fichier de sortie (défaut : sortie standard)")
+    batch.add_argument("--series", action="store_true", help="ajoute les séries annuelles (JSON Lines seulement)")
+    batch.add_argument("--chunk-size", type=int, default=1000, help="scénarios simulés par bloc")
+    batch.set_defaults(handler=cmd_batch)
+
+    legumes = commands.add_parser("legumes", help="liste les légumes disponibles")
+    legumes.set_defaults(handler=cmd_legumes)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "series", False) and args.format == "csv":
+        parser.error("--series n'est disponible qu'en JSON Lines")
+    try:
+        return args.handler(args)
+    except FileNotFoundError as exc:
+        raise SystemExit(f"eco-yield: {exc}")
+    except BrokenPipeError:
+        # Sortie coupée (| head) : arrêt silencieux
+        sys.stderr.close()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import os
+import numpy as np
+from ecoyield import chemins
+from ecoyield.simulation import (
+    Coefficients, CropCalendar, DEFAULT_KEYS, DAYS_PER_MONTH, DAYS_PER_WEEK,
+    DEFAULT_SOWING_MONTH, HARVEST_MONTHS, MONTHS_PER_YEAR,
+)
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+# Table précalculée au build (étape "coefficients" du pipeline), lue en mémoire mappée
+COEFFICIENTS_FILE = "coefficients.npy"
+
+# Un enregistrement par légume, dans les unités attendues par ecoyield.simulation
+COEFFICIENT_DTYPE = np.dtype([
+    ("name", "U40"),
+    ("yield", np.float64),   # rendement (kg/m²/an)
+    ("price", np.float64),   # prix de marché (€/kg)
+    ("co2", np.float64),     # CO2 évité (kg/kg)
+    ("water", np.float64),   # coût de l'eau (€/m²/an)
+    ("seeds", np.float64),   # coût des graines (€/m²/an)
+])
+
+# Légume absent de DIM_Legume : durée de culture par défaut (jours)
+DEFAULT_CYCLE_DAYS = 120
+
+#___________________________________
+# CONSTRUCTION
+#___________________________________
+
+def coefficients_path():
+    """Fichier des coefficients dans le répertoire de données lu (DATA_DIR ou version publiée)."""
+    return os.path.join(chemins.data_dir(), COEFFICIENTS_FILE)
+
+
+def table_from_fact(df_fact):
+    """Calcule la table des coefficients à partir de FACT_potager, sans boucle sur les lignes."""
+    table = np.zeros(len(df_fact), dtype=COEFFICIENT_DTYPE)
+    kg_m2 = df_fact['Rendement_kg_m2'].to_numpy(dtype=np.float64)
+    # CO2_Economise_m2 est en g/m² : on le ramène en kg par kg récolté
+    co2_kg_m2 = df_fact['CO2_Economise_m2'].to_numpy(dtype=np.float64) / 1000
+
+    table["name"] = df_fact['Nom_Legume'].astype(str).str.strip().to_numpy()
+    table["yield"] = kg_m2
+    table["price"] = df_fact['Prix_Marche_kg'].to_numpy(dtype=np.float64)
+    table["co2"] = np.divide(co2_kg_m2, kg_m2, out=np.zeros_like(kg_m2), where=kg_m2 > 0)
+    table["water"] = df_fact['Cout_Eau_m2'].to_numpy(dtype=np.float64)
+    table["seeds"] = df_fact['Prix_graine'].to_numpy(dtype=np.float64)
+    return table
+
+
+def table_from_dict(vegetable_data, keys=DEFAULT_KEYS):
+    """Table des coefficients à partir d'un dictionnaire {légume: {champ: valeur}} (valeurs par défaut des apps)."""
+    table = np.zeros(len(vegetable_data), dtype=COEFFICIENT_DTYPE)
+    table["name"] = list(vegetable_data.keys())
+    for field, key in zip(DEFAULT_KEYS, keys):
+        table[field] = [float(values[key]) for values in vegetable_data.values()]
+    return table
+
+
+def build_coefficients():
+    """Étape du pipeline : précalcule la table depuis FACT_potager et l'écrit de façon atomique."""
+    from ecoyield import stockage
+
+    table = table_from_fact(stockage.read_frame("FACT_potager"))
+    path = coefficients_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, table)
+    os.replace(tmp, path)
+    print(f"Coefficients précalculés ({len(table)} légumes) -> {path}")
+
+#___________________________________
+# CHARGEMENT (LECTURE SEULE)
+#___________________________________
+
+def load_coefficient_table(fallback=None, keys=DEFAULT_KEYS):
+    """
+    Charge la table précalculée en mémoire mappée. À défaut, la calcule depuis
+    FACT_potager, puis depuis le dictionnaire `fallback`. Le tableau renvoyé est
+    en lecture seule : il peut être partagé entre toutes les sessions.
+
+    Avec la table précalculée, seul NumPy est chargé (démarrage rapide de la CLI) :
+    pandas et pyarrow ne sont importés que pour la recalculer.
+    """
+    path = coefficients_path()
+    if os.path.exists(path):
+        return np.load(path, mmap_mode="r")
+    from ecoyield import stockage
+
+    if stockage.exists("FACT_potager"):
+        table = table_from_fact(stockage.read_frame("FACT_potager"))
+    else:
+        table = table_from_dict(fallback or {}, keys)
+    table.setflags(write=False)
+    return table
+
+
+def coefficients_from_table(table, names=None):
+    """Coefficients (tableaux contigus en lecture seule) pour `names`, dans cet ordre (défaut : toute la table)."""
+    if names is not None:
+        index = {name: i for i, name in enumerate(table["name"].tolist())}
+        table = table[[index[name] for name in names]]
+
+    def column(field):
+        values = np.ascontiguousarray(table[field], dtype=np.float64)
+        values.setflags(write=False)
+        return values
+
+    return Coefficients(
+        tuple(table["name"].tolist()),
+        column("yield"), column("price"), column("co2"), column("water"), column("seeds"),
+    )
+
+
+def select(coefs, names):
+    """Sous-ensemble de `coefs` restreint à `names`, dans cet ordre."""
+    index = {name: i for i, name in enumerate(coefs.names)}
+    rows = [index[name] for name in names]
+    return Coefficients(tuple(names), *(field[rows] for field in coefs[1:]))
+
+
+#___________________________________
+# CALENDRIER DE CULTURE
+#___________________________________
+
+def load_crop_calendar(coefs, price_index=None):
+    """
+    Calendrier de culture aligné sur `coefs` pour simulate_monthly : Recolte_jours
+    et Eau_Hebdo_L_m2 de DIM_Legume, dernier prix de l'eau de Prix_eau, facteurs
+    saisonniers de `price_index` (ecoyield.prix.PriceIndex).
+
+    Sans donnée, un légume garde un cycle de DEFAULT_CYCLE_DAYS jours, son coût
+    d'eau annuel (`coefs.water`) réparti sur ses semaines de culture et un prix
+    constant toute l'année.
+    """
+    from ecoyield import stockage
+
+    names = list(coefs.names)
+    n = len(names)
+    cycle = np.full(n, float(DEFAULT_CYCLE_DAYS))
+    water_week = np.full(n, np.nan)
+
+    if stockage.exists("DIM_Legume") and stockage.exists("Prix_eau"):
+        dim = stockage.read_frame("DIM_Legume")
+        dim = dim.assign(Nom_Legume=dim['Nom_Legume'].astype(str)).drop_duplicates('Nom_Legume').set_index('Nom_Legume')
+        rows = dim.reindex(names)
+        prix_m3 = float(stockage.read_frame("Prix_eau").sort_values('Annee')['Prix_m3'].iloc[-1])
+        cycle = rows['Recolte_jours'].fillna(DEFAULT_CYCLE_DAYS).to_numpy(dtype=np.float64)
+        water_week = rows['Eau_Hebdo_L_m2'].to_numpy(dtype=np.float64) * prix_m3 / 1000
+
+    season_weeks = (cycle + HARVEST_MONTHS * DAYS_PER_MONTH) / DAYS_PER_WEEK
+    water_week = np.where(np.isnan(water_week), coefs.water / season_weeks, water_week)
+
+    factors = np.ones((MONTHS_PER_YEAR, n))
+    if price_index is not None:
+        known = [i for i, name in enumerate(names) if name in price_index.columns]
+        if known:
+            factors[:, known] = price_index.seasonal_factors([names[i] for i in known])
+
+    return CropCalendar(cycle, water_week, np.full(n, DEFAULT_SOWING_MONTH), factors)
+
+
+if __name__ == "__main__":
+    build_coefficients()
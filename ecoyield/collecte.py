@@ -0,0 +1,364 @@
+import asyncio
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from ecoyield.pipeline import function_hash
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+HEURE = 3600
+JOUR = 24 * HEURE
+
+
+class HostPolicy(NamedTuple):
+    """
+    Règles par hôte (source) : requêtes simultanées, débit moyen (req/s), rafale
+    autorisée et durée (s) pendant laquelle une réponse en cache est réutilisée
+    sans interroger le site. Au-delà, elle est revalidée (ETag / Last-Modified).
+    """
+    concurrency: int = 4
+    rate: float = 2.0
+    burst: int = 2
+    ttl: float = JOUR
+
+
+DEFAULT_POLICY = HostPolicy()
+
+HOST_POLICIES = {
+    "grainesdefolie.com": HostPolicy(concurrency=2, rate=2.0, burst=2, ttl=7 * JOUR),
+    "impactco2.fr": HostPolicy(concurrency=3, rate=3.0, burst=3, ttl=30 * JOUR),
+    "www.eaufrance.fr": HostPolicy(concurrency=2, rate=2.0, burst=2, ttl=30 * JOUR),
+    "webstat.banque-france.fr": HostPolicy(concurrency=4, rate=5.0, burst=4, ttl=12 * HEURE),
+    "rnm.franceagrimer.fr": HostPolicy(concurrency=4, rate=4.0, burst=4, ttl=12 * HEURE),
+}
+
+USER_AGENT = "Mozilla/5.0"
+TIMEOUT = 10
+POOL_SIZE = 16
+
+# Réponses temporaires (trop de requêtes, serveur indisponible) : nouvel essai après
+# BACKOFF s, doublé à chaque fois, ou après le Retry-After du site (borné à MAX_RETRY_AFTER)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+RETRIES = 3
+BACKOFF = 1.0
+MAX_RETRY_AFTER = 60
+
+# Cache disque des réponses HTTP (SQLite : partagé sans risque entre étapes parallèles)
+CACHE_FILE = ".cache_http.sqlite"
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Résultats d'analyse en cache : clés liées au source du module de l'analyseur (ecoyield.pipeline.function_hash).
+# À incrémenter quand l'analyse change hors de ce module (ecoyield.canonique, ecoyield.unites, BeautifulSoup...)
+PARSER_VERSION = 1
+
+#___________________________________
+# LIMITEUR DE DÉBIT
+#___________________________________
+
+class TokenBucket:
+    """Seau à jetons : `rate` jetons par seconde, au plus `burst` en réserve."""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # Le verrou sert les demandeurs dans l'ordre d'arrivée
+        async with self.lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+#___________________________________
+# CACHE DES RÉPONSES
+#___________________________________
+
+class CacheEntry(NamedTuple):
+    url: str
+    status: int
+    headers: dict
+    body: bytes
+    stored: float
+    parsed: dict      # résultats d'analyse déjà calculés sur ce corps, par analyseur
+
+
+def cache_key(url, params=None):
+    """Clé canonique : URL + paramètres triés."""
+    canonical = json.dumps([url, sorted((str(k), str(v)) for k, v in (params or {}).items())])
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def cached_response(entry):
+    """Reconstruit une `requests.Response` à partir d'une entrée du cache."""
+    response = requests.Response()
+    response.url = entry.url
+    response.status_code = entry.status
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = entry.body
+    return response
+
+
+class ResponseCache:
+    """
+    Cache disque des réponses 200, borné à `max_bytes` avec éviction LRU.
+
+    Compteurs par source (hôte) :
+    - "hit"         : réponse encore fraîche (TTL), aucune requête envoyée
+    - "revalidated" : le site a répondu 304, le corps en cache est réutilisé
+    - "miss"        : corps téléchargé (absent, modifié ou sans validateur)
+    - "evicted"     : entrées supprimées pour respecter la taille maximale
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY, source TEXT, url TEXT, status INTEGER,
+                    headers TEXT, body BLOB, parsed BLOB, size INTEGER,
+                    stored REAL, accessed REAL
+                )""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed)")
+
+    def count(self, source, event, n=1):
+        self.stats.setdefault(source, Counter())[event] += n
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url, status, headers, body, stored, parsed FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self.db:
+                self.db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        url, status, headers, body, stored, parsed = row
+        return CacheEntry(url, status, json.loads(headers), body, stored, pickle.loads(parsed))
+
+    def put(self, key, source, response):
+        body = response.content
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, source, response.url, response.status_code, json.dumps(dict(response.headers)),
+                 body, pickle.dumps({}), len(body), now, now),
+            )
+            self._evict(source)
+
+    def touch(self, key):
+        """Réponse revalidée (304) : elle redevient fraîche pour un nouveau TTL."""
+        with self.lock, self.db:
+            self.db.execute("UPDATE responses SET stored = ? WHERE key = ?", (time.time(), key))
+
+    def store_parsed(self, key, parser, value):
+        with self.lock:
+            row = self.db.execute("SELECT parsed FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            parsed = pickle.loads(row[0])
+            parsed[parser] = value
+            with self.db:
+                self.db.execute("UPDATE responses SET parsed = ? WHERE key = ?", (pickle.dumps(parsed), key))
+
+    def _evict(self, source):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        if evicted:
+            self.count(source, "evicted", evicted)
+
+    def report(self):
+        for source, counts in sorted(self.stats.items()):
+            details = ", ".join(f"{counts[e]} {e}" for e in ("hit", "revalidated", "miss", "evicted") if counts[e])
+            print(f"Cache HTTP {source} : {details}")
+
+    def close(self):
+        self.db.close()
+
+#___________________________________
+# CLIENT HTTP PARTAGÉ
+#___________________________________
+
+class Collector:
+    """
+    Client HTTP asynchrone partagé par les collectes.
+
+    Les requêtes passent par une `requests.Session` unique (connexions réutilisées,
+    `pool_size` connexions par hôte) exécutée dans un pool de threads ; la boucle
+    asyncio ne fait qu'ordonnancer. Chaque hôte a son sémaphore et son seau à jetons :
+    des hôtes différents avancent en parallèle, un même hôte n'est jamais surchargé.
+    """
+
+    def __init__(self, policies=None, default=DEFAULT_POLICY, pool_size=POOL_SIZE,
+                 timeout=TIMEOUT, headers=None, session=None, cache_path=CACHE_FILE,
+                 cache_max_bytes=CACHE_MAX_BYTES, retries=RETRIES, backoff=BACKOFF):
+        self.policies = HOST_POLICIES if policies is None else policies
+        self.default = default
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT, **(headers or {})})
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="collecte")
+        self.limits = {}
+        self.cache = ResponseCache(cache_path, cache_max_bytes) if cache_path else None
+
+    def policy(self, host):
+        return self.policies.get(host, self.default)
+
+    def _limits(self, host):
+        if host not in self.limits:
+            policy = self.policy(host)
+            self.limits[host] = (asyncio.Semaphore(policy.concurrency), TokenBucket(policy.rate, policy.burst))
+        return self.limits[host]
+
+    async def _send(self, url, params, headers, timeout):
+        """
+        GET poli : attend un créneau de l'hôte puis un jeton avant d'envoyer la requête.
+        Une réponse 429/5xx ou une connexion coupée est retentée `retries` fois ; le
+        créneau est rendu pendant l'attente et chaque essai reprend un jeton.
+        """
+        semaphore, bucket = self._limits(urlsplit(url).netloc)
+        request = partial(self.session.get, url, params=params, headers=headers,
+                          timeout=timeout or self.timeout)
+        for attempt in range(self.retries + 1):
+            async with semaphore:
+                await bucket.acquire()
+                try:
+                    response = await asyncio.get_running_loop().run_in_executor(self.executor, request)
+                except requests.ConnectionError:
+                    if attempt == self.retries:
+                        raise
+                    response = None
+            if response is not None and response.status_code not in RETRY_STATUS or attempt == self.retries:
+                return response
+            await asyncio.sleep(self._delay(response, attempt))
+
+    def _delay(self, response, attempt):
+        """Attente avant un nouvel essai : Retry-After (en secondes) s'il est donné, sinon recul exponentiel."""
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.strip().isdigit():
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        return self.backoff * 2 ** attempt
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        """
+        GET avec cache : une réponse fraîche est servie sans requête, une réponse
+        expirée est revalidée par requête conditionnelle. `response.from_cache`
+        indique si le corps renvoyé est celui du cache (inchangé).
+        """
+        if self.cache is None:
+            response = await self._send(url, params, headers, timeout)
+            response.from_cache = False
+            return response
+
+        source = urlsplit(url).netloc
+        key = cache_key(url, params)
+        entry = self.cache.get(key)
+        if entry is not None and time.time() - entry.stored < self.policy(source).ttl:
+            self.cache.count(source, "hit")
+            return self._from_cache(entry)
+
+        conditional = dict(headers or {})
+        if entry is not None:
+            if "ETag" in entry.headers:
+                conditional["If-None-Match"] = entry.headers["ETag"]
+            if "Last-Modified" in entry.headers:
+                conditional["If-Modified-Since"] = entry.headers["Last-Modified"]
+
+        response = await self._send(url, params, conditional, timeout)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key)
+            self.cache.count(source, "revalidated")
+            return self._from_cache(entry)
+
+        self.cache.count(source, "miss")
+        if response.status_code == 200:
+            self.cache.put(key, source, response)
+        response.from_cache = False
+        return response
+
+    def _from_cache(self, entry):
+        response = cached_response(entry)
+        response.from_cache = True
+        response.parsed = entry.parsed
+        return response
+
+    async def parse(self, url, parser, *args, params=None, headers=None, timeout=None):
+        """
+        Télécharge `url` et renvoie `parser(response, *args)`. Si la page n'a pas
+        changé depuis la dernière analyse (cache frais ou 304), le résultat déjà
+        calculé est réutilisé : seules les pages modifiées sont ré-analysées.
+        """
+        response = await self.get(url, params, headers, timeout)
+        # Le nom inclut l'empreinte du module de l'analyseur : modifier l'analyse invalide les résultats en cache
+        name = f"{parser.__module__}.{parser.__qualname__}:{function_hash(parser, PARSER_VERSION)}{args!r}"
+        if response.from_cache and name in response.parsed:
+            return response.parsed[name]
+
+        value = parser(response, *args)
+        if self.cache is not None and response.status_code == 200:
+            self.cache.store_parsed(cache_key(url, params), name, value)
+        return value
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.report()
+            self.cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+def collect(coroutine_function, *args, **collector_options):
+    """Exécute `coroutine_function(collector, *args)` dans sa propre boucle et renvoie son résultat."""
+    async def main():
+        async with Collector(**collector_options) as collector:
+            return await coroutine_function(collector, *args)
+    return asyncio.run(main())
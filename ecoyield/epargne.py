@@ -0,0 +1,150 @@
+import numpy as np
+from typing import NamedTuple
+from ecoyield import stockage
+from ecoyield.previsions import ajuster, prevoir, serie_inflation
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+RATES_TABLE = "Taux_bancaires_clean"
+
+PRODUCTS = ("Livret_A", "LDDS", "LEP")
+LABELS = {"Livret_A": "Livret A", "LDDS": "LDDS", "LEP": "LEP"}
+
+# Plafonds de dépôt (€) : au-delà, l'excédent ne rapporte rien
+CEILINGS = {"Livret_A": 22950.0, "LDDS": 12000.0, "LEP": 10000.0}
+
+MONTHS_PER_YEAR = 12
+FORTNIGHTS_PER_MONTH = 2
+FORTNIGHTS_PER_YEAR = MONTHS_PER_YEAR * FORTNIGHTS_PER_MONTH
+
+#___________________________________
+# HISTORIQUE DES TAUX
+#___________________________________
+
+class RateHistory(NamedTuple):
+    """Taux mensuels (%/an) des livrets et inflation sur un an (%), avec le modèle de prévision de l'inflation."""
+    start: np.datetime64       # premier mois
+    products: tuple
+    rates: np.ndarray          # (mois, produits)
+    inflation: np.ndarray      # (mois,) NaN quand l'Insee n'a pas encore publié
+    inflation_model: object    # ecoyield.previsions.Modele, ou None
+
+    @property
+    def end(self):
+        return self.start + len(self.rates) - 1
+
+
+def load_rate_history(table=RATES_TABLE, products=PRODUCTS):
+    """Lit Taux_bancaires_clean une fois ; un taux manquant reprend le précédent."""
+    df = stockage.read_frame(table).sort_values('time_period_end')
+    months = df['time_period_end'].to_numpy().astype("datetime64[M]")
+    start = months.min()
+    rows = (months - start).astype(np.int64)
+
+    rates = np.full((rows.max() + 1, len(products)), np.nan)
+    inflation = np.full(rows.max() + 1, np.nan)
+    rates[rows] = df[list(products)].to_numpy(dtype=np.float64)
+    inflation[rows] = df['Inflation'].to_numpy(dtype=np.float64)
+    # Report du dernier taux connu (les taux réglementés changent rarement)
+    last = np.maximum.accumulate(np.where(np.isnan(rates), 0, np.arange(len(rates))[:, None]), axis=0)
+    rates = np.nan_to_num(rates[last, np.arange(len(products))])
+
+    t, valeurs, options = serie_inflation(df)
+    model = ajuster(t, valeurs, **options) if len(valeurs) else None
+    return RateHistory(start, tuple(products), rates, inflation, model)
+
+
+def rate_paths(history, start, n_months, shifts=(0.0,)):
+    """
+    Taux (scénarios × produits × mois) et inflation (mois,) à partir de `start`.
+
+    Les mois couverts par l'historique prennent les taux observés ; au-delà, le
+    dernier taux connu décalé de `shifts` points (un scénario par décalage, plancher 0).
+    L'inflation non publiée vient du modèle de prévision (ecoyield.previsions).
+    """
+    offsets = (np.datetime64(start, "M") - history.start).astype(np.int64) + np.arange(n_months)
+    known = (offsets >= 0) & (offsets < len(history.rates))
+    rates = history.rates[np.clip(offsets, 0, len(history.rates) - 1)].T
+    shifts = np.asarray(shifts, dtype=np.float64)
+    paths = np.where(known, rates, np.maximum(rates + shifts[:, None, None], 0.0))
+
+    observed = np.where(known, history.inflation[np.clip(offsets, 0, len(history.rates) - 1)], np.nan)
+    if history.inflation_model is not None:
+        t = (history.start - np.datetime64("1970-01", "M")).astype(np.int64) + offsets
+        observed = np.where(np.isnan(observed), prevoir(history.inflation_model, t), observed)
+    return paths, np.nan_to_num(observed)
+
+
+def start_choices(history):
+    """
+    Débuts de placement proposés par les applications : {libellé: mois}. Le premier
+    (défaut) suit le dernier taux connu ; les autres sont les 1er janvier de
+    l'historique, qui rejouent les taux observés puis enchaînent sur les taux futurs.
+    """
+    first = history.end + 1
+    choices = {f"Après le dernier taux connu ({first.astype(object):%m/%Y})": first}
+    first_year = history.start.astype("datetime64[Y]").astype(int) + 1970
+    last_year = history.end.astype("datetime64[Y]").astype(int) + 1970
+    for year in range(last_year, first_year - 1, -1):
+        choices[f"Janvier {year}"] = np.datetime64(f"{year}-01", "M")
+    return choices
+
+#___________________________________
+# CAPITALISATION PAR QUINZAINE
+#___________________________________
+
+class SavingsResult(NamedTuple):
+    """Valeur acquise des livrets, du mois 0 (dépôt) au mois M inclus."""
+    products: tuple
+    shifts: np.ndarray       # (S,) écart appliqué aux taux futurs (points)
+    months: np.ndarray       # 0..M
+    nominal: np.ndarray      # (S, P, M + 1) € courants
+    real: np.ndarray         # (S, P, M + 1) € constants du mois 0
+    rates: np.ndarray        # (S, P, M) taux appliqués (%/an)
+
+
+def simulate_savings(amount, n_months, history, start=None, shifts=(0.0,)):
+    """
+    Place `amount` sur chaque livret pendant `n_months` mois, pour chaque scénario de taux.
+
+    Règle des quinzaines : le dépôt du 1er du mois rapporte à partir du 16 ; chaque
+    quinzaine rapporte taux / 24 du solde (intérêts simples dans l'année), et les
+    intérêts sont capitalisés au 31 décembre. La valeur acquise inclut les intérêts
+    courus de l'année en cours. Le dépôt est limité au plafond de chaque livret.
+    `start` vaut par défaut le mois qui suit le dernier taux connu ; une date passée
+    rejoue l'historique.
+    """
+    start = history.end + 1 if start is None else np.datetime64(start, "M")
+    rates, inflation = rate_paths(history, start, n_months, shifts)
+    n_scenarios, n_products, _ = rates.shape
+
+    # Grille des quinzaines : taux du mois, première quinzaine improductive
+    per_fortnight = np.repeat(rates, FORTNIGHTS_PER_MONTH, axis=-1) / 100 / FORTNIGHTS_PER_YEAR
+    per_fortnight[..., 0] = 0.0
+    calendar_month = start.astype(np.int64) % MONTHS_PER_YEAR
+    year = (calendar_month + np.arange(n_months * FORTNIGHTS_PER_MONTH) // FORTNIGHTS_PER_MONTH) // MONTHS_PER_YEAR
+
+    # Intérêts courus depuis le 1er janvier, et facteur des années déjà capitalisées
+    accrued = np.cumsum(per_fortnight, axis=-1)
+    year_start = np.searchsorted(year, np.arange(year[-1] + 1))
+    accrued_before = np.concatenate((np.zeros((n_scenarios, n_products, 1)), accrued), axis=-1)[..., year_start]
+    in_year = accrued - accrued_before[..., year]
+    year_growth = 1 + np.diff(np.concatenate((accrued_before, accrued[..., -1:]), axis=-1), axis=-1)
+    capitalised = np.concatenate((np.ones((n_scenarios, n_products, 1)), np.cumprod(year_growth, axis=-1)), axis=-1)
+    factor = capitalised[..., year] * (1 + in_year)
+
+    deposit = np.minimum(amount, np.array([CEILINGS.get(p, np.inf) for p in history.products]))[:, None]
+    month_end = factor[..., FORTNIGHTS_PER_MONTH - 1::FORTNIGHTS_PER_MONTH]
+    nominal = np.concatenate((np.ones((n_scenarios, n_products, 1)), month_end), axis=-1) * deposit + (amount - deposit)
+
+    price_level = np.concatenate(([1.0], np.cumprod((1 + inflation / 100) ** (1 / MONTHS_PER_YEAR))))
+    return SavingsResult(
+        products=history.products,
+        shifts=np.asarray(shifts, dtype=np.float64),
+        months=np.arange(n_months + 1),
+        nominal=nominal,
+        real=nominal / price_level,
+        rates=rates,
+    )
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import numpy as np
+from typing import NamedTuple
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+# Au-delà, une série est réduite (min/max par paquet) avant l'envoi au navigateur
+MAX_POINTS = 400
+
+# Décimales gardées dans les séries envoyées (centimes, années au mois près)
+DECIMALS = 3
+
+COMPONENT_DIR = os.path.join(os.path.dirname(__file__), "composants", "graphique")
+
+#___________________________________
+# RÉDUCTION DES SÉRIES
+#___________________________________
+
+def downsample(x, y, max_points=MAX_POINTS):
+    """
+    Réduit une série à `max_points` points au plus : dans chaque paquet de points
+    consécutifs, on garde le minimum et le maximum (dans l'ordre), ce qui préserve
+    l'enveloppe et les pics. Le premier et le dernier point sont toujours gardés.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= max_points:
+        return x, y
+    buckets = max(1, (max_points - 2) // 2)
+    size = -(-(n - 2) // buckets)
+    inner = y[1:n - 1]
+    # Paquets de même taille, complétés par la dernière valeur
+    padded = np.concatenate((inner, np.full(buckets * size - len(inner), inner[-1])))
+    blocks = np.where(np.isnan(padded), np.nanmean(inner), padded).reshape(buckets, size)
+    offsets = np.arange(buckets)[:, None] * size + 1
+    picks = np.sort(np.stack((blocks.argmin(axis=1), blocks.argmax(axis=1)), axis=1) + offsets, axis=1)
+    keep = np.unique(np.concatenate(([0], np.minimum(picks.ravel(), n - 2), [n - 1])))
+    return x[keep], y[keep]
+
+
+def _to_list(values):
+    """Valeurs JSON compactes : arrondies, NaN -> null."""
+    values = np.round(np.asarray(values, dtype=np.float64), DECIMALS)
+    return [None if np.isnan(v) else (int(v) if v.is_integer() else v) for v in values.tolist()]
+
+#___________________________________
+# GABARIT ET MISES À JOUR
+#___________________________________
+
+class ChartTemplate(NamedTuple):
+    """Styles des traces (sans données) et mise en page : envoyés une fois par session."""
+    trace_ids: tuple
+    traces: list
+    layout: dict
+
+    @property
+    def key(self):
+        text = json.dumps([self.traces, self.layout], sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def template_from_figure(fig, trace_ids):
+    """
+    Gabarit à partir d'une figure Plotly construite sans données : une trace par
+    identifiant, dans cet ordre (l'ordre compte pour les remplissages « tonexty »).
+    """
+    spec = fig.to_plotly_json()
+    traces = [{k: v for k, v in trace.items() if k not in ("x", "y")} for trace in spec["data"]]
+    layout = {k: v for k, v in spec["layout"].items() if k != "template"}
+    return ChartTemplate(tuple(trace_ids), json.loads(json.dumps(traces, default=str)), json.loads(json.dumps(layout, default=str)))
+
+
+def add_series(fig, template, series):
+    """Ajoute les séries à une figure Plotly avec les styles du gabarit (affichage par st.plotly_chart)."""
+    import plotly.graph_objects as go
+
+    for trace_id, trace in zip(template.trace_ids, template.traces):
+        if trace_id in series:
+            values = series[trace_id]
+            style = {k: v for k, v in trace.items() if k != "type"}
+            if len(values) > 2:
+                style["name"] = values[2]
+            fig.add_trace(go.Scatter(x=values[0], y=values[1], **style))
+    return fig
+
+
+class ChartState:
+    """Ce que le navigateur a déjà reçu pour un graphique (par session)."""
+
+    def __init__(self):
+        self.reset()
+        self.resync = None
+
+    def reset(self):
+        self.template_key = None
+        self.digests = {}
+
+    def payload(self, template, series, max_points=MAX_POINTS):
+        """
+        Message pour le composant : le gabarit s'il n'a pas encore été envoyé, les
+        séries qui ont changé, et la liste des traces visibles.
+        `series` : {identifiant: (x, y)} ou (x, y, nom) pour renommer une trace ;
+        les identifiants absents du gabarit sont ignorés.
+        """
+        message = {"key": template.key, "visible": [i for i in template.trace_ids if i in series], "patch": {}}
+        if template.key != self.template_key:
+            message["template"] = {"ids": list(template.trace_ids), "traces": template.traces, "layout": template.layout}
+            self.template_key = template.key
+            self.digests = {}
+        for trace_id, values in series.items():
+            if trace_id not in template.trace_ids:
+                continue
+            x, y = downsample(values[0], values[1], max_points)
+            trace = {"x": _to_list(x), "y": _to_list(y)}
+            if len(values) > 2:
+                trace["name"] = values[2]
+            digest = hashlib.sha256(json.dumps(trace).encode()).hexdigest()
+            if self.digests.get(trace_id) != digest:
+                message["patch"][trace_id] = trace
+                self.digests[trace_id] = digest
+        return message
+
+#___________________________________
+# COMPOSANT STREAMLIT
+#___________________________________
+
+_component = None
+
+
+def live_chart(template, series, key, height=450, max_points=MAX_POINTS):
+    """
+    Graphique persistant dans le navigateur : seules les séries modifiées sont
+    envoyées à chaque rerun (quelques centaines d'octets au lieu de la figure).
+    Si le composant a perdu son état (iframe recréée), il demande un renvoi complet.
+    """
+    global _component
+    import streamlit as st
+    import streamlit.components.v1 as components
+
+    if _component is None:
+        _component = components.declare_component("graphique_live", path=COMPONENT_DIR)
+
+    state = st.session_state.setdefault(f"{key}__state", ChartState())
+    request = st.session_state.get(key)
+    if isinstance(request, dict) and request.get("resync") != state.resync:
+        state.resync = request.get("resync")
+        state.reset()
+    return _component(data=state.payload(template, series, max_points), height=height, key=key, default=None)
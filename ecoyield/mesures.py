@@ -0,0 +1,227 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+# Instrumentation désactivée par défaut : ECOYIELD_METRICS=1 l'active pour tout le processus
+ENV_FLAG = "ECOYIELD_METRICS"
+# Port optionnel d'un point d'accès /metrics (texte Prometheus) et /metrics.json
+ENV_PORT = "ECOYIELD_METRICS_PORT"
+# Adresse d'écoute de ce point d'accès : la machine locale, sauf adresse donnée explicitement
+ENV_HOST = "ECOYIELD_METRICS_HOST"
+DEFAULT_HOST = "127.0.0.1"
+
+LOG_EVENT = "ecoyield_rerun"
+
+
+def enabled_by_env():
+    return os.environ.get(ENV_FLAG, "").lower() in ("1", "true", "yes")
+
+#___________________________________
+# MESURES D'UN RERUN
+#___________________________________
+
+class RunRecord:
+    """Durées des étapes d'un rerun (ou d'un fragment relancé seul)."""
+
+    def __init__(self, scope, session, rerun):
+        self.scope = scope
+        self.session = session
+        self.rerun = rerun
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.total_ms = None
+
+    def as_dict(self):
+        return {
+            "scope": self.scope,
+            "session": self.session,
+            "rerun": self.rerun,
+            "total_ms": self.total_ms,
+            "stages_ms": {name: round(ms, 3) for name, ms in self.stages.items()},
+        }
+
+
+_current_run = ContextVar("current_run", default=None)
+
+
+class Metrics:
+    """
+    Mesures du processus : durées par étape (nombre, total, max), reruns par portée
+    et sources de statistiques enregistrées (compteurs des caches). Une seule instance
+    par processus, partagée par toutes les sessions.
+
+    Les minuteries ne mesurent qu'à l'intérieur d'un `run` actif : hors instrumentation,
+    `timer` rend un contexte vide et ne coûte presque rien.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.stages = {}
+        self.reruns = Counter()
+        self.sessions = set()
+        self.sources = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def register(self, name, stats):
+        """`stats()` est appelée à chaque export (ex. ResultCache.stats)."""
+        self.sources[name] = stats
+
+    @contextmanager
+    def run(self, scope, session_state=None, enabled=True):
+        """
+        Mesure un rerun complet ou un fragment relancé seul. Un run imbriqué (fragment
+        exécuté pendant le rerun complet) est compté comme une étape du run englobant.
+        `session_state` (dict de la session) garde l'identifiant et les reruns de la session.
+        À la fin du run le plus externe, une ligne JSON est écrite sur la sortie.
+        """
+        outer = _current_run.get()
+        if not enabled or outer is not None:
+            with self.timer(scope) if outer is not None else nullcontext():
+                yield outer
+            return
+
+        session, rerun = None, None
+        if session_state is not None:
+            session = session_state.setdefault("metrics_session", uuid.uuid4().hex[:8])
+            reruns = session_state.setdefault("metrics_reruns", Counter())
+            reruns[scope] += 1
+            rerun = reruns[scope]
+        record = RunRecord(scope, session, rerun)
+        token = _current_run.set(record)
+        try:
+            yield record
+        finally:
+            _current_run.reset(token)
+            record.total_ms = round((time.perf_counter() - record.start) * 1000, 3)
+            with self.lock:
+                self.reruns[scope] += 1
+                if session:
+                    self.sessions.add(session)
+            self._add_stage(f"run:{scope}", record.total_ms)
+            self.log(record)
+
+    def timer(self, stage):
+        record = _current_run.get()
+        if record is None:
+            return nullcontext()
+        return self._timed(record, stage)
+
+    @contextmanager
+    def _timed(self, record, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            record.stages[stage] = record.stages.get(stage, 0.0) + ms
+            self._add_stage(stage, ms)
+
+    def _add_stage(self, stage, ms):
+        with self.lock:
+            count, total, worst = self.stages.get(stage, (0, 0.0, 0.0))
+            self.stages[stage] = (count + 1, total + ms, max(worst, ms))
+
+    def current(self):
+        return _current_run.get()
+
+    #___________________________________
+    # EXPORT
+    #___________________________________
+
+    def source_stats(self):
+        stats = {}
+        for name, source in list(self.sources.items()):
+            try:
+                stats[name] = dict(source())
+            except Exception as exc:    # une source cassée ne doit pas casser l'app
+                stats[name] = {"error": repr(exc)}
+        return stats
+
+    def snapshot(self):
+        """État complet, sérialisable en JSON (panneau de diagnostic, /metrics.json)."""
+        with self.lock:
+            stages = {
+                name: {"count": count, "total_ms": round(total, 3), "mean_ms": round(total / count, 3), "max_ms": round(worst, 3)}
+                for name, (count, total, worst) in sorted(self.stages.items())
+            }
+            data = {
+                "uptime_s": round(time.time() - self.started, 1),
+                "sessions": len(self.sessions),
+                "reruns": dict(self.reruns),
+                "stages": stages,
+            }
+        data["sources"] = self.source_stats()
+        return data
+
+    def log(self, record):
+        """Une ligne JSON par run, lisible par la collecte de logs (Cloud Logging, Loki...)."""
+        line = {"event": LOG_EVENT, "time": round(time.time(), 3), **record.as_dict(), "sources": self.source_stats()}
+        self.stream.write(json.dumps(line, default=str) + "\n")
+        self.stream.flush()
+
+    def prometheus(self):
+        """Format texte Prometheus : durées par étape, reruns et statistiques numériques des sources."""
+        snap = self.snapshot()
+        lines = [
+            "# TYPE ecoyield_stage_seconds_total counter",
+            *(f'ecoyield_stage_seconds_total{{stage="{name}"}} {s["total_ms"] / 1000:.6f}' for name, s in snap["stages"].items()),
+            "# TYPE ecoyield_stage_calls_total counter",
+            *(f'ecoyield_stage_calls_total{{stage="{name}"}} {s["count"]}' for name, s in snap["stages"].items()),
+            "# TYPE ecoyield_reruns_total counter",
+            *(f'ecoyield_reruns_total{{scope="{scope}"}} {n}' for scope, n in snap["reruns"].items()),
+            f"ecoyield_sessions {snap['sessions']}",
+        ]
+        for source, stats in snap["sources"].items():
+            for name, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f'ecoyield_source{{source="{source}",name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+#___________________________________
+# POINT D'ACCÈS HTTP
+#___________________________________
+
+def serve(metrics, port=None, host=None):
+    """
+    Sert /metrics (Prometheus) et /metrics.json dans un thread démon. Sans port
+    (ni ECOYIELD_METRICS_PORT), ne fait rien. Écoute sur `host`, sinon
+    ECOYIELD_METRICS_HOST, sinon 127.0.0.1. Renvoie le serveur ou None.
+    """
+    port = port or os.environ.get(ENV_PORT)
+    host = host or os.environ.get(ENV_HOST) or DEFAULT_HOST
+    if not port:
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.prometheus().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(metrics.snapshot(), default=str).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, int(port)), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="ecoyield-metrics").start()
+    return server
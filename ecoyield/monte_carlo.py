@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+from ecoyield import stockage
+from typing import NamedTuple
+from concurrent.futures import ProcessPoolExecutor
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+PRICES_TABLE = "Prix_legume_moyen"
+RATES_TABLE = "Taux_bancaires_clean"
+
+PERCENTILES = (5, 50, 95)
+
+#___________________________________
+# ESTIMATION DU MODÈLE DE RISQUE
+#___________________________________
+
+class RiskModel(NamedTuple):
+    """
+    Lois annuelles des chocs, dans l'ordre [prix des légumes..., inflation, taux].
+
+    - prix : variation annuelle du log-prix (glissement sur 12 mois)
+    - inflation : écart du taux d'inflation (%) à sa moyenne historique
+    - taux : variation annuelle du taux du Livret A (points de %), centrée sur 0
+    """
+    names: tuple
+    price_drift: np.ndarray    # (V,) dérive annuelle moyenne du log-prix
+    inflation_mean: float      # inflation moyenne (%)
+    cov: np.ndarray            # (V + 2, V + 2)
+
+
+def _nearest_psd(cov):
+    """Covariance par paires (données manquantes) : on force une matrice semi-définie positive."""
+    values, vectors = np.linalg.eigh((cov + cov.T) / 2)
+    return (vectors * np.clip(values, 1e-10, None)) @ vectors.T
+
+
+def estimate_risk_model(names, prices_table=PRICES_TABLE, rates_table=RATES_TABLE):
+    """Estime dérives et covariances à partir des historiques de prix et de taux."""
+    columns = list(names) + ["Inflation", "Livret_A"]
+    shocks = pd.DataFrame(columns=columns, dtype=float)
+
+    if stockage.exists(prices_table):
+        df_prix = stockage.read_frame(prices_table)
+        df_prix['Mois'] = df_prix['Date'].dt.to_period('M')
+        prix = df_prix.pivot_table(index='Mois', columns='Categorie', values='Prix', observed=True).astype(float)
+        prix.columns = prix.columns.astype(str)
+        shocks = np.log(prix).diff(12).reindex(columns=columns)
+
+    if stockage.exists(rates_table):
+        df_taux = stockage.read_frame(rates_table)
+        df_taux['Mois'] = df_taux['time_period_end'].dt.to_period('M')
+        df_taux = df_taux.set_index('Mois')
+        taux = pd.DataFrame({
+            "Inflation": df_taux['Inflation'].astype(float),
+            "Livret_A": df_taux['Livret_A'].astype(float).diff(12),
+        })
+        shocks = shocks.drop(columns=["Inflation", "Livret_A"]).join(taux, how='outer')[columns]
+
+    n = len(names)
+    drift = shocks.iloc[:, :n].mean().fillna(0.0).to_numpy()
+    inflation_mean = float(shocks["Inflation"].mean()) if shocks["Inflation"].notna().any() else 2.0
+
+    cov = shocks.cov(min_periods=6).to_numpy(copy=True)
+    # Séries sans historique : volatilité médiane (légumes) ou valeur prudente, sans corrélation
+    variances = np.diag(cov).copy()
+    known = np.isfinite(variances[:n])
+    fallback = np.append(np.full(n, np.nanmedian(variances[:n]) if known.any() else 0.01), [1.0, 0.25])
+    for i in np.flatnonzero(~np.isfinite(variances)):
+        cov[i, :] = 0.0
+        cov[:, i] = 0.0
+        cov[i, i] = fallback[i]
+    cov = np.nan_to_num(cov)
+
+    return RiskModel(tuple(names), drift, inflation_mean, _nearest_psd(cov))
+
+#___________________________________
+# SIMULATION DES TRAJECTOIRES
+#___________________________________
+
+class MonteCarloResult(NamedTuple):
+    """Bandes de percentiles (len(PERCENTILES) × années) pour le potager et la banque."""
+    years: np.ndarray
+    percentiles: tuple
+    garden_net: np.ndarray
+    bank_value: np.ndarray
+    beat_probability: np.ndarray   # part des trajectoires où le potager dépasse la banque
+
+
+def simulate_paths(surfaces, coefs, model, years, initial_investment, bank_rate,
+                   n_paths, seed=None, yield_cv=0.15, yield_price_corr=-0.3):
+    """
+    Tire `n_paths` trajectoires et renvoie (potager net, valeur bancaire), chacune (n_paths, years + 1).
+
+    Rendements : choc log-normal par légume et par an, de coefficient de variation
+    `yield_cv`, corrélé à `yield_price_corr` avec le choc de prix du même légume
+    (mauvaise récolte générale = prix plus élevés).
+    """
+    rng = np.random.default_rng(seed)
+    surfaces = np.asarray(surfaces, dtype=np.float32)
+    n_veg = len(coefs.names)
+
+    # Chocs corrélés : (chemins, années, facteurs) × Choleskyᵀ
+    chol = np.linalg.cholesky(model.cov).astype(np.float32)
+    z = rng.standard_normal((n_paths, years, n_veg + 2), dtype=np.float32) @ chol.T
+    price_shocks = z[..., :n_veg]
+    inflation = model.inflation_mean + z[..., n_veg]
+    rate_steps = z[..., n_veg + 1]
+
+    prices = coefs.price.astype(np.float32) * np.exp(np.cumsum(model.price_drift.astype(np.float32) + price_shocks, axis=1))
+
+    sigma_y = np.float32(np.sqrt(np.log1p(yield_cv ** 2)))
+    price_std = np.sqrt(np.diag(model.cov)[:n_veg]).astype(np.float32)
+    eps = rng.standard_normal(price_shocks.shape, dtype=np.float32)
+    w = yield_price_corr * price_shocks / price_std + np.sqrt(1 - yield_price_corr ** 2) * eps
+    yields = coefs.kg_m2.astype(np.float32) * np.exp(sigma_y * w - sigma_y ** 2 / 2)
+
+    # Valeur de la récolte et coûts (eau + graines indexés sur l'inflation)
+    value = (yields * prices) @ surfaces
+    base_costs = surfaces @ (coefs.water + coefs.seeds).astype(np.float32)
+    costs = base_costs * np.cumprod(1 + inflation / 100, axis=1)
+
+    zeros = np.zeros((n_paths, 1), dtype=np.float32)
+    garden = np.concatenate((zeros, np.cumsum(value - costs, axis=1)), axis=1) - initial_investment
+
+    rates = np.clip(bank_rate + np.cumsum(rate_steps, axis=1), 0, None)
+    bank = initial_investment * np.concatenate((zeros + 1, np.cumprod(1 + rates / 100, axis=1)), axis=1)
+    return garden, bank
+
+
+def run_monte_carlo(surfaces, coefs, model, years, initial_investment, bank_rate,
+                    n_paths=100_000, seed=None, workers=1, **kwargs):
+    """
+    Lance la simulation Monte Carlo et résume les trajectoires en bandes P5/P50/P95.
+
+    Avec `workers` > 1, les trajectoires sont réparties en lots sur plusieurs processus,
+    chacun avec une graine indépendante dérivée de `seed`.
+    """
+    if workers > 1:
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        chunks = np.array_split(np.arange(n_paths), workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(simulate_paths, surfaces, coefs, model, years, initial_investment,
+                            bank_rate, len(chunk), child, **kwargs)
+                for chunk, child in zip(chunks, seeds)
+            ]
+            parts = [f.result() for f in futures]
+        garden = np.concatenate([p[0] for p in parts])
+        bank = np.concatenate([p[1] for p in parts])
+    else:
+        garden, bank = simulate_paths(surfaces, coefs, model, years, initial_investment,
+                                      bank_rate, n_paths, seed, **kwargs)
+
+    return MonteCarloResult(
+        years=np.arange(years + 1),
+        percentiles=PERCENTILES,
+        garden_net=np.percentile(garden, PERCENTILES, axis=0),
+        bank_value=np.percentile(bank, PERCENTILES, axis=0),
+        beat_probability=(garden > bank).mean(axis=0),
+    )
@@ -0,0 +1,100 @@
+import numpy as np
+from ecoyield import stockage
+from ecoyield.tables import RENDEMENT_ALIASES
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+OBJECTIVES = ("profit", "co2", "mix")
+
+#___________________________________
+# PLAFONDS DE CONSOMMATION
+#___________________________________
+
+def consumption_caps(names, persons):
+    """
+    Surface maximale utile (m²) par légume pour un foyer de `persons` personnes.
+
+    `qté_1pers` est un nombre de pieds par personne : on le divise par la densité
+    de plantation. Les légumes sans donnée ne sont pas plafonnés (inf).
+    """
+    caps = np.full(len(names), np.inf)
+    if not stockage.exists("Rendement_clean"):
+        return caps
+
+    df = stockage.read_frame("Rendement_clean")
+    df = df.dropna(subset=['qté_1pers', 'Densite_pied_m2']).drop_duplicates(subset=['Legumes'])
+    besoins = dict(zip(df['Legumes'], df['qté_1pers'] / df['Densite_pied_m2']))
+
+    for i, name in enumerate(names):
+        m2_par_personne = besoins.get(RENDEMENT_ALIASES.get(name, name))
+        if m2_par_personne is not None:
+            caps[i] = m2_par_personne * persons
+    return caps
+
+#___________________________________
+# OPTIMISATION
+#___________________________________
+
+def objective_scores(coefs, objective="profit", weight=0.5):
+    """
+    Score par m² de chaque légume.
+
+    - "profit" : marge nette (€/m²/an)
+    - "co2"    : CO2 évité (kg/m²/an)
+    - "mix"    : `weight` × profit normalisé + (1 - `weight`) × CO2 normalisé
+    """
+    profit = coefs.kg_m2 * coefs.price - coefs.water - coefs.seeds
+    co2 = coefs.kg_m2 * coefs.co2
+    if objective == "profit":
+        return profit
+    if objective == "co2":
+        return co2
+    if objective == "mix":
+        def normalise(x):
+            scale = np.abs(x).max() if x.size else 0.0
+            return x / scale if scale > 0 else x
+        return weight * normalise(profit) + (1 - weight) * normalise(co2)
+    raise ValueError(f"Objectif inconnu : {objective!r} (attendu : {', '.join(OBJECTIVES)})")
+
+
+def optimize_allocation(coefs, total_surface, objective="profit", weight=0.5,
+                        minimums=None, caps=None, integer=True):
+    """
+    Répartit `total_surface` m² entre les légumes de `coefs` pour maximiser l'objectif.
+
+    Contraintes : somme des surfaces <= total_surface, minimums <= surface <= caps.
+    Avec une seule contrainte de surface à coefficients unitaires, le programme
+    linéaire se résout exactement par un sac à dos fractionnaire : on remplit
+    les légumes par score décroissant jusqu'à épuisement de la surface.
+    En mode `integer`, les bornes sont arrondies au m² supérieur (comme les
+    sliders ; un plafond positif vaut au moins 1 m²), la surface totale au m²
+    inférieur, et la solution gloutonne reste optimale.
+    """
+    n = len(coefs.names)
+    lower = np.zeros(n) if minimums is None else np.asarray(minimums, dtype=float).copy()
+    upper = np.full(n, np.inf) if caps is None else np.asarray(caps, dtype=float).copy()
+    if integer:
+        lower = np.ceil(lower)
+        # Plafond arrondi au-dessus : 0,17 m² de laitue pour 2 personnes donne 1 m², pas 0
+        upper = np.ceil(upper)
+        total_surface = np.floor(total_surface)
+    upper = np.maximum(upper, lower)
+
+    remaining = total_surface - lower.sum()
+    if remaining < 0:
+        raise ValueError(f"Les surfaces minimales ({lower.sum():g} m²) dépassent la surface totale ({total_surface:g} m²)")
+
+    scores = objective_scores(coefs, objective, weight)
+    order = np.argsort(-scores, kind="stable")
+    order = order[scores[order] > 0]
+
+    # Remplissage glouton vectorisé : chaque légume prend ce qu'il reste après les meilleurs
+    room = upper[order] - lower[order]
+    before = np.concatenate(([0.0], np.cumsum(room)))[:-1]
+    take = np.clip(remaining - before, 0, room)
+
+    surfaces = lower
+    surfaces[order] += take
+    return surfaces
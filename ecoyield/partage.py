@@ -0,0 +1,195 @@
+import glob
+import hashlib
+import os
+import shutil
+import threading
+from collections import Counter
+from ecoyield import chemins
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+# Versions publiées : DATA_DIR/versions/<empreinte>/, la version servie est nommée dans CURRENT
+VERSIONS_DIR = "versions"
+CURRENT_FILE = "CURRENT"
+
+# Fichiers repris dans une version (tables Arrow, partitions, coefficients précalculés)
+PUBLISHED_PATTERNS = ("*.arrow", "*/*.arrow", "*.npy")
+
+# Versions gardées sur disque : un processus peut encore lire la précédente pendant la bascule
+KEEP_VERSIONS = 3
+
+#___________________________________
+# PUBLICATION
+#___________________________________
+
+def _published_files(data_dir):
+    """Fichiers à publier, relatifs à `data_dir`, dans un ordre stable (le dossier des versions exclu)."""
+    paths = set()
+    for pattern in PUBLISHED_PATTERNS:
+        paths.update(glob.glob(os.path.join(data_dir, pattern)))
+    relative = (os.path.relpath(path, data_dir) for path in paths)
+    return sorted(path for path in relative if not path.startswith(VERSIONS_DIR + os.sep))
+
+
+def _content_version(data_dir, files):
+    h = hashlib.sha256()
+    for name in files:
+        h.update(name.encode())
+        with open(os.path.join(data_dir, name), "rb") as f:
+            for bloc in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloc)
+    return h.hexdigest()[:16]
+
+
+def current_version(data_dir=None):
+    """Version servie (None si rien n'a été publié)."""
+    path = os.path.join(data_dir or chemins.DATA_DIR, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+def version_path(version, data_dir=None):
+    return os.path.join(data_dir or chemins.DATA_DIR, VERSIONS_DIR, version)
+
+
+def publish(data_dir=None, keep=KEEP_VERSIONS):
+    """
+    Fige l'état courant de `data_dir` dans une version immuable et la rend visible
+    d'un seul coup (remplacement atomique de CURRENT).
+
+    Les fichiers sont liés en dur, sans copie : le pipeline remplace ses sorties par
+    os.replace (nouvel inode), une version publiée n'est donc jamais modifiée. Une
+    version déjà servie n'est pas republiée. Renvoie l'empreinte de la version.
+
+    Chaque table déclarée (stockage.TABLES) est d'abord convertie depuis son export
+    CSV si son fichier Arrow manque ou est périmé : une version est complète, et une
+    table absente est une erreur plutôt qu'un renvoi aux CSV du dossier de travail.
+    """
+    from ecoyield import stockage    # pandas/pyarrow : inutiles pour lire une version
+
+    data_dir = data_dir or chemins.DATA_DIR
+    with chemins.reading_from(data_dir):
+        missing = stockage.convert_all()
+    if missing:
+        raise FileNotFoundError(f"tables absentes, version non publiée : {', '.join(missing)}")
+    files = _published_files(data_dir)
+    version = _content_version(data_dir, files)
+    if version == current_version(data_dir):
+        return version
+
+    target = version_path(version, data_dir)
+    if not os.path.isdir(target):
+        tmp = target + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        for name in files:
+            destination = os.path.join(tmp, name)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            try:
+                os.link(os.path.join(data_dir, name), destination)
+            except OSError:
+                # Système de fichiers sans liens durs (volume monté) : copie
+                shutil.copy2(os.path.join(data_dir, name), destination)
+        os.replace(tmp, target)
+
+    pointer = os.path.join(data_dir, CURRENT_FILE)
+    with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    prune(data_dir, keep)
+    print(f"Données publiées : version {version} ({len(files)} fichier(s))")
+    return version
+
+
+def prune(data_dir=None, keep=KEEP_VERSIONS):
+    """
+    Supprime les versions les plus anciennes au-delà de `keep`. Un processus qui a
+    encore une ancienne version en mémoire mappée continue de la lire (Linux garde
+    les fichiers ouverts jusqu'au dernier munmap).
+    """
+    root = os.path.join(data_dir or chemins.DATA_DIR, VERSIONS_DIR)
+    served = current_version(data_dir)
+    versions = [path for path in glob.glob(os.path.join(root, "*")) if not path.endswith(".tmp")]
+    versions.sort(key=os.path.getmtime, reverse=True)
+    for path in versions[keep:]:
+        if os.path.basename(path) != served:
+            shutil.rmtree(path, ignore_errors=True)
+
+#___________________________________
+# PLAN DE DONNÉES PARTAGÉ
+#___________________________________
+
+class Snapshot:
+    """
+    Une version des données et les objets construits à partir d'elle (index,
+    coefficients, modèles), chacun construit une seule fois pour tout le processus.
+    Les objets sont partagés entre sessions : ils doivent rester en lecture seule.
+    """
+
+    def __init__(self, version, path):
+        self.version = version
+        self.path = path
+        self.objects = {}
+        self.counts = Counter()    # "hit" / "miss" par objet
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Snapshot({self.version}, {len(self.objects)} objet(s))"
+
+    def get(self, key, build):
+        """Objet `key`, construit par `build()` en lisant les fichiers de cette version."""
+        name = key[0] if isinstance(key, tuple) else key
+        try:
+            value = self.objects[key]
+            self.counts[f"{name}.hit"] += 1
+            return value
+        except KeyError:
+            pass
+        with self.lock:
+            if key not in self.objects:
+                self.counts[f"{name}.miss"] += 1
+                with chemins.reading_from(self.path):
+                    self.objects[key] = build()
+            else:
+                self.counts[f"{name}.hit"] += 1
+            return self.objects[key]
+
+
+class DataPlane:
+    """
+    Données en lecture seule d'un processus. `current()` rend la dernière version
+    publiée : quand CURRENT change, une nouvelle Snapshot remplace l'ancienne d'une
+    seule affectation. Une session en cours garde la version qu'elle a obtenue
+    jusqu'à la fin de son rerun ; l'ancienne est libérée quand plus personne ne la tient.
+    Sans version publiée, les fichiers de DATA_DIR sont lus directement.
+    """
+
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir or chemins.DATA_DIR
+        self.pointer = os.path.join(self.data_dir, CURRENT_FILE)
+        self.pointer_mtime = None
+        self.snapshot = None
+        self.swaps = 0
+        self.lock = threading.Lock()
+
+    def current(self):
+        # Un stat par appel : la relecture de CURRENT n'a lieu qu'après une publication
+        mtime = os.path.getmtime(self.pointer) if os.path.exists(self.pointer) else None
+        if self.snapshot is not None and mtime == self.pointer_mtime:
+            return self.snapshot
+        with self.lock:
+            if self.snapshot is None or mtime != self.pointer_mtime:
+                version = current_version(self.data_dir)
+                if self.snapshot is None or version != self.snapshot.version:
+                    path = version_path(version, self.data_dir) if version else self.data_dir
+                    self.snapshot = Snapshot(version or "local", path)
+                    self.swaps += 1
+                self.pointer_mtime = mtime
+            return self.snapshot
+
+
+if __name__ == "__main__":
+    publish()
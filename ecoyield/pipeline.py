@@ -0,0 +1,266 @@
+import argparse
+import glob
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from graphlib import TopologicalSorter
+from typing import NamedTuple
+from ecoyield import partage
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+STATE_FILE = ".pipeline_state.json"
+
+
+class Stage(NamedTuple):
+    """
+    Étape du pipeline.
+
+    - "fixe"   : source rarement mise à jour, relancée seulement si une sortie manque (ou --force)
+    - "auto"   : collecte périodique, relancée avec --refresh
+    - "derive" : nettoyage/jointure, relancé quand le contenu d'une entrée ou le code change
+    """
+    name: str
+    kind: str
+    run: str          # "module:fonction"
+    inputs: tuple
+    outputs: tuple
+
+
+STAGES = (
+    Stage("rendement_scraping", "fixe", "FIXE_rendement:scraper_rendement", (), ("rendement_3_tableaux.csv",)),
+    Stage("rendement", "derive", "FIXE_rendement:nettoyer_rendement", ("rendement_3_tableaux.csv",), ("Rendement_clean.csv",)),
+    Stage("besoin_eau", "fixe", "FIXE_besoin_eau:creer_besoins_eau", (), ("Besoins_eau_legumes.csv",)),
+    Stage("materiel", "fixe", "FIXE_prix_materiel:creer_investissement", (), ("Investissement_Materiel.csv",)),
+    Stage("co2_scraping", "fixe", "FIXE_Empreinte_Carbone:lancer_le_scraping", (), ("impact_co2_complet.csv",)),
+    Stage("co2", "derive", "FIXE_Empreinte_Carbone:nettoyer_co2", ("impact_co2_complet.csv",), ("Impact_co2_Clean.csv",)),
+    Stage("historique_legumes", "fixe", "FIXE_prix_legumes_historique:extraire_historique", ("extractions/*.txt",), ("Prix_legumes_historique_clean/*.csv",)),
+    Stage("legumes_scraping", "auto", "AUTO_prix_legume:mettre_a_jour_historique", ("Prix_legumes_historique_clean/*.csv",), ("Prix_legumes_historique_clean/*.csv",)),
+    Stage("legumes", "derive", "AUTO_prix_legume:calculer_moyennes", ("Prix_legumes_historique_clean/*.csv",), ("Prix_legume_moyen/*.csv",)),
+    Stage("graines_scraping", "auto", "AUTO_prix_graine:collecter_graines", (), ("prix_graines.csv",)),
+    Stage("graines", "derive", "AUTO_prix_graine:nettoyer_graines", ("prix_graines.csv",), ("Prix_graines_clean.csv", "Prix_graine_moyen.csv")),
+    Stage("eau", "auto", "AUTO_prix_eau:mettre_a_jour_prix_eau", (), ("Prix_eau.csv",)),
+    Stage("taux", "auto", "AUTO_taux_banque:mettre_a_jour_taux", (), ("Taux_bancaires_clean.csv",)),
+    Stage(
+        "tables", "derive", "ecoyield.tables:build_tables",
+        ("Rendement_clean.csv", "Besoins_eau_legumes.csv", "Impact_co2_Clean.csv",
+         "Prix_graine_moyen.csv", "Prix_legume_moyen/*.csv", "Prix_eau.csv"),
+        ("FACT_potager.csv", "DIM_Legume.csv"),
+    ),
+    Stage(
+        "previsions", "derive", "ecoyield.previsions:build_previsions",
+        ("FACT_potager.csv", "Prix_legume_moyen/*.csv", "Prix_eau.csv", "Taux_bancaires_clean.csv"),
+        ("FACT_Previsions_5ans.csv",),
+    ),
+    Stage("coefficients", "derive", "ecoyield.coefficients:build_coefficients", ("FACT_potager.csv",), ("donnees/coefficients.npy",)),
+)
+
+#___________________________________
+# EMPREINTES (HASH DE CONTENU)
+#___________________________________
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def expand(patterns):
+    """Développe les motifs glob des entrées, dans un ordre stable."""
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+    return paths
+
+
+def code_hash(stage):
+    module = stage.run.split(":")[0]
+    spec = importlib.util.find_spec(module)
+    return file_hash(spec.origin) if spec and spec.origin else ""
+
+
+@lru_cache(maxsize=None)
+def function_hash(function, version=0):
+    """
+    Empreinte du code d'une fonction pour les caches de résultats : source de tout son
+    module (fonctions appelées, constantes) et `version`, à incrémenter quand le résultat
+    dépend d'un code situé ailleurs (autre module, bibliothèque).
+    """
+    h = hashlib.sha256(f"{function.__module__}.{function.__qualname__}:{version}".encode())
+    path = getattr(sys.modules.get(function.__module__), "__file__", None)
+    if path and os.path.exists(path):
+        h.update(file_hash(path).encode())
+    else:
+        # Fonction sans fichier source (session interactive) : bytecode et constantes
+        h.update(function.__code__.co_code)
+        h.update(repr(function.__code__.co_consts).encode())
+    return h.hexdigest()[:12]
+
+
+def fingerprint(stage):
+    """Empreinte d'une étape : contenu de ses entrées et de son code source."""
+    h = hashlib.sha256(code_hash(stage).encode())
+    for path in expand(stage.inputs):
+        h.update(path.encode())
+        h.update(file_hash(path).encode() if os.path.exists(path) else b"absent")
+    return h.hexdigest()
+
+#___________________________________
+# GRAPHE DE DÉPENDANCES
+#___________________________________
+
+def build_graph(stages=STAGES):
+    """
+    Une étape dépend de toutes les étapes qui produisent l'une de ses entrées.
+    Une sortie en motif glob (table partitionnée) se raccorde à la même entrée en motif.
+    """
+    producers = {}
+    for stage in stages:
+        for out in stage.outputs:
+            producers.setdefault(out, []).append(stage.name)
+
+    graph = {}
+    for stage in stages:
+        deps = set()
+        for path in list(stage.inputs) + expand(stage.inputs):
+            deps.update(producers.get(path, []))
+        deps.discard(stage.name)
+        graph[stage.name] = deps
+    return graph
+
+
+def execution_order(stages=STAGES):
+    return list(TopologicalSorter(build_graph(stages)).static_order())
+
+#___________________________________
+# EXÉCUTION
+#___________________________________
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def output_missing(stage):
+    """Vrai si une sortie manque (pour un motif glob : aucun fichier correspondant)."""
+    return any(not glob.glob(out) if glob.has_magic(out) else not os.path.exists(out) for out in stage.outputs)
+
+
+def outputs_unchanged(stage, recorded):
+    """Vrai si toutes les sorties existent et n'ont pas été modifiées hors pipeline."""
+    known = recorded.get("outputs", {})
+    if output_missing(stage):
+        return False
+    paths = expand(stage.outputs)
+    if known and set(paths) != set(known):
+        return False
+    return all(out not in known or known[out] == file_hash(out) for out in paths)
+
+
+def needs_run(stage, state, refresh=False, force=()):
+    if stage.name in force or "all" in force:
+        return "forcé"
+    if output_missing(stage):
+        return "sortie absente"
+    if stage.kind == "auto" and refresh:
+        return "rafraîchissement"
+    if stage.kind == "derive":
+        recorded = state.get(stage.name, {})
+        if recorded.get("fingerprint") != fingerprint(stage):
+            return "entrées modifiées"
+        if not outputs_unchanged(stage, recorded):
+            return "sorties modifiées"
+    return None
+
+
+def run_stage(stage):
+    module, function = stage.run.split(":")
+    start = time.perf_counter()
+    getattr(importlib.import_module(module), function)()
+    return time.perf_counter() - start
+
+
+def run_pipeline(refresh=False, force=(), dry_run=False, stages=STAGES, state_path=STATE_FILE, workers=4, publish=True):
+    """
+    Exécute les étapes dans l'ordre du graphe, en sautant celles qui sont à jour.
+    Si tout a réussi et `publish`, les tables sont publiées (ecoyield.partage) : les
+    applications en cours basculent sur les nouvelles données sans redémarrer.
+
+    Les étapes prêtes en même temps (sans dépendance entre elles, par exemple
+    les collectes sur des sites différents) s'exécutent en parallèle : la durée
+    d'un rafraîchissement est bornée par le site le plus lent, pas par la somme.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    state = load_state(state_path)
+    executed = []
+    sorter = TopologicalSorter(build_graph(stages))
+    sorter.prepare()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while sorter.is_active():
+                ready = sorted(sorter.get_ready())
+                to_run = []
+                for name in ready:
+                    reason = needs_run(by_name[name], state, refresh, force)
+                    if reason is None:
+                        print(f"[=] {name} : à jour")
+                    else:
+                        print(f"[>] {name} : {reason}")
+                        to_run.append(name)
+
+                if not dry_run:
+                    durations = pool.map(lambda name: run_stage(by_name[name]), to_run)
+                    for name, duration in zip(to_run, durations):
+                        stage = by_name[name]
+                        state[name] = {
+                            "fingerprint": fingerprint(stage),
+                            "outputs": {out: file_hash(out) for out in expand(stage.outputs) if os.path.exists(out)},
+                            "duration_s": round(duration, 3),
+                        }
+                        executed.append(name)
+                sorter.done(*ready)
+        if publish and not dry_run:
+            partage.publish()
+    finally:
+        if not dry_run:
+            save_state(state, state_path)
+
+    return executed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construit les tables FACT/DIM d'Eco-Yield.")
+    parser.add_argument("--refresh", action="store_true", help="relance les collectes AUTO_*")
+    parser.add_argument("--force", nargs="*", default=(), metavar="ETAPE", help="force des étapes (sans nom : toutes)")
+    parser.add_argument("--dry-run", action="store_true", help="affiche le plan sans rien exécuter")
+    parser.add_argument("--no-publish", action="store_true", help="ne publie pas les tables pour les applications")
+    args = parser.parse_args(argv)
+
+    force = ("all",) if args.force == [] else tuple(args.force)
+    executed = run_pipeline(refresh=args.refresh, force=force, dry_run=args.dry_run, publish=not args.no_publish)
+    if not args.dry_run:
+        print(f"{len(executed)} étape(s) exécutée(s)")
+
+
+if __name__ == "__main__":
+    main()
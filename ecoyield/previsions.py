@@ -0,0 +1,264 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+from ecoyield import stockage
+from ecoyield.pipeline import function_hash
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+HORIZON_ANS = 5
+MOIS = 12
+
+# Replis quand une série n'a pas d'historique (anciennes hypothèses à croissance constante)
+CROISSANCE_PRIX = 0.025
+CROISSANCE_EAU = 0.015
+
+# Amortissement de la tendance par pas de temps (1 = tendance linéaire pure) :
+# quelques années de prix ne justifient pas d'extrapoler leur pente telle quelle
+AMORTISSEMENT_PRIX = 0.98      # par mois
+AMORTISSEMENT_INFLATION = 0.5  # par mois : l'inflation reste à son niveau récent
+AMORTISSEMENT_EAU = 1.0        # par an : le prix de l'eau suit une tendance régulière
+
+# L'inflation n'est ajustée que sur sa dernière année : une droite tracée sur le pic
+# de 2022-2023 placerait mal le niveau actuel
+FENETRE_INFLATION = 12
+
+# Modèles ajustés, réutilisés tant que leur série n'a pas changé
+CACHE_FILE = os.path.join(stockage.DATA_DIR, "previsions_modeles.json")
+
+# À incrémenter quand l'ajustement change hors de ce module (NumPy, stockage...)
+VERSION_AJUSTEMENT = 1
+
+#___________________________________
+# MODÈLE : TENDANCE + SAISONNALITÉ
+#___________________________________
+
+class Modele(NamedTuple):
+    """
+    y(t) = niveau + pente × h + saison[t mod période], h = t - origine (pas de temps après
+    la dernière observation). Ajusté sur log(y) si `log` : tendance en % par pas de temps.
+    """
+    niveau: float
+    pente: float
+    saison: tuple        # un écart par position dans la période, de moyenne nulle (vide : pas de saison)
+    origine: int
+    log: bool
+    amortissement: float
+
+
+def ajuster(t, valeurs, periode=MOIS, log=True, amortissement=1.0, fenetre=None):
+    """
+    Moindres carrés sur une tendance linéaire et une indicatrice par position de la
+    période (mois calendaire) observée. La saisonnalité n'est estimée qu'avec au
+    moins deux périodes d'historique ; les positions jamais observées valent 0.
+    `fenetre` limite l'ajustement aux derniers pas de temps.
+    """
+    t = np.asarray(t, dtype=np.int64)
+    y = np.log(valeurs) if log else np.asarray(valeurs, dtype=np.float64)
+    if fenetre is not None:
+        recent = t > t.max() - fenetre
+        t, y = t[recent], y[recent]
+    origine = int(t.max())
+    h = (t - origine).astype(np.float64)
+
+    saisonnier = periode and t.max() - t.min() >= 2 * periode - 1
+    if saisonnier:
+        positions, colonnes = np.unique(t % periode, return_inverse=True)
+        X = np.column_stack([h, np.eye(len(positions))[colonnes]])
+        coef = np.linalg.lstsq(X, y, rcond=None)[0]
+        effets = coef[1:]
+        saison = np.zeros(periode)
+        saison[positions] = effets - effets.mean()
+        niveau, pente = effets.mean(), coef[0]
+    else:
+        X = np.column_stack([np.ones_like(h), h]) if len(t) > 1 else np.ones((1, 1))
+        coef = np.linalg.lstsq(X, y, rcond=None)[0]
+        niveau, pente = coef[0], (coef[1] if len(coef) > 1 else 0.0)
+        saison = np.zeros(0)
+    return Modele(float(niveau), float(pente), tuple(saison.tolist()), origine, log, amortissement)
+
+
+def prevoir(modele, t):
+    """Valeurs du modèle aux pas de temps `t` (après l'origine : tendance amortie)."""
+    t = np.asarray(t, dtype=np.int64)
+    h = (t - modele.origine).astype(np.float64)
+    phi = modele.amortissement
+    if phi < 1:
+        # Somme phi + phi² + ... + phi^h : la pente s'éteint progressivement
+        h = np.where(h > 0, phi * (1 - phi ** np.maximum(h, 0)) / (1 - phi), h)
+    y = modele.niveau + modele.pente * h
+    if modele.saison:
+        y = y + np.asarray(modele.saison)[t % len(modele.saison)]
+    return np.exp(y) if modele.log else y
+
+#___________________________________
+# AJUSTEMENT EN PARALLÈLE, AVEC CACHE
+#___________________________________
+
+# La source de ce module (ajuster, les fonctions qu'il appelle, les constantes) fait
+# partie de l'empreinte : la modifier invalide le cache
+CODE_AJUSTEMENT = function_hash(ajuster, VERSION_AJUSTEMENT)
+
+
+def empreinte(t, valeurs, options):
+    h = hashlib.sha256(CODE_AJUSTEMENT.encode())
+    h.update(np.asarray(t, dtype=np.int64).tobytes())
+    h.update(np.asarray(valeurs, dtype=np.float64).tobytes())
+    h.update(json.dumps(options, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _ajuster_serie(serie):
+    t, valeurs, options = serie
+    return ajuster(t, valeurs, **options)
+
+
+def lire_cache(path=CACHE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def ecrire_cache(cache, path=CACHE_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def ajuster_series(series, workers=None, cache_path=CACHE_FILE):
+    """
+    Ajuste {nom: (t, valeurs, options)} et renvoie {nom: Modele}.
+
+    Seules les séries dont l'empreinte (données, options, code) a changé depuis le
+    dernier passage sont réajustées, en parallèle sur plusieurs processus ; les
+    autres modèles sont relus du cache.
+    """
+    cache = lire_cache(cache_path) if cache_path else {}
+    empreintes = {nom: empreinte(*serie) for nom, serie in series.items()}
+    a_ajuster = [nom for nom in series if cache.get(nom, {}).get("empreinte") != empreintes[nom]]
+
+    if len(a_ajuster) <= 1 or workers == 1:
+        nouveaux = [_ajuster_serie(series[nom]) for nom in a_ajuster]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            nouveaux = list(pool.map(_ajuster_serie, [series[nom] for nom in a_ajuster]))
+
+    for nom, modele in zip(a_ajuster, nouveaux):
+        cache[nom] = {"empreinte": empreintes[nom], "modele": modele._asdict()}
+    print(f"Prévisions : {len(a_ajuster)} série(s) ajustée(s), {len(series) - len(a_ajuster)} reprise(s) du cache")
+
+    if cache_path:
+        ecrire_cache({nom: cache[nom] for nom in series}, cache_path)
+    return {nom: Modele(**{**cache[nom]["modele"], "saison": tuple(cache[nom]["modele"]["saison"])}) for nom in series}
+
+#___________________________________
+# SÉRIES D'ENTRÉE
+#___________________________________
+
+def mois_absolus(dates):
+    """Dates -> nombre de mois depuis janvier 1970 (le mois calendaire est t mod 12)."""
+    return pd.Series(dates).to_numpy().astype("datetime64[M]").astype(np.int64)
+
+
+def series_prix(df_prix):
+    """Une série mensuelle (log-prix) par catégorie, à partir de Prix_legume_moyen."""
+    t = mois_absolus(df_prix['Date'])
+    categories = df_prix['Categorie'].astype(str).to_numpy()
+    prix = df_prix['Prix'].to_numpy(dtype=np.float64)
+    options = {"periode": MOIS, "log": True, "amortissement": AMORTISSEMENT_PRIX}
+    return {
+        f"prix:{categorie}": (t[categories == categorie], prix[categories == categorie], options)
+        for categorie in np.unique(categories)
+    }
+
+
+def serie_inflation(df_taux):
+    df = df_taux.dropna(subset=['Inflation'])
+    # Taux sur un an glissant : pas de saisonnalité à estimer
+    options = {"periode": None, "log": False, "amortissement": AMORTISSEMENT_INFLATION, "fenetre": FENETRE_INFLATION}
+    return mois_absolus(df['time_period_end']), df['Inflation'].to_numpy(dtype=np.float64), options
+
+
+def serie_eau(df_eau):
+    options = {"periode": None, "log": True, "amortissement": AMORTISSEMENT_EAU}
+    return df_eau['Annee'].to_numpy(dtype=np.int64), df_eau['Prix_m3'].to_numpy(dtype=np.float64), options
+
+#___________________________________
+# TABLE DES PRÉVISIONS
+#___________________________________
+
+def moyenne_annuelle(modele, annees):
+    """Moyenne des 12 prévisions mensuelles de chaque année : tableau (années,)."""
+    t = (np.asarray(annees)[:, None] - 1970) * MOIS + np.arange(MOIS)
+    return prevoir(modele, t).mean(axis=1)
+
+
+def construire_previsions(df_fact, df_prix, df_eau=None, df_taux=None, workers=None, cache_path=CACHE_FILE):
+    """
+    Prévisions sur HORIZON_ANS années, à partir de l'année qui suit le dernier prix connu :
+    - gain brut : rendement × prix annuel moyen prévu de la catégorie ;
+    - coût de l'eau : besoin du cycle × prix du m³ prévu ;
+    - graines : prix actuel indexé sur l'inflation prévue.
+    Une catégorie (ou une série) sans historique garde les anciennes croissances constantes.
+    """
+    series = series_prix(df_prix)
+    if df_taux is not None and df_taux['Inflation'].notna().any():
+        series["inflation"] = serie_inflation(df_taux)
+    if df_eau is not None and len(df_eau):
+        series["eau"] = serie_eau(df_eau)
+    modeles = ajuster_series(series, workers, cache_path)
+
+    premiere_annee = int(df_prix['Date'].dt.year.max()) + 1
+    annees = np.arange(premiere_annee, premiere_annee + HORIZON_ANS)
+    rang = np.arange(1, HORIZON_ANS + 1)
+
+    if "eau" in modeles:
+        prix_m3 = prevoir(modeles["eau"], annees)
+        cout_eau = np.outer(df_fact['Eau_Cycle_L_m2'].to_numpy(dtype=np.float64), prix_m3 / 1000)
+    else:
+        cout_eau = np.outer(df_fact['Cout_Eau_m2'].to_numpy(dtype=np.float64), (1 + CROISSANCE_EAU) ** rang)
+
+    inflation = moyenne_annuelle(modeles["inflation"], annees) if "inflation" in modeles else np.zeros(HORIZON_ANS)
+    graines = np.outer(df_fact['Prix_graine'].to_numpy(dtype=np.float64), np.cumprod(1 + inflation / 100))
+
+    rendement = df_fact['Rendement_kg_m2'].to_numpy(dtype=np.float64)
+    gain = np.outer(df_fact['Gain_Brut_m2'].to_numpy(dtype=np.float64), (1 + CROISSANCE_PRIX) ** rang)
+    for i, nom in enumerate(df_fact['Nom_Legume'].astype(str)):
+        modele = modeles.get(f"prix:{nom}")
+        if modele is not None:
+            gain[i] = rendement[i] * moyenne_annuelle(modele, annees)
+
+    n = len(df_fact)
+    return pd.DataFrame({
+        'Annee': np.repeat(annees, n),
+        'Nom_Legume': np.tile(df_fact['Nom_Legume'].to_numpy(), HORIZON_ANS),
+        'Gain_Brut_m2': gain.T.ravel(),
+        'Cout_Eau_m2': cout_eau.T.ravel(),
+        'Marge_Nette_m2': (gain - cout_eau - graines).T.ravel(),
+        'CO2_m2': np.tile(df_fact['CO2_m2'].to_numpy(), HORIZON_ANS),
+        'CO2_Economise_m2': np.tile(df_fact['CO2_Economise_m2'].to_numpy(), HORIZON_ANS),
+    })
+
+
+def build_previsions(workers=None):
+    """Étape du pipeline : réécrit FACT_Previsions_5ans à partir des historiques."""
+    df_taux = stockage.read_frame("Taux_bancaires_clean") if stockage.exists("Taux_bancaires_clean") else None
+    df_eau = stockage.read_frame("Prix_eau") if stockage.exists("Prix_eau") else None
+    df = construire_previsions(
+        stockage.read_frame("FACT_potager"), stockage.read_frame("Prix_legume_moyen"), df_eau, df_taux, workers,
+    )
+    stockage.write_table(df, "FACT_Previsions_5ans")
+    print(f"FACT_Previsions_5ans mis à jour ({df['Annee'].min()}-{df['Annee'].max()}, {df['Nom_Legume'].nunique()} légumes)")
+
+
+if __name__ == "__main__":
+    build_previsions()
@@ -0,0 +1,117 @@
+import numpy as np
+from ecoyield import stockage
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+PRICES_TABLE = "Prix_legume_moyen"
+MONTHS_PER_YEAR = 12
+
+#___________________________________
+# INDEX DES PRIX
+#___________________________________
+
+class PriceIndex:
+    """
+    Prix moyens (€/kg) sur une grille dense mois × catégorie, construite une fois.
+
+    Chaque mois entre le premier et le dernier relevé a sa ligne. Les trous sont
+    interpolés linéairement ; après le dernier relevé d'une catégorie on garde sa
+    dernière valeur (et avant le premier, sa première). Une recherche n'est qu'un
+    calcul d'indice : (mois - premier mois, colonne de la catégorie).
+    """
+
+    def __init__(self, start, categories, prices):
+        self.start = np.datetime64(start, "M")
+        self.categories = tuple(categories)
+        self.columns = {name: j for j, name in enumerate(self.categories)}
+        self.prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self.prices.setflags(write=False)
+        self.months = self.start + np.arange(len(self.prices))
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __repr__(self):
+        return f"PriceIndex({self.months[0]}..{self.months[-1]}, {len(self.categories)} catégories)"
+
+    @property
+    def end(self):
+        return self.months[-1]
+
+    def rows(self, months):
+        """Lignes des mois demandés (dates ou datetime64), bornées à la plage couverte."""
+        offsets = (np.asarray(months, dtype="datetime64[M]") - self.start).astype(np.int64)
+        return np.clip(offsets, 0, len(self.prices) - 1)
+
+    def cols(self, categories):
+        return np.array([self.columns[name] for name in categories], dtype=np.intp)
+
+    def price(self, category, month):
+        """Prix d'une catégorie pour un mois. Hors plage : valeur du mois couvert le plus proche."""
+        return float(self.prices[self.rows(month), self.columns[category]])
+
+    def lookup(self, categories, months):
+        """Matrice (mois × catégories) des prix, dans l'ordre demandé."""
+        return self.prices[np.ix_(np.atleast_1d(self.rows(months)), self.cols(categories))]
+
+    def between(self, start, end, categories=None):
+        """Mois de `start` à `end` inclus et leurs prix (vue sans copie si `categories` est omis)."""
+        first, last = self.rows([start, end])
+        rows = slice(first, last + 1)
+        prices = self.prices[rows] if categories is None else self.prices[rows][:, self.cols(categories)]
+        return self.months[rows], prices
+
+    def seasonal_profile(self, categories=None, years=None):
+        """
+        Prix moyen par mois calendaire : matrice (12 × catégories), janvier en ligne 0.
+        `years` restreint la moyenne aux dernières années couvertes (défaut : tout l'historique).
+        """
+        prices = self.prices if categories is None else self.prices[:, self.cols(categories)]
+        months = self.months
+        if years is not None:
+            prices, months = prices[-years * MONTHS_PER_YEAR:], months[-years * MONTHS_PER_YEAR:]
+        month_of_year = months.astype(np.int64) % MONTHS_PER_YEAR
+        sums = np.zeros((MONTHS_PER_YEAR, prices.shape[1]))
+        np.add.at(sums, month_of_year, prices)
+        counts = np.bincount(month_of_year, minlength=MONTHS_PER_YEAR)[:, None]
+        # Moins d'un an d'historique : les mois jamais observés restent à NaN
+        return np.divide(sums, counts, out=np.full_like(sums, np.nan), where=counts > 0)
+
+    def seasonal_factors(self, categories=None, years=None):
+        """Profil saisonnier rapporté à la moyenne annuelle de chaque catégorie (moyenne = 1)."""
+        profile = self.seasonal_profile(categories, years)
+        return profile / np.nanmean(profile, axis=0)
+
+#___________________________________
+# CONSTRUCTION
+#___________________________________
+
+def price_index_from_frame(df):
+    """Construit l'index à partir d'une table longue (Date, Categorie, Prix), sans regroupement pandas."""
+    months = df['Date'].to_numpy().astype("datetime64[M]")
+    categories, cols = np.unique(df['Categorie'].astype(str).to_numpy(), return_inverse=True)
+    start = months.min()
+    rows = (months - start).astype(np.int64)
+    shape = (rows.max() + 1, len(categories))
+
+    # Moyenne des relevés d'un même mois, puis remplissage colonne par colonne
+    sums = np.zeros(shape)
+    counts = np.zeros(shape)
+    values = df['Prix'].to_numpy(dtype=np.float64)
+    np.add.at(sums, (rows, cols), values)
+    np.add.at(counts, (rows, cols), 1)
+
+    grid = np.arange(shape[0])
+    prices = np.empty(shape)
+    for j in range(shape[1]):
+        known = np.flatnonzero(counts[:, j])
+        # np.interp interpole entre les mois connus et prolonge les valeurs extrêmes aux bords
+        prices[:, j] = np.interp(grid, known, sums[known, j] / counts[known, j])
+    return PriceIndex(start, categories.tolist(), prices)
+
+
+def build_price_index(table=PRICES_TABLE):
+    """Index des prix à partir de la table des moyennes (lecture Arrow en mémoire mappée)."""
+    return price_index_from_frame(stockage.read_frame(table))
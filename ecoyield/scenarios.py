@@ -0,0 +1,253 @@
+import csv
+import json
+import os
+import sys
+import numpy as np
+from itertools import islice
+from typing import NamedTuple
+from ecoyield import chemins, partage
+from ecoyield.coefficients import coefficients_from_table, load_coefficient_table
+from ecoyield.simulation import plans_from_dicts, simulate_batch
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+# Valeurs par défaut de la sidebar d'app_ecoyield.py
+DEFAULT_SURFACE = 30
+DEFAULT_YEARS = 3
+DEFAULT_BANK_RATE = 1.7
+
+# Investissement sans Investissement_Materiel : 150 € fixes + 50 € par tranche de 10 m²
+DEFAULT_FIXED_COST = 150.0
+DEFAULT_VARIABLE_COST = 50.0
+
+# Scénarios simulés par appel de simulate_batch (et écrits d'un bloc sur la sortie)
+CHUNK_SIZE = 1000
+
+# Colonnes réservées d'un fichier de scénarios ; toute autre colonne CSV est un légume (m²)
+FIELDS = ("name", "surface", "years", "rate", "investment", "alloc")
+
+#___________________________________
+# SCÉNARIOS
+#___________________________________
+
+class Scenario(NamedTuple):
+    """Un plan à simuler. `investment` à None : règle de l'app selon la surface."""
+    name: str
+    allocations: dict            # {légume: m²}
+    surface: float
+    years: int = DEFAULT_YEARS
+    bank_rate: float = DEFAULT_BANK_RATE
+    investment: float = None
+    error: str = None            # scénario illisible : renvoyé tel quel dans les résultats
+
+
+class InvestmentRule(NamedTuple):
+    """Investissement initial suggéré : coûts fixes + coûts variables par tranche de 10 m²."""
+    fixed: float = DEFAULT_FIXED_COST
+    variable: float = DEFAULT_VARIABLE_COST
+
+    def amount(self, surface):
+        return float(int(round(self.fixed + self.variable * (surface / 10))))
+
+
+def investment_rule(df_inv=None):
+    """Règle d'investissement à partir d'Investissement_Materiel (colonnes Type_Cout, Prix_Estime)."""
+    if df_inv is None:
+        return InvestmentRule()
+    fixed = float(df_inv[df_inv['Type_Cout'] == 'Fixe']['Prix_Estime'].sum())
+    var_items = df_inv[df_inv['Type_Cout'] == 'Variable']
+    variable = float(var_items['Prix_Estime'].sum()) if not var_items.empty else DEFAULT_VARIABLE_COST
+    return InvestmentRule(fixed, variable)
+
+
+def parse_allocations(value):
+    """'Tomate=10,Carotte=5' (ou séparé par des ';') -> {'Tomate': 10.0, 'Carotte': 5.0}."""
+    if isinstance(value, dict):
+        return {str(veg).strip(): float(surf) for veg, surf in value.items()}
+    allocations = {}
+    for item in str(value or "").replace(";", ",").split(","):
+        if not item.strip():
+            continue
+        veg, sep, surf = item.partition("=")
+        if not sep or not veg.strip():
+            raise ValueError(f"allocation invalide : {item.strip()!r} (attendu Légume=m²)")
+        allocations[veg.strip()] = allocations.get(veg.strip(), 0.0) + float(surf)
+    return allocations
+
+
+def scenario_from_record(record, name, defaults=None):
+    """
+    Scénario depuis un enregistrement JSON ou une ligne CSV. Les champs absents
+    prennent `defaults` (options de la ligne de commande). Les colonnes qui ne sont
+    pas des champs réservés sont des surfaces de légumes (cases vides ignorées).
+    """
+    defaults = defaults or {}
+    name = str(record.get("name") or name)
+    try:
+        allocations = parse_allocations(record.get("alloc"))
+        for column, value in record.items():
+            if column not in FIELDS and value not in (None, ""):
+                allocations[column.strip()] = allocations.get(column.strip(), 0.0) + float(value)
+        allocations = {veg: surf for veg, surf in allocations.items() if surf != 0}
+
+        def field(key, cast):
+            value = record.get(key)
+            value = defaults.get(key) if value in (None, "") else value
+            return None if value is None else cast(value)
+
+        surface, years, rate = field("surface", float), field("years", int), field("rate", float)
+        return Scenario(
+            name=name,
+            allocations=allocations,
+            surface=sum(allocations.values()) if surface is None else surface,
+            years=DEFAULT_YEARS if years is None else years,
+            bank_rate=DEFAULT_BANK_RATE if rate is None else rate,
+            investment=field("investment", float),
+        )
+    except (TypeError, ValueError) as exc:
+        return Scenario(name, {}, 0.0, error=f"valeur invalide : {exc}")
+
+
+def read_scenarios(path, defaults=None):
+    """
+    Lit un fichier de scénarios au fil de l'eau (générateur) : JSON Lines (.jsonl),
+    JSON (liste ou {"scenarios": [...]}) ou CSV. "-" lit l'entrée standard en JSON Lines.
+    """
+    source = "stdin" if path == "-" else os.path.basename(path)
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8-sig", newline="")
+    try:
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            for n, row in enumerate(csv.DictReader(f), start=1):
+                yield scenario_from_record(row, f"{source}#{n}", defaults)
+        elif extension == ".json":
+            data = json.load(f)
+            records = data.get("scenarios", [data]) if isinstance(data, dict) else data
+            for n, record in enumerate(records, start=1):
+                yield scenario_from_record(record, f"{source}#{n}", defaults)
+        else:
+            for n, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    yield Scenario(f"{source}#{n}", {}, 0.0, error=f"JSON invalide : {exc}")
+                    continue
+                yield scenario_from_record(record, f"{source}#{n}", defaults)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+#___________________________________
+# DONNÉES
+#___________________________________
+
+def load_coefficients(data_dir=None):
+    """
+    Coefficients de la version publiée (ou de `data_dir` sans publication). Avec
+    coefficients.npy, seul NumPy est chargé ; sinon la table est calculée depuis
+    FACT_potager (pandas, pyarrow).
+    """
+    data_dir = data_dir or chemins.DATA_DIR
+    version = partage.current_version(data_dir)
+    with chemins.reading_from(partage.version_path(version, data_dir) if version else data_dir):
+        table = load_coefficient_table()
+    if len(table) == 0:
+        raise FileNotFoundError(f"aucun coefficient dans {data_dir} : lancez python -m ecoyield.pipeline")
+    return coefficients_from_table(table)
+
+
+def load_investment_rule(data_dir=None):
+    """Règle d'investissement de la version publiée ; charge pandas, à n'appeler que si besoin."""
+    from ecoyield import stockage
+
+    data_dir = data_dir or chemins.DATA_DIR
+    version = partage.current_version(data_dir)
+    with chemins.reading_from(partage.version_path(version, data_dir) if version else data_dir):
+        df_inv = stockage.read_frame("Investissement_Materiel") if stockage.exists("Investissement_Materiel") else None
+    return investment_rule(df_inv)
+
+#___________________________________
+# SIMULATION PAR BLOCS
+#___________________________________
+
+def check(scenario, names):
+    """Message d'erreur d'un scénario non simulable, ou None."""
+    if scenario.error:
+        return scenario.error
+    unknown = sorted(set(scenario.allocations) - set(names))
+    if unknown:
+        return f"légume(s) inconnu(s) : {', '.join(unknown)}"
+    if any(surf < 0 for surf in scenario.allocations.values()):
+        return "surface négative"
+    if sum(scenario.allocations.values()) > scenario.surface + 1e-9:
+        return f"{sum(scenario.allocations.values()):g} m² alloués pour {scenario.surface:g} m² disponibles"
+    if scenario.years < 1:
+        return "durée inférieure à 1 an"
+    return None
+
+
+def summarize(scenario, result, row, series=False):
+    """Ligne de résultat d'un scénario (ligne `row` d'un SimulationResult par lots ; l'année 0 vaut l'investissement)."""
+    garden, bank = float(result.garden_net[row, -1]), float(result.bank_value[row, -1])
+    record = {
+        "name": scenario.name,
+        "surface": scenario.surface,
+        "allocated_m2": round(sum(scenario.allocations.values()), 3),
+        "years": scenario.years,
+        "investment": float(result.bank_value[row, 0]),
+        "bank_rate": scenario.bank_rate,
+        "garden_net": round(garden, 2),
+        "bank_value": round(bank, 2),
+        "gap": round(garden - bank, 2),
+        "co2_kg": round(float(result.co2[row, -1]), 2),
+        "kilos_per_year": round(float(result.kilos[row, -1]), 2),
+        "value_per_year": round(float(result.annual_value[row, -1]), 2),
+    }
+    if series:
+        for field in ("garden_net", "bank_value", "co2"):
+            record[f"{field}_by_year"] = np.round(getattr(result, field)[row], 2).tolist()
+    return record
+
+
+def run_scenarios(scenarios, coefs, rule=None, chunk_size=CHUNK_SIZE, series=False):
+    """
+    Simule un flux de scénarios (n'importe quel itérable, même sans fin) par blocs
+    de `chunk_size` : un appel de simulate_batch par durée dans chaque bloc. Les
+    résultats sortent dans l'ordre d'entrée, un dict par scénario ; un scénario
+    invalide donne {"name", "error"} sans interrompre le lot.
+    `rule` fixe l'investissement des scénarios qui n'en donnent pas : une
+    InvestmentRule, ou une fonction qui la charge au premier scénario concerné
+    (load_investment_rule importe pandas, inutile si tous les plans la précisent).
+    """
+    rule = rule or InvestmentRule()
+    scenarios = iter(scenarios)
+    while True:
+        chunk = list(islice(scenarios, chunk_size))
+        if not chunk:
+            return
+        records = [None] * len(chunk)
+        by_years = {}
+        for i, scenario in enumerate(chunk):
+            error = check(scenario, coefs.names)
+            if error:
+                records[i] = {"name": scenario.name, "error": error}
+            else:
+                by_years.setdefault(scenario.years, []).append(i)
+
+        for years, rows in by_years.items():
+            group = [chunk[i] for i in rows]
+            if callable(rule) and any(s.investment is None for s in group):
+                rule = rule()
+            result = simulate_batch(
+                plans_from_dicts([s.allocations for s in group], coefs.names),
+                coefs, years,
+                np.array([rule.amount(s.surface) if s.investment is None else s.investment for s in group]),
+                np.array([s.bank_rate for s in group]),
+            )
+            for row, i in enumerate(rows):
+                records[i] = summarize(chunk[i], result, row, series)
+        yield from records
@@ -0,0 +1,233 @@
+import numpy as np
+from typing import NamedTuple
+
+#___________________________________
+# COEFFICIENTS PAR LÉGUME
+#___________________________________
+
+# Clés du dictionnaire renvoyé par load_garden_data() (app_ecoyield.py)
+DEFAULT_KEYS = ("yield", "price", "co2", "water", "seeds")
+
+
+class Coefficients(NamedTuple):
+    """Coefficients par légume, un tableau (V,) par champ."""
+    names: tuple
+    kg_m2: np.ndarray   # rendement (kg/m²/an)
+    price: np.ndarray   # prix de marché (€/kg)
+    co2: np.ndarray     # CO2 évité (kg/kg)
+    water: np.ndarray   # coût de l'eau (€/m²/an)
+    seeds: np.ndarray   # coût des graines (€/m²/an)
+
+
+def allocation_matrix(allocations, names, years):
+    """Construit la matrice (légumes × années) à partir du dict {légume: m²} des sliders."""
+    index = {n: i for i, n in enumerate(names)}
+    alloc = np.zeros((len(names), years), dtype=float)
+    for veg, surf in allocations.items():
+        alloc[index[veg], :] = surf
+    return alloc
+
+#___________________________________
+# SIMULATION
+#___________________________________
+
+class SimulationResult(NamedTuple):
+    """Séries annuelles de l'année 0 à l'année `years` incluse."""
+    years: np.ndarray          # 0..Y
+    garden_net: np.ndarray     # profit cumulé du potager moins l'investissement (€)
+    bank_value: np.ndarray     # valeur du placement bancaire (€)
+    co2: np.ndarray            # CO2 évité cumulé (kg)
+    kilos: np.ndarray          # production de l'année (kg)
+    annual_value: np.ndarray   # valeur de la récolte de l'année (€)
+
+
+def simulate(allocations, coefs, initial_investment, bank_rate):
+    """
+    Simule le potager et le placement bancaire en une seule passe vectorisée.
+
+    `allocations` est une matrice (légumes × années) de m² cultivés chaque année,
+    alignée sur `coefs.names`. L'année 0 correspond à l'investissement initial.
+    """
+    alloc = np.asarray(allocations, dtype=float)
+    n_years = alloc.shape[-1]
+
+    kg = alloc * coefs.kg_m2[:, None]
+    y_kg = kg.sum(axis=0)
+    y_val = coefs.price @ kg
+    y_co2 = coefs.co2 @ kg
+    y_costs = (coefs.water + coefs.seeds) @ alloc
+
+    def with_year_zero(serie, start=0.0):
+        return np.concatenate(([start], serie))
+
+    years = np.arange(n_years + 1)
+    return SimulationResult(
+        years=years,
+        garden_net=with_year_zero(np.cumsum(y_val - y_costs)) - initial_investment,
+        bank_value=initial_investment * (1 + bank_rate / 100) ** years,
+        co2=with_year_zero(np.cumsum(y_co2)),
+        kilos=with_year_zero(y_kg),
+        annual_value=with_year_zero(y_val),
+    )
+
+#___________________________________
+# SIMULATION PAR LOTS (SCÉNARIOS)
+#___________________________________
+
+def plans_from_dicts(plans, names):
+    """Construit la matrice (scénarios × légumes) à partir d'une liste de dicts {légume: m²}."""
+    index = {n: i for i, n in enumerate(names)}
+    matrix = np.zeros((len(plans), len(names)), dtype=float)
+    for row, plan in enumerate(plans):
+        for veg, surf in plan.items():
+            matrix[row, index[veg]] = surf
+    return matrix
+
+
+def simulate_batch(plans, coefs, years, initial_investment, bank_rate):
+    """
+    Évalue N plans d'allocation constants sur `years` années en un seul appel.
+
+    `plans` est une matrice (N × légumes) de m² alignée sur `coefs.names`.
+    `initial_investment` et `bank_rate` acceptent un scalaire ou un tableau (N,)
+    pour les balayages de sensibilité. Chaque série du résultat est de forme (N, years + 1).
+    """
+    plans = np.atleast_2d(np.asarray(plans, dtype=float))
+    n = plans.shape[0]
+
+    # Tout est linéaire en surface : une seule multiplication matricielle pour les quatre indicateurs
+    per_m2 = np.stack([
+        coefs.kg_m2,
+        coefs.kg_m2 * coefs.price,
+        coefs.kg_m2 * coefs.co2,
+        coefs.water + coefs.seeds,
+    ], axis=1)
+    y_kg, y_val, y_co2, y_costs = (plans @ per_m2).T
+
+    year_idx = np.arange(years + 1)
+    invest = np.broadcast_to(np.asarray(initial_investment, dtype=float), (n,))[:, None]
+    rate = np.broadcast_to(np.asarray(bank_rate, dtype=float), (n,))[:, None]
+    harvested = (year_idx > 0).astype(float)
+
+    return SimulationResult(
+        years=year_idx,
+        garden_net=(y_val - y_costs)[:, None] * year_idx - invest,
+        bank_value=invest * (1 + rate / 100) ** year_idx,
+        co2=y_co2[:, None] * year_idx,
+        kilos=y_kg[:, None] * harvested,
+        annual_value=y_val[:, None] * harvested,
+    )
+
+#___________________________________
+# SIMULATION MENSUELLE (SAISONS)
+#___________________________________
+
+MONTHS_PER_YEAR = 12
+DAYS_PER_YEAR = 365.25
+DAYS_PER_MONTH = DAYS_PER_YEAR / MONTHS_PER_YEAR
+DAYS_PER_WEEK = 7
+DEFAULT_SOWING_MONTH = 3    # avril (0 = janvier)
+HARVEST_MONTHS = 2          # la récolte s'étale sur deux mois
+
+
+class CropCalendar(NamedTuple):
+    """Calendrier de culture par légume, aligné sur `Coefficients.names`."""
+    cycle_days: np.ndarray      # (V,) jours du semis à la première récolte (Recolte_jours)
+    water_week: np.ndarray      # (V,) coût de l'eau par semaine de culture (€/m²)
+    sowing_month: np.ndarray    # (V,) mois de semis (0 = janvier)
+    price_factors: np.ndarray   # (12, V) prix du mois / prix moyen annuel
+
+
+class MonthlyResult(NamedTuple):
+    """Séries mensuelles du mois 0 (investissement) au mois 12 × années inclus."""
+    months: np.ndarray         # 0..M
+    garden_net: np.ndarray     # profit cumulé du potager moins l'investissement (€)
+    bank_value: np.ndarray     # valeur du placement bancaire (€)
+    co2: np.ndarray            # CO2 évité cumulé (kg)
+    kilos: np.ndarray          # récolte du mois (kg)
+    value: np.ndarray          # valeur de la récolte du mois, au prix de saison (€)
+    costs: np.ndarray          # eau + graines du mois (€)
+
+
+def simulate_monthly(allocations, coefs, calendar, initial_investment, bank_rate,
+                     start_month=0, harvest_months=HARVEST_MONTHS):
+    """
+    Simule le potager mois par mois, sans boucle sur les mois ni sur les légumes.
+
+    `allocations` est la matrice (légumes × années) de `simulate`. Chaque année,
+    un légume est semé à son mois de semis ; sa récolte annuelle (kg_m2) tombe
+    `cycle_days` plus tard, étalée sur `harvest_months` mois, et se vend au prix
+    de saison (prix moyen × facteur du mois). L'eau est facturée chaque semaine
+    entre le semis et la fin de la récolte, les graines au mois du semis.
+    Une récolte qui dépasse l'horizon n'est pas comptée. Le mois 0 correspond à
+    `start_month` (0 = janvier).
+    """
+    alloc = np.asarray(allocations, dtype=float)
+    n_veg, n_years = alloc.shape
+    n_months = n_years * MONTHS_PER_YEAR
+    veg = np.arange(n_veg)
+
+    # Mois (absolus) de semis et de récolte de chaque culture : (années, légumes)
+    sowing = (np.arange(n_years)[:, None] * MONTHS_PER_YEAR
+              + (calendar.sowing_month - start_month) % MONTHS_PER_YEAR)
+    lag = np.rint(calendar.cycle_days / DAYS_PER_MONTH).astype(int)
+    crop_area = alloc.T
+
+    # Récolte : (années, mois d'étalement, légumes) projetés sur la grille (mois × légumes)
+    harvest = sowing[:, None, :] + lag + np.arange(harvest_months)[None, :, None]
+    kg = np.broadcast_to((crop_area * coefs.kg_m2 / harvest_months)[:, None, :], harvest.shape)
+    inside = harvest < n_months
+    kilos = np.zeros((n_months, n_veg))
+    np.add.at(kilos, (harvest[inside], np.broadcast_to(veg, harvest.shape)[inside]), kg[inside])
+
+    month_of_year = (start_month + np.arange(n_months)) % MONTHS_PER_YEAR
+    prices = coefs.price * calendar.price_factors[month_of_year]
+    m_value = (kilos * prices).sum(axis=1)
+    m_kilos = kilos.sum(axis=1)
+    m_co2 = kilos @ coefs.co2
+
+    # Eau : une ligne par semaine ; chaque semaine est rattachée à sa culture et à son mois
+    week_day = np.arange(int(np.ceil(n_months * DAYS_PER_MONTH / DAYS_PER_WEEK))) * DAYS_PER_WEEK
+    since_sowing = week_day[:, None] - ((calendar.sowing_month - start_month) % MONTHS_PER_YEAR) * DAYS_PER_MONTH
+    crop_year = np.floor(since_sowing / DAYS_PER_YEAR).astype(int)
+    season_day = since_sowing - crop_year * DAYS_PER_YEAR
+    growing = (since_sowing >= 0) & (season_day < calendar.cycle_days + harvest_months * DAYS_PER_MONTH) & (crop_year < n_years)
+    area = np.where(growing, crop_area[np.clip(crop_year, 0, n_years - 1), veg], 0.0)
+    week_month = np.minimum((week_day / DAYS_PER_MONTH).astype(int), n_months - 1)
+    m_costs = np.bincount(week_month, weights=area @ calendar.water_week, minlength=n_months)
+
+    # Graines : achetées au mois du semis
+    seeds = np.zeros(n_months)
+    np.add.at(seeds, sowing.ravel(), (crop_area * coefs.seeds).ravel())
+    m_costs = m_costs + seeds
+
+    def with_month_zero(serie, start=0.0):
+        return np.concatenate(([start], serie))
+
+    months = np.arange(n_months + 1)
+    return MonthlyResult(
+        months=months,
+        garden_net=with_month_zero(np.cumsum(m_value - m_costs)) - initial_investment,
+        bank_value=initial_investment * (1 + bank_rate / 100) ** (months / MONTHS_PER_YEAR),
+        co2=with_month_zero(np.cumsum(m_co2)),
+        kilos=with_month_zero(m_kilos),
+        value=with_month_zero(m_value),
+        costs=with_month_zero(m_costs),
+    )
+
+
+def yearly_summary(monthly):
+    """Ramène une simulation mensuelle aux séries annuelles de `simulate` (bilans en fin d'année)."""
+    ends = monthly.months[::MONTHS_PER_YEAR]
+
+    def per_year(serie):
+        return np.concatenate(([0.0], serie[1:].reshape(-1, MONTHS_PER_YEAR).sum(axis=1)))
+
+    return SimulationResult(
+        years=ends // MONTHS_PER_YEAR,
+        garden_net=monthly.garden_net[ends],
+        bank_value=monthly.bank_value[ends],
+        co2=monthly.co2[ends],
+        kilos=per_year(monthly.kilos),
+        annual_value=per_year(monthly.value),
+    )
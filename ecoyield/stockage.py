@@ -0,0 +1,302 @@
+import glob
+import os
+import pandas as pd
+import pyarrow as pa
+from typing import NamedTuple
+from ecoyield.chemins import DATA_DIR, data_dir, working_dir
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+# Fichiers Arrow IPC (non compressés, lisibles en mémoire mappée sans copie), rangés dans DATA_DIR (ecoyield.chemins)
+
+DATE = pa.date32()
+CATEGORIE = pa.dictionary(pa.int32(), pa.string())
+TEXTE = pa.string()
+# Nombres décimaux en float64, comme l'export CSV : relus sans conversion ni copie,
+# ils redonnent exactement les valeurs écrites (2.03 reste 2.03)
+PRIX = pa.float64()
+MESURE = pa.float64()
+ENTIER = pa.int16()
+
+# Métadonnée d'un fichier Arrow : état (taille, date) de l'export CSV dont il est tiré
+SOURCE_KEY = b"ecoyield.source"
+
+
+class TableSpec(NamedTuple):
+    """
+    Schéma typé d'une table propre et conventions de son export CSV historique.
+
+    Avec `partition` (colonne date), la table est découpée en un fichier par année :
+    `csv_file` contient alors le motif `{annee}`, et les fichiers Arrow sont rangés
+    dans DATA_DIR/<table>/<année>.arrow.
+    """
+    csv_file: str
+    schema: pa.Schema
+    sep: str = ","
+    encoding: str = "utf-8"
+    partition: str = None
+
+
+TABLES = {
+    "Besoins_eau_legumes": TableSpec("Besoins_eau_legumes.csv", pa.schema([
+        ("Categorie", CATEGORIE), ("Besoin_Hebdo_L_m2", ENTIER), ("Besoin_Total_Cycle_L_m2", ENTIER),
+    ]), sep=";", encoding="utf-8-sig"),
+    "Investissement_Materiel": TableSpec("Investissement_Materiel.csv", pa.schema([
+        ("Item", TEXTE), ("Categorie", CATEGORIE), ("Prix_Estime", PRIX), ("Duree_Vie_Ans", ENTIER),
+        ("Amortissement_Annuel", PRIX), ("Type_Cout", CATEGORIE),
+    ]), sep=";", encoding="utf-8-sig"),
+    "Impact_co2_Clean": TableSpec("Impact_co2_Clean.csv", pa.schema([
+        ("Legume", TEXTE), ("Agriculture", MESURE), ("Transformation", MESURE), ("Transport", MESURE),
+        ("Distribution", MESURE), ("Consommation", MESURE), ("Total", MESURE),
+    ]), sep=";", encoding="utf-8-sig"),
+    "Rendement_clean": TableSpec("Rendement_clean.csv", pa.schema([
+        ("Legumes", TEXTE), ("Rendement_kg_m2", MESURE), ("Densite_pied_m2", MESURE), ("Levée_jours", MESURE),
+        ("Recolte_jours", MESURE), ("qté_1pers", MESURE),
+    ])),
+    "Prix_graines_clean": TableSpec("Prix_graines_clean.csv", pa.schema([
+        ("Categorie", CATEGORIE), ("Legume", TEXTE), ("Prix", PRIX),
+    ])),
+    "Prix_graine_moyen": TableSpec("Prix_graine_moyen.csv", pa.schema([
+        ("Categorie", CATEGORIE), ("Prix", PRIX),
+    ])),
+    "Prix_legumes_historique_clean": TableSpec("Prix_legumes_historique_clean/{annee}.csv", pa.schema([
+        ("Date", DATE), ("Categorie", CATEGORIE), ("Legume", CATEGORIE), ("Prix", PRIX), ("Unite", CATEGORIE),
+    ]), sep=";", partition="Date"),
+    "Prix_legume_moyen": TableSpec("Prix_legume_moyen/{annee}.csv", pa.schema([
+        ("Date", DATE), ("Categorie", CATEGORIE), ("Prix", PRIX),
+    ]), partition="Date"),
+    "Prix_eau": TableSpec("Prix_eau.csv", pa.schema([
+        ("Annee", ENTIER), ("Prix_m3", PRIX), ("Prix_m2", PRIX),
+    ]), sep=";"),
+    "Taux_bancaires_clean": TableSpec("Taux_bancaires_clean.csv", pa.schema([
+        ("time_period_end", DATE), ("Livret_A", MESURE), ("LDDS", MESURE), ("LEP", MESURE), ("Inflation", MESURE),
+    ])),
+    "DIM_Legume": TableSpec("DIM_Legume.csv", pa.schema([
+        ("Nom_Legume", TEXTE), ("Eau_Hebdo_L_m2", ENTIER), ("Eau_Cycle_L_m2", ENTIER), ("Prix_graine", PRIX),
+        ("Rendement_kg_m2", MESURE), ("Densite_pied_m2", MESURE), ("Recolte_jours", MESURE),
+    ])),
+    "FACT_potager": TableSpec("FACT_potager.csv", pa.schema([
+        ("Nom_Legume", TEXTE), ("Eau_Hebdo_L_m2", ENTIER), ("Eau_Cycle_L_m2", ENTIER), ("Prix_graine", PRIX),
+        ("Rendement_kg_m2", MESURE), ("Densite_pied_m2", MESURE), ("Recolte_jours", MESURE),
+        ("Prix_Marche_kg", MESURE), ("Empreinte_co2_kg", MESURE), (" CO2_Supermarche_kg", MESURE),
+        ("Gain_Brut_m2", MESURE), ("CO2_m2", MESURE), ("CO2_Supermarche_m2", MESURE), ("Cout_Eau_m2", MESURE),
+        ("CO2_Economise_m2", MESURE),
+    ])),
+    "FACT_Previsions_5ans": TableSpec("FACT_Previsions_5ans.csv", pa.schema([
+        ("Annee", ENTIER), ("Nom_Legume", CATEGORIE), ("Gain_Brut_m2", MESURE), ("Cout_Eau_m2", MESURE),
+        ("Marge_Nette_m2", MESURE), ("CO2_m2", MESURE), ("CO2_Economise_m2", MESURE),
+    ])),
+}
+
+#___________________________________
+# CONVERSION
+#___________________________________
+
+def arrow_path(name, year=None):
+    if year is None:
+        return os.path.join(data_dir(), f"{name}.arrow")
+    return os.path.join(data_dir(), name, f"{year}.arrow")
+
+
+def csv_path(name, year=None):
+    csv_file = TABLES[name].csv_file
+    return csv_file if year is None else csv_file.format(annee=year)
+
+
+def partition_years(name):
+    """Années présentes d'une table partitionnée (fichiers Arrow ou exports CSV ; Arrow seuls dans une version publiée)."""
+    paths = glob.glob(arrow_path(name, "*"))
+    if working_dir():
+        paths += glob.glob(csv_path(name, "*"))
+    return sorted({int(os.path.splitext(os.path.basename(p))[0]) for p in paths})
+
+
+def source_stamp(path):
+    """Taille et date de modification (ns) d'un export CSV : un fichier Arrow n'est valable que pour cet état."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+
+def to_arrow(df, name):
+    """Convertit un DataFrame au schéma déclaré de la table (colonnes absentes : erreur)."""
+    schema = TABLES[name].schema
+    arrays = []
+    for field in schema:
+        col = df[field.name]
+        if pa.types.is_date(field.type):
+            col = pd.to_datetime(col)
+        elif pa.types.is_dictionary(field.type) or pa.types.is_string(field.type):
+            col = col.astype("string")
+        array = pa.array(col, from_pandas=True)
+        if isinstance(array, pa.ChunkedArray):
+            # Texte concaténé (pandas adossé à Arrow) : un seul bloc, donc un seul dictionnaire par fichier
+            array = array.combine_chunks()
+        arrays.append(array.cast(field.type, safe=False))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def to_frame(table):
+    """Table Arrow -> DataFrame (catégories en Categorical, dates en datetime64)."""
+    return table.to_pandas(date_as_object=False)
+
+#___________________________________
+# LECTURE / ÉCRITURE
+#___________________________________
+
+def write_arrow(table, name, year=None, source=None):
+    """
+    Écrit la table en Arrow IPC, avec remplacement atomique du fichier. `source`
+    (source_stamp) note l'état de l'export CSV correspondant.
+    """
+    if source is not None:
+        table = table.replace_schema_metadata({SOURCE_KEY: source})
+    path = arrow_path(name, year)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def write_csv(table, name, year=None):
+    spec = TABLES[name]
+    path = csv_path(name, year)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    to_frame(table).to_csv(path, index=False, sep=spec.sep, encoding=spec.encoding)
+
+
+def write_file(table, name, year=None, csv=True):
+    """Écrit l'export CSV (si `csv`) puis le fichier Arrow, qui note l'état du CSV écrit."""
+    if csv:
+        write_csv(table, name, year)
+    source = csv_path(name, year)
+    write_arrow(table, name, year, source_stamp(source) if os.path.exists(source) else None)
+
+
+def write_partitions(df, name, csv=True):
+    """
+    Écrit uniquement les partitions (années) présentes dans `df`, qui doit
+    contenir toutes les lignes de ces années. Les autres années ne sont pas touchées.
+    """
+    spec = TABLES[name]
+    years = pd.to_datetime(df[spec.partition]).dt.year
+    for year, part in df.groupby(years.to_numpy()):
+        write_file(to_arrow(part, name), name, year, csv)
+    return sorted(set(years))
+
+
+def remove_partition(name, year):
+    for path in (arrow_path(name, year), csv_path(name, year)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def write_table(df, name, csv=True):
+    """
+    Écrit la table typée en Arrow IPC et, si `csv`, l'export CSV avec les
+    conventions historiques du fichier (séparateur, BOM). Une table partitionnée
+    est entièrement remplacée : les années absentes de `df` sont supprimées.
+    """
+    if TABLES[name].partition:
+        years = write_partitions(df, name, csv)
+        for year in set(partition_years(name)) - set(years):
+            remove_partition(name, year)
+        return read_table(name)
+
+    table = to_arrow(df, name)
+    write_file(table, name, csv=csv)
+    return table
+
+
+def read_csv_table(name, year=None):
+    """Relit l'export CSV et le convertit au schéma (fichier Arrow absent ou périmé)."""
+    spec = TABLES[name]
+    df = pd.read_csv(csv_path(name, year), sep=spec.sep, encoding=spec.encoding)
+    return to_arrow(df, name)
+
+
+def _fresh_arrow(name, year=None):
+    """
+    Fichier Arrow en mémoire mappée, ou None s'il manque ou si l'export CSV a changé
+    depuis son écriture (git pull, CSV réécrit par une étape du pipeline, édition à la main).
+    """
+    path = arrow_path(name, year)
+    if not os.path.exists(path):
+        return None
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    source = csv_path(name, year)
+    if os.path.exists(source) and (table.schema.metadata or {}).get(SOURCE_KEY) != source_stamp(source):
+        return None
+    return table.replace_schema_metadata(None)
+
+
+def convert(name, year=None):
+    """Reconstruit le fichier Arrow depuis l'export CSV ; renvoie la table."""
+    source = source_stamp(csv_path(name, year))
+    table = read_csv_table(name, year)
+    try:
+        write_arrow(table, name, year, source)
+    except OSError:
+        pass    # répertoire en lecture seule : on lit le CSV sans le convertir
+    return table
+
+
+def _read_file(name, year=None):
+    if not working_dir():
+        # Version publiée : ses fichiers Arrow seulement, jamais les CSV (modifiables) du dossier de travail
+        path = arrow_path(name, year)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{name} absent de la version lue ({path})")
+        return pa.ipc.open_file(pa.memory_map(path, "r")).read_all().replace_schema_metadata(None)
+    table = _fresh_arrow(name, year)
+    return table if table is not None else convert(name, year)
+
+
+def read_table(name, years=None):
+    """
+    Charge la table en mémoire mappée, sans copie ni analyse de texte.
+    Pour une table partitionnée, `years` limite la lecture à ces années.
+    """
+    if not TABLES[name].partition:
+        return _read_file(name)
+
+    present = partition_years(name)
+    if years is not None:
+        present = [year for year in present if year in set(years)]
+    tables = [_read_file(name, year) for year in present]
+    return pa.concat_tables(tables) if tables else TABLES[name].schema.empty_table()
+
+
+def read_frame(name, years=None):
+    return to_frame(read_table(name, years))
+
+
+def exists(name):
+    if TABLES[name].partition:
+        return bool(partition_years(name))
+    return os.path.exists(arrow_path(name)) or (working_dir() and os.path.exists(csv_path(name)))
+
+
+def convert_all():
+    """Convertit les exports CSV sans fichier Arrow à jour (toutes les tables déclarées) ; renvoie les tables absentes."""
+    missing = []
+    for name, spec in TABLES.items():
+        if not exists(name):
+            missing.append(name)
+            continue
+        converted = 0
+        for year in partition_years(name) if spec.partition else [None]:
+            if working_dir() and os.path.exists(csv_path(name, year)) and _fresh_arrow(name, year) is None:
+                convert(name, year)
+                converted += 1
+        if converted:
+            print(f"{name} -> {arrow_path(name, '*') if spec.partition else arrow_path(name)}")
+    return missing
+
+
+if __name__ == "__main__":
+    convert_all()
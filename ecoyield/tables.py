@@ -0,0 +1,62 @@
+from ecoyield.stockage import read_frame, write_table
+
+#___________________________________
+# CONFIGURATION
+#___________________________________
+
+# Noms de catégorie qui n'existent pas tels quels dans Rendement_clean.csv
+RENDEMENT_ALIASES = {
+    "Laitue": "Laitue pommées",
+    "Potimarron": "Courge maxima (red kuri, …)",
+    "Butternut": "Courge moschata (butternut, …)",
+}
+
+DIM_COLUMNS = ['Nom_Legume', 'Eau_Hebdo_L_m2', 'Eau_Cycle_L_m2', 'Prix_graine', 'Rendement_kg_m2', 'Densite_pied_m2', 'Recolte_jours']
+
+#___________________________________
+# CONSTRUCTION DES TABLES
+#___________________________________
+
+def build_fact_potager():
+    """Joint les tables propres (rendement, eau, CO2, graines, prix) en une ligne par légume."""
+    df_co2 = read_frame("Impact_co2_Clean")
+    df_eau = read_frame("Besoins_eau_legumes")
+    df_graine = read_frame("Prix_graine_moyen")
+    df_rendement = read_frame("Rendement_clean").dropna(subset=['Rendement_kg_m2']).drop_duplicates(subset=['Legumes'])
+    df_prix = read_frame("Prix_legume_moyen")
+    df_prix_eau = read_frame("Prix_eau")
+
+    # Prix de marché : moyenne de la dernière année complète disponible
+    derniere_annee = df_prix['Date'].dt.year.max()
+    prix_marche = df_prix[df_prix['Date'].dt.year == derniere_annee].groupby('Categorie', observed=True)['Prix'].mean()
+    prix_m3 = df_prix_eau.sort_values('Annee')['Prix_m3'].iloc[-1]
+
+    df_rendement['Nom_Legume'] = df_rendement['Legumes']
+    for categorie, nom_rendement in RENDEMENT_ALIASES.items():
+        df_rendement.loc[df_rendement['Legumes'] == nom_rendement, 'Nom_Legume'] = categorie
+
+    df = df_co2.rename(columns={'Legume': 'Nom_Legume'})[['Nom_Legume', 'Agriculture', 'Total']]
+    df = df.merge(df_eau.rename(columns={'Categorie': 'Nom_Legume', 'Besoin_Hebdo_L_m2': 'Eau_Hebdo_L_m2', 'Besoin_Total_Cycle_L_m2': 'Eau_Cycle_L_m2'}), on='Nom_Legume')
+    df = df.merge(df_graine.rename(columns={'Categorie': 'Nom_Legume', 'Prix': 'Prix_graine'}), on='Nom_Legume')
+    df = df.merge(df_rendement[['Nom_Legume', 'Rendement_kg_m2', 'Densite_pied_m2', 'Recolte_jours']], on='Nom_Legume')
+    df['Prix_Marche_kg'] = df['Nom_Legume'].map(prix_marche)
+    df = df.dropna(subset=['Prix_Marche_kg'])
+
+    df['Empreinte_co2_kg'] = df['Agriculture']
+    df[' CO2_Supermarche_kg'] = df['Total']
+    df['Gain_Brut_m2'] = df['Rendement_kg_m2'] * df['Prix_Marche_kg']
+    df['CO2_m2'] = df['Empreinte_co2_kg'] * df['Rendement_kg_m2']
+    df['CO2_Supermarche_m2'] = df[' CO2_Supermarche_kg'] * df['Rendement_kg_m2']
+    df['Cout_Eau_m2'] = df['Eau_Cycle_L_m2'] * prix_m3 / 1000
+    df['CO2_Economise_m2'] = df['CO2_Supermarche_m2'] - df['CO2_m2']
+
+    return df[DIM_COLUMNS + ['Prix_Marche_kg', 'Empreinte_co2_kg', ' CO2_Supermarche_kg', 'Gain_Brut_m2', 'CO2_m2', 'CO2_Supermarche_m2', 'Cout_Eau_m2', 'CO2_Economise_m2']]
+
+
+def build_tables():
+    """Écrit FACT_potager et DIM_Legume à partir d'une seule jointure (prévisions : ecoyield.previsions)."""
+    df_fact = build_fact_potager()
+
+    write_table(df_fact, "FACT_potager")
+    write_table(df_fact[DIM_COLUMNS], "DIM_Legume")
+    print(f"Tables FACT/DIM mises à jour ({len(df_fact)} légumes)")
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+#___________________________________
+# TABLE DE CONVERSION
+#___________________________________
+
+# Poids (g) d'une unité de vente, par catégorie ("*" : toutes les catégories).
+# Poids absent (None) : pas de poids fiable, les relevés sont écartés.
+# Une unité qui ne figure pas dans la table est laissée telle quelle (les prix au kg notamment).
+CONVERSIONS = pd.DataFrame([
+    ("*", "botte", None),          # poids d'une botte trop variable
+    ("*", "500 g", 500),
+    ("*", "barquette 250 g", 250),
+    ("*", "barquette 500 g", 500),
+    ("Concombre", "pièce", 400),
+    ("Laitue", "pièce", 450),
+    ("Tomate", "pièce", 150),
+    ("Tomate", "barquette", 250),
+], columns=["Categorie", "Unite", "Poids_g"])
+
+#___________________________________
+# NORMALISATION DES PRIX
+#___________________________________
+
+def convertir_en_kg(df, table=CONVERSIONS):
+    """
+    Ramène les prix à l'unité "kg" en une seule jointure (catégorie × unité) :
+    Prix = Prix × 1000 / Poids_g. La correspondance de catégorie ignore la casse,
+    et une règle propre à la catégorie l'emporte sur la règle "*".
+    """
+    categories = df['Categorie'].astype(str).str.capitalize().to_numpy()
+    unites = df['Unite'].astype(str).to_numpy()
+
+    regles = table.set_index(['Categorie', 'Unite'])['Poids_g'].astype(float)
+    generiques = regles.xs("*", level='Categorie')
+    specifiques = regles.drop("*", level='Categorie')
+
+    cles = pd.MultiIndex.from_arrays([categories, unites])
+    connu_specifique = cles.isin(specifiques.index)
+    connu = connu_specifique | np.isin(unites, generiques.index)
+    poids = np.where(
+        connu_specifique,
+        specifiques.reindex(cles).to_numpy(),
+        generiques.reindex(unites).to_numpy(),
+    )
+
+    exclu = connu & np.isnan(poids)
+    converti = connu & ~exclu
+
+    df = df.copy()
+    df.loc[converti, 'Prix'] = df.loc[converti, 'Prix'] * 1000 / poids[converti]
+    df.loc[converti, 'Unite'] = "kg"
+    return df[~exclu]
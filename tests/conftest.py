@@ -0,0 +1,42 @@
+import glob
+import os
+import shutil
+import sys
+import numpy as np
+import pytest
+from ecoyield.simulation import Coefficients
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+#___________________________________
+# DONNÉES DE TEST
+#___________________________________
+
+@pytest.fixture
+def coefs():
+    """Quatre légumes fictifs, dont un à marge négative (jamais choisi par l'optimiseur)."""
+    return Coefficients(
+        ("Tomate", "Carotte", "Laitue", "Poireau"),
+        kg_m2=np.array([4.0, 3.0, 2.0, 1.0]),
+        price=np.array([3.5, 1.5, 2.5, 0.5]),
+        co2=np.array([0.6, 0.4, 0.9, 0.3]),
+        water=np.array([1.2, 0.4, 0.8, 0.6]),
+        seeds=np.array([0.5, 0.2, 0.3, 0.1]),
+    )
+
+
+@pytest.fixture
+def projet(tmp_path, monkeypatch):
+    """
+    Copie des exports CSV du dépôt dans un dossier temporaire, devenu le dossier de
+    travail : donnees/ (relatif) y est créé, le dépôt n'est jamais modifié.
+    """
+    for pattern in ("*.csv", "Prix_legume_moyen/*.csv", "Prix_legumes_historique_clean/*.csv"):
+        for path in glob.glob(os.path.join(ROOT, pattern)):
+            destination = tmp_path / os.path.relpath(path, ROOT)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, destination)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
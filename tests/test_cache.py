@@ -0,0 +1,48 @@
+import numpy as np
+from ecoyield.cache import ResultCache, canonical_key
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1      # "a" devient la plus récente
+    cache.put("c", 3)               # "b" est évincée
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evicted"] == 1
+    assert len(cache) == 2
+
+
+def test_byte_bound_evicts_and_skips_oversized_values():
+    cache = ResultCache(max_entries=100, max_bytes=3000)
+    cache.put("a", np.zeros(200))   # 1600 octets
+    cache.put("b", np.zeros(100))   # 800 octets
+    cache.put("c", np.zeros(100))   # 3200 octets au total : "a" est évincée
+
+    assert cache.get("a") is None
+    assert cache.bytes == 1600
+    cache.put("big", np.zeros(1000))    # plus grand que le cache : jamais gardé
+    assert cache.get("big") is None and len(cache) == 2
+
+
+def test_replacing_a_key_updates_its_size():
+    cache = ResultCache(max_bytes=10_000)
+    cache.put("a", np.zeros(100))
+    cache.put("a", np.zeros(10))
+    assert cache.bytes == 80 and len(cache) == 1
+
+
+def test_get_or_compute_calls_once():
+    cache, calls = ResultCache(), []
+    compute = lambda: calls.append(1) or "résultat"
+    assert cache.get_or_compute("k", compute) == "résultat"
+    assert cache.get_or_compute("k", compute) == "résultat"
+    assert len(calls) == 1
+    assert cache.stats()["hit"] == 1 and cache.stats()["miss"] == 1
+
+
+def test_canonical_key_ignores_order_and_zero_surfaces():
+    assert canonical_key({"Tomate": 10, "Carotte": 0}, surface=30, years=3) == canonical_key({"Tomate": 10.0}, years=3, surface=30.0)
+    assert canonical_key({"Tomate": 10}, surface=30) != canonical_key({"Tomate": 11}, surface=30)
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+from ecoyield.canonique import analyser_produit, categorie, categories, decomposer_produits, supprimer_accents
+
+
+def test_supprimer_accents():
+    assert supprimer_accents("  Pomme de terre nouvelle ") == "POMME DE TERRE NOUVELLE"
+    assert supprimer_accents("Épinard") == "EPINARD"
+    assert supprimer_accents("") == supprimer_accents(None) == ""
+
+
+@pytest.mark.parametrize("nom, attendu", [
+    ("Tomate ronde France (le kg)", "Tomate"),
+    ("Pomme de terre de consommation", "Pomme de terre"),
+    ("haricot vert extra fin", "Haricots verts"),
+    ("Courge butternut", "Butternut"),
+    ("Potiron", "Potimarron"),
+    ("courge", "Butternut"),
+    ("Courge-spaghetti", "Courge-spaghetti"),
+    ("", ""),
+])
+def test_categorie(nom, attendu):
+    assert categorie(nom) == attendu
+
+
+def test_analyser_produit():
+    assert analyser_produit("Tomate ronde France (le kg)") == ("Tomate", "Tomate ronde", "kg")
+    assert analyser_produit("Laitue batavia France biologique (la pièce)") == ("Laitue", "Laitue batavia", "pièce")
+    assert analyser_produit("Carotte") == ("Carotte", "Carotte", None)
+
+
+def test_colonnes_avec_valeurs_manquantes():
+    produits = pd.Series(["Tomate ronde France (le kg)", None, "Tomate ronde France (le kg)", "Carotte (la botte)"], index=[10, 11, 12, 13])
+    table = decomposer_produits(produits)
+    assert list(table.index) == [10, 11, 12, 13]
+    assert list(table["Categorie"].fillna("-")) == ["Tomate", "-", "Tomate", "Carotte"]
+    assert list(table["Unite"].fillna("-")) == ["kg", "-", "kg", "botte"]
+
+    colonne = categories(pd.Series(["poireau", None, "Poireau"], name="Nom"))
+    assert list(colonne.fillna("-")) == ["Poireau", "-", "Poireau"] and colonne.name == "Nom"
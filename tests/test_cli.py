@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import pytest
+from ecoyield import cli
+from ecoyield.scenarios import InvestmentRule, Scenario, read_scenarios, run_scenarios
+
+
+def lignes_json(texte):
+    return [json.loads(ligne) for ligne in texte.splitlines()]
+
+#___________________________________
+# run_scenarios
+#___________________________________
+
+def test_results_keep_input_order_across_chunks_and_durations(coefs):
+    scenarios = [
+        Scenario("a", {"Tomate": 10}, 20, years=2),
+        Scenario("b", {"Inconnu": 1}, 20),
+        Scenario("c", {"Carotte": 5}, 20, years=5),
+        Scenario("d", {"Tomate": 30}, 20),
+        Scenario("e", {"Laitue": 4}, 20, years=2, investment=0.0),
+    ]
+    records = list(run_scenarios(scenarios, coefs, chunk_size=2))
+    assert [r["name"] for r in records] == ["a", "b", "c", "d", "e"]
+    assert records[1] == {"name": "b", "error": "légume(s) inconnu(s) : Inconnu"}
+    assert records[3]["error"] == "30 m² alloués pour 20 m² disponibles"
+    assert [r["years"] for r in records if "error" not in r] == [2, 5, 2]
+    # Sans investissement : règle de l'app (150 € + 50 € par tranche de 10 m²)
+    assert records[0]["investment"] == 250.0 and records[4]["investment"] == 0.0
+
+
+def test_investment_rule_loaded_only_when_needed(coefs):
+    def rule():
+        raise AssertionError("règle chargée alors que tous les plans donnent leur investissement")
+
+    record, = run_scenarios([Scenario("a", {"Tomate": 10}, 10, investment=100.0)], coefs, rule)
+    assert record["investment"] == 100.0
+
+    loaded = []
+    record, = run_scenarios([Scenario("b", {"Tomate": 10}, 10)], coefs, lambda: loaded.append(1) or InvestmentRule(100.0, 10.0))
+    assert loaded == [1] and record["investment"] == 110.0
+
+
+def test_unreadable_rows_are_reported(tmp_path):
+    path = tmp_path / "plans.jsonl"
+    path.write_text('{"name": "ok", "alloc": "Tomate=2"}\n\npas du json\n{"alloc": "Tomate"}\n', encoding="utf-8")
+    ok, invalid_json, invalid_alloc = read_scenarios(str(path))
+    assert ok.allocations == {"Tomate": 2.0} and ok.surface == 2.0 and ok.error is None
+    assert invalid_json.name == "plans.jsonl#3" and invalid_json.error.startswith("JSON invalide")
+    assert "allocation invalide" in invalid_alloc.error
+
+#___________________________________
+# LIGNE DE COMMANDE
+#___________________________________
+
+def test_simulate_json(projet, capsys):
+    assert cli.main(["simulate", "--alloc", "Tomate=10,Carotte=5", "--format", "json"]) == 0
+    record, = lignes_json(capsys.readouterr().out)
+    assert record["surface"] == 30 and record["allocated_m2"] == 15.0 and record["years"] == 3
+    assert record["investment"] == record["bank_value_by_year"][0] == -record["garden_net_by_year"][0]
+    assert len(record["garden_net_by_year"]) == 4
+    assert record["gap"] == pytest.approx(record["garden_net"] - record["bank_value"], abs=0.01)
+
+
+def test_simulate_table_matches_json(projet, capsys):
+    cli.main(["simulate", "--alloc", "Tomate=10", "--years", "2", "--format", "json"])
+    record, = lignes_json(capsys.readouterr().out)
+    cli.main(["simulate", "--alloc", "Tomate=10", "--years", "2"])
+    lignes = capsys.readouterr().out.splitlines()
+    assert lignes[-2].split() == ["2", f"{record['garden_net']:.0f}", f"{record['bank_value']:.0f}", f"{record['co2_kg']:.0f}"]
+
+
+def test_simulate_rejects_unknown_vegetable(projet):
+    with pytest.raises(SystemExit, match="légume\\(s\\) inconnu\\(s\\) : Cactus"):
+        cli.main(["simulate", "--alloc", "Cactus=3"])
+
+
+def test_batch_jsonl_and_csv_inputs(projet, capsys):
+    (projet / "a.jsonl").write_text('{"name": "petit", "alloc": {"Tomate": 5}}\n{"name": "trop", "alloc": "Tomate=50", "surface": 10}\n', encoding="utf-8")
+    (projet / "b.csv").write_text("name,years,Tomate,Carotte\nmixte,5,4,6\n", encoding="utf-8")
+    assert cli.main(["batch", "a.jsonl", "b.csv", "--rate", "2.5"]) == 1
+    sortie = capsys.readouterr()
+    records = lignes_json(sortie.out)
+    assert [r["name"] for r in records] == ["petit", "trop", "mixte"]
+    assert records[0]["surface"] == 5.0 and records[0]["bank_rate"] == 2.5
+    assert records[1]["error"] == "50 m² alloués pour 10 m² disponibles"
+    assert records[2]["years"] == 5 and records[2]["allocated_m2"] == 10.0
+    assert "1 scénario(s) en erreur" in sortie.err
+
+
+def test_batch_csv_output(projet, capsys):
+    (projet / "a.jsonl").write_text('{"name": "p", "alloc": "Tomate=5"}\n{"name": "x", "alloc": "Cactus=1"}\n', encoding="utf-8")
+    cli.main(["batch", "a.jsonl", "--format", "csv", "--output", "rapport.csv"])
+    with open(projet / "rapport.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == list(cli.CSV_FIELDS)
+    assert rows[0]["name"] == "p" and rows[0]["error"] == "" and float(rows[0]["garden_net"]) > -1000
+    assert rows[1]["name"] == "x" and rows[1]["garden_net"] == "" and "Cactus" in rows[1]["error"]
+
+
+def test_batch_series_requires_jsonl(projet):
+    with pytest.raises(SystemExit):
+        cli.main(["batch", "a.jsonl", "--format", "csv", "--series"])
+
+
+def test_batch_reads_stdin(projet, capsys, monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"alloc": "Tomate=1"}\n'))
+    assert cli.main(["batch", "-", "--series"]) == 0
+    record, = lignes_json(capsys.readouterr().out)
+    assert record["name"] == "stdin#1" and len(record["co2_by_year"]) == 4
@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from ecoyield.collecte import Collector, HostPolicy, collect
+
+#___________________________________
+# SERVEUR HTTP LOCAL
+#___________________________________
+
+class Site:
+    """État du faux site : requêtes reçues, requêtes simultanées, réponses programmées."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.hits = Counter()
+        self.arrivals = []
+        self.requests = []          # (chemin, en-têtes)
+        self.failures = {}          # chemin -> [statuts à renvoyer avant un 200]
+        self.etags = {}             # chemin -> ETag courant de la page
+        self.sizes = {}             # chemin -> taille du corps (octets)
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        site = self.server.site
+        with site.lock:
+            site.active += 1
+            site.max_active = max(site.max_active, site.active)
+            site.hits[self.path] += 1
+            site.arrivals.append(time.monotonic())
+            site.requests.append((self.path, dict(self.headers)))
+            failures = site.failures.get(self.path)
+            status = failures.pop(0) if failures else 200
+        try:
+            time.sleep(0.02)
+            if status != 200:
+                self.send_response(status)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = site.etags.get(self.path)
+            if etag is not None and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            body = self.path.encode().ljust(site.sizes.get(self.path, 0), b".")
+            self.send_response(200)
+            if etag is not None:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with site.lock:
+                site.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.site = Site()
+    server.site.base = f"http://127.0.0.1:{server.server_port}"
+    server.site.host = f"127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield server.site
+    server.shutdown()
+    server.server_close()
+
+
+def options(site, cache_path=None, **policy):
+    policy = {"rate": 1000, "burst": 1000, **policy}
+    return dict(policies={site.host: HostPolicy(**policy)}, cache_path=cache_path, backoff=0.01)
+
+
+async def get_all(collector, urls):
+    responses = await asyncio.gather(*(collector.get(url) for url in urls))
+    return [r.text for r in responses]
+
+#___________________________________
+# LIMITES PAR HÔTE
+#___________________________________
+
+def test_results_keep_request_order_under_concurrency_limit(site):
+    urls = [f"{site.base}/page/{i}" for i in range(12)]
+    bodies = collect(get_all, urls, **options(site, concurrency=3))
+    assert bodies == [f"/page/{i}" for i in range(12)]
+    # Plusieurs requêtes en parallèle, jamais plus que la limite de l'hôte
+    assert 1 < site.max_active <= 3
+
+
+def test_rate_limit_spaces_requests(site):
+    urls = [f"{site.base}/page/{i}" for i in range(6)]
+    start = time.monotonic()
+    collect(get_all, urls, **options(site, concurrency=6, rate=20, burst=1))
+    # Un jeton en réserve, puis 20 par seconde : 5 attentes de 50 ms au moins
+    assert time.monotonic() - start >= 5 / 20 * 0.9
+    gaps = [b - a for a, b in zip(site.arrivals, site.arrivals[1:])]
+    assert min(gaps) >= 1 / 20 * 0.8
+
+#___________________________________
+# NOUVEAUX ESSAIS
+#___________________________________
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_transient_errors_are_retried(site, status):
+    site.failures["/flaky"] = [status, status]
+    response = collect(lambda c: c.get(f"{site.base}/flaky"), **options(site))
+    assert response.status_code == 200 and response.text == "/flaky"
+    assert site.hits["/flaky"] == 3
+
+
+def test_gives_up_after_retries(site):
+    site.failures["/down"] = [503] * 10
+    response = collect(lambda c: c.get(f"{site.base}/down"), retries=2, **options(site))
+    assert response.status_code == 503
+    assert site.hits["/down"] == 3
+
+
+def test_client_errors_are_not_retried(site):
+    site.failures["/missing"] = [404]
+    response = collect(lambda c: c.get(f"{site.base}/missing"), **options(site))
+    assert response.status_code == 404 and site.hits["/missing"] == 1
+
+
+def test_backoff_doubles_without_retry_after():
+    collector = Collector(cache_path=None, backoff=0.5)
+    try:
+        assert [collector._delay(None, attempt) for attempt in range(3)] == [0.5, 1.0, 2.0]
+    finally:
+        collector.close()
+
+
+def test_hosts_have_separate_limits(site):
+    """Un hôte lent ne retient pas les autres : chaque hôte a son créneau et son seau."""
+    other = site.base.replace("127.0.0.1", "localhost")
+    policies = {site.host: HostPolicy(concurrency=1, rate=5, burst=1), other.split("//")[1]: HostPolicy(concurrency=4, rate=1000, burst=1000)}
+    start = time.monotonic()
+    urls = [f"{site.base}/lent/{i}" for i in range(3)] + [f"{other}/rapide/{i}" for i in range(4)]
+    bodies = collect(get_all, urls, policies=policies, cache_path=None)
+    assert bodies == [f"/lent/{i}" for i in range(3)] + [f"/rapide/{i}" for i in range(4)]
+    # Bornée par l'hôte lent (2 attentes de 200 ms), pas par la somme des requêtes
+    assert time.monotonic() - start < 1.0
+
+#___________________________________
+# CACHE HTTP (ETAG, 304, LRU)
+#___________________________________
+
+def fetch(site, path, cache_path, **policy):
+    response = collect(lambda c: c.get(f"{site.base}{path}"), **options(site, cache_path=str(cache_path), **policy))
+    return response.from_cache, response.text
+
+
+def test_revalidation_sends_if_none_match_and_reuses_body(site, tmp_path):
+    site.etags["/page"] = '"v1"'
+    cache = tmp_path / "cache.sqlite"
+    assert fetch(site, "/page", cache, ttl=0) == (False, "/page")
+    assert "If-None-Match" not in site.requests[-1][1]
+
+    assert fetch(site, "/page", cache, ttl=0) == (True, "/page")
+    assert site.requests[-1][1]["If-None-Match"] == '"v1"'
+    assert site.hits["/page"] == 2
+
+    # Page modifiée : nouvel ETag, le corps est retéléchargé
+    site.etags["/page"] = '"v2"'
+    assert fetch(site, "/page", cache, ttl=0) == (False, "/page")
+
+
+def test_fresh_entry_is_served_without_request(site, tmp_path):
+    site.etags["/page"] = '"v1"'
+    cache = tmp_path / "cache.sqlite"
+    fetch(site, "/page", cache, ttl=3600)
+    assert fetch(site, "/page", cache, ttl=3600) == (True, "/page")
+    assert site.hits["/page"] == 1
+
+
+def test_unchanged_page_is_not_parsed_again(site, tmp_path):
+    site.etags["/page"] = '"v1"'
+    calls = []
+
+    def parser(response):
+        calls.append(response.text)
+        return response.text.upper()
+
+    for _ in range(2):
+        value = collect(lambda c: c.parse(f"{site.base}/page", parser), **options(site, cache_path=str(tmp_path / "cache.sqlite"), ttl=0))
+        assert value == "/PAGE"
+    assert calls == ["/page"] and site.hits["/page"] == 2
+
+
+def test_cache_evicts_least_recently_used_past_size_cap(site, tmp_path):
+    for path in ("/a", "/b", "/c"):
+        site.sizes[path] = 1000
+    cache = str(tmp_path / "cache.sqlite")
+
+    async def scenario(collector):
+        for path in ("/a", "/b", "/a", "/c"):     # /a relue : /b devient la plus ancienne
+            await collector.get(f"{site.base}{path}")
+        return dict(collector.cache.stats[site.host])
+
+    stats = collect(scenario, cache_max_bytes=2500, **options(site, cache_path=cache, ttl=3600))
+    assert stats == {"miss": 3, "hit": 1, "evicted": 1}
+
+    # /a et /c restent servies par le cache, /b est retéléchargée
+    assert fetch(site, "/a", tmp_path / "cache.sqlite", ttl=3600)[0]
+    assert fetch(site, "/c", tmp_path / "cache.sqlite", ttl=3600)[0]
+    assert not fetch(site, "/b", tmp_path / "cache.sqlite", ttl=3600)[0]
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from ecoyield.epargne import RateHistory, simulate_savings, start_choices
+
+
+@pytest.fixture
+def history():
+    """2020 à 1 %, 2021 à 3 % (Livret A) ; LDDS et LEP fixes ; inflation nulle."""
+    livret_a = np.repeat([1.0, 3.0], 12)
+    rates = np.column_stack((livret_a, np.full(24, 0.5), np.full(24, 2.0)))
+    return RateHistory(np.datetime64("2020-01", "M"), ("Livret_A", "LDDS", "LEP"), rates, np.zeros(24), None)
+
+
+def test_start_inside_history_uses_historical_rates(history):
+    result = simulate_savings(1000.0, 12, history, start="2020-07")
+    np.testing.assert_array_equal(result.rates[0, 0], [1.0] * 6 + [3.0] * 6)
+    np.testing.assert_array_equal(result.rates[0, 1], [0.5] * 12)
+
+
+def test_historical_year_follows_fortnight_rule(history):
+    result = simulate_savings(1000.0, 12, history, start="2020-01")
+    # Dépôt le 1er janvier : 23 quinzaines productives à 1 %, capitalisées au 31 décembre
+    assert result.nominal[0, 0, -1] == pytest.approx(1000 * (1 + 0.01 * 23 / 24))
+    assert result.nominal[0, 0, 0] == 1000.0
+
+
+def test_history_then_forecast(history):
+    """Un placement commencé dans l'historique continue avec le dernier taux, décalé par scénario."""
+    result = simulate_savings(1000.0, 24, history, start="2021-01", shifts=(0.0, 1.0))
+    np.testing.assert_array_equal(result.rates[0, 0], [3.0] * 24)
+    np.testing.assert_array_equal(result.rates[1, 0], [3.0] * 12 + [4.0] * 12)
+
+
+def test_default_start_follows_last_known_rate(history):
+    choices = start_choices(history)
+    default = next(iter(choices.values()))
+    assert default == np.datetime64("2022-01", "M")
+    assert choices["Janvier 2020"] == np.datetime64("2020-01", "M")
+    result = simulate_savings(1000.0, 6, history, start=default)
+    np.testing.assert_array_equal(result.rates[0, 0], [3.0] * 6)
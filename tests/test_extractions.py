@@ -0,0 +1,38 @@
+import os
+import pandas as pd
+from FIXE_prix_legumes_historique import lire_extraction, lire_extractions
+
+EXTRACTIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "extractions")
+
+EXPORT = (
+    "moyenne en € TTC\tJanv.\n2024\tFévr.\n2024\n"
+    "AIL blanc sec France biologique (le kg)\t14.39\t14.44\n"
+    "TOMATE ronde France biologique (le kg)\t \t4,10\t\xa03.90\tn.d.\n"
+    "Pomme de terre France biologique (le kg)\t1.20\n"
+    "TOMATE ronde France biologique (le kg)\t5.00\n"
+)
+
+
+def test_lecture_en_flux(tmp_path):
+    path = tmp_path / "2024.txt"
+    path.write_text(EXPORT, encoding="utf-8")
+    annee, produits, codes, mois, prix = lire_extraction(str(path))
+    assert annee == 2024
+    # Produits hors liste écartés ; un libellé répété garde son code
+    assert produits == ["TOMATE ronde France biologique (le kg)", "Pomme de terre France biologique (le kg)"]
+    assert list(codes) == [0, 0, 1, 0]
+    # Cases vides et non numériques ignorées, virgule décimale et espace insécable acceptés
+    assert list(mois) == [2, 3, 1, 1]
+    assert list(prix) == [4.10, 3.90, 1.20, 5.00]
+
+
+def test_parallele_identique_au_serie():
+    serie = lire_extractions(EXTRACTIONS, workers=1)
+    parallele = lire_extractions(EXTRACTIONS, workers=2)
+    pd.testing.assert_frame_equal(serie, parallele)
+    assert serie["Date"].dt.year.unique().tolist() == [2022, 2023, 2024, 2025]
+
+
+def test_dossier_vide(tmp_path):
+    df = lire_extractions(str(tmp_path))
+    assert df.empty and list(df.columns) == ["Date", "Produit", "Prix"]
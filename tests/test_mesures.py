@@ -0,0 +1,107 @@
+import io
+import json
+import socket
+import pytest
+import requests
+from ecoyield.mesures import LOG_EVENT, Metrics, serve
+
+
+@pytest.fixture
+def metrics():
+    return Metrics(stream=io.StringIO())
+
+
+def logs(metrics):
+    return [json.loads(line) for line in metrics.stream.getvalue().splitlines()]
+
+
+def test_timer_outside_run_records_nothing(metrics):
+    with metrics.timer("view"):
+        pass
+    assert metrics.current() is None
+    assert metrics.snapshot()["stages"] == {} and logs(metrics) == []
+
+
+def test_run_logs_one_line_with_its_stages(metrics):
+    metrics.register("cache", lambda: {"hit": 2, "miss": 1})
+    session_state = {}
+    with metrics.run("app", session_state) as record:
+        with metrics.timer("view"):
+            pass
+        with metrics.timer("view"):
+            pass
+        assert metrics.current() is record
+
+    line, = logs(metrics)
+    assert line["event"] == LOG_EVENT and line["scope"] == "app"
+    assert line["session"] == session_state["metrics_session"] and line["rerun"] == 1
+    assert list(line["stages_ms"]) == ["view"] and line["total_ms"] >= line["stages_ms"]["view"]
+    assert line["sources"] == {"cache": {"hit": 2, "miss": 1}}
+    assert metrics.snapshot()["stages"]["view"]["count"] == 2
+
+
+def test_nested_run_is_a_stage_of_the_outer_run(metrics):
+    """Un fragment exécuté pendant le rerun complet n'écrit pas sa propre ligne."""
+    with metrics.run("app", {}):
+        with metrics.run("simulator", {}):
+            with metrics.timer("inputs"):
+                pass
+    line, = logs(metrics)
+    assert set(line["stages_ms"]) == {"simulator", "inputs"}
+    assert metrics.snapshot()["reruns"] == {"app": 1}
+
+
+def test_reruns_counted_per_session_and_scope(metrics):
+    first, second = {}, {}
+    for state, scope in ((first, "app"), (first, "simulator"), (first, "simulator"), (second, "app")):
+        with metrics.run(scope, state):
+            pass
+    assert first["metrics_reruns"] == {"app": 1, "simulator": 2}
+    assert [line["rerun"] for line in logs(metrics)] == [1, 1, 2, 1]
+    snap = metrics.snapshot()
+    assert snap["sessions"] == 2 and snap["reruns"] == {"app": 2, "simulator": 2}
+    assert snap["stages"]["run:simulator"]["count"] == 2
+
+
+def test_disabled_run_measures_nothing(metrics):
+    with metrics.run("app", {}, enabled=False) as record:
+        assert record is None
+        with metrics.timer("view"):
+            pass
+    assert logs(metrics) == [] and metrics.snapshot()["stages"] == {}
+
+
+def test_broken_source_does_not_break_export(metrics):
+    metrics.register("cache", lambda: {"hit": 3, "ok": True, "label": "x"})
+    metrics.register("broken", lambda: 1 / 0)
+    assert "ZeroDivisionError" in metrics.snapshot()["sources"]["broken"]["error"]
+    with metrics.run("app", {}):
+        with metrics.timer("view"):
+            pass
+    text = metrics.prometheus()
+    assert 'ecoyield_stage_calls_total{stage="view"} 1' in text
+    assert 'ecoyield_reruns_total{scope="app"} 1' in text
+    assert "ecoyield_sessions 1" in text
+    # Seules les valeurs numériques (hors booléens) deviennent des séries
+    assert 'ecoyield_source{source="cache",name="hit"} 3' in text
+    assert 'name="ok"' not in text and 'name="label"' not in text and "broken" not in text
+
+
+def test_serve_exposes_metrics_on_localhost(metrics, monkeypatch):
+    monkeypatch.delenv("ECOYIELD_METRICS_PORT", raising=False)
+    monkeypatch.delenv("ECOYIELD_METRICS_HOST", raising=False)
+    assert serve(metrics) is None
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = serve(metrics, port=port)
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+        base = f"http://127.0.0.1:{port}"
+        assert requests.get(f"{base}/metrics", timeout=5).text == metrics.prometheus()
+        assert requests.get(f"{base}/metrics.json", timeout=5).json()["reruns"] == {}
+        assert requests.get(f"{base}/autre", timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
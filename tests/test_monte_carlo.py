@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from ecoyield.monte_carlo import RiskModel, run_monte_carlo
+
+SURFACES = (10.0, 5.0, 3.0, 2.0)
+
+
+@pytest.fixture
+def model(coefs):
+    """Chocs de prix à 10 % d'écart-type, corrélés à 0,5 ; inflation et taux indépendants."""
+    n = len(coefs.names)
+    cov = np.full((n, n), 0.005) + np.eye(n) * 0.005
+    cov = np.block([[cov, np.zeros((n, 2))], [np.zeros((2, n)), np.diag([1.0, 0.25])]])
+    return RiskModel(coefs.names, np.zeros(n), 2.0, cov)
+
+
+def run(coefs, model, **options):
+    return run_monte_carlo(SURFACES, coefs, model, 5, 200.0, 1.7, **options)
+
+
+def test_same_seed_same_result(coefs, model):
+    first, second = run(coefs, model, n_paths=2000, seed=7), run(coefs, model, n_paths=2000, seed=7)
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+    other = run(coefs, model, n_paths=2000, seed=8)
+    assert not np.array_equal(first.garden_net, other.garden_net)
+
+
+def test_bands_start_from_investment(coefs, model):
+    result = run(coefs, model, n_paths=2000, seed=0)
+    np.testing.assert_array_equal(result.years, np.arange(6))
+    assert result.garden_net.shape == result.bank_value.shape == (3, 6)
+    np.testing.assert_allclose(result.garden_net[:, 0], -200.0)
+    np.testing.assert_allclose(result.bank_value[:, 0], 200.0)
+    # Bandes ordonnées P5 ≤ P50 ≤ P95
+    assert (np.diff(result.garden_net, axis=0) >= 0).all()
+    assert (np.diff(result.bank_value, axis=0) >= 0).all()
+
+
+def test_workers_reproducible_and_same_distribution(coefs, model):
+    parallel = run(coefs, model, n_paths=40_000, seed=3, workers=2)
+    again = run(coefs, model, n_paths=40_000, seed=3, workers=2)
+    np.testing.assert_array_equal(parallel.garden_net, again.garden_net)
+
+    # Autres tirages, même loi : les bandes et la probabilité restent proches
+    serial = run(coefs, model, n_paths=40_000, seed=3, workers=1)
+    assert not np.array_equal(parallel.garden_net, serial.garden_net)
+    spread = serial.garden_net[2] - serial.garden_net[0]
+    np.testing.assert_allclose(parallel.garden_net, serial.garden_net, atol=0.02 * spread.max())
+    np.testing.assert_allclose(parallel.bank_value, serial.bank_value, rtol=0.005)
+    np.testing.assert_allclose(parallel.beat_probability, serial.beat_probability, atol=0.01)
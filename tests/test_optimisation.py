@@ -0,0 +1,42 @@
+import itertools
+import numpy as np
+import pytest
+from ecoyield.optimisation import objective_scores, optimize_allocation
+
+
+def brute_force(scores, total, lower, upper):
+    """Meilleur score parmi toutes les allocations entières admissibles."""
+    best = -np.inf
+    for plan in itertools.product(*(range(int(lo), int(hi) + 1) for lo, hi in zip(lower, upper))):
+        if sum(plan) <= total:
+            best = max(best, float(scores @ np.array(plan, dtype=float)))
+    return best
+
+
+@pytest.mark.parametrize("objective", ["profit", "co2", "mix"])
+@pytest.mark.parametrize("total, minimums, caps", [
+    (6, None, [3, 3, 3, 3]),
+    (7, [0, 2, 0, 1], [2, 4, 3, 2]),
+    (4, [1, 0, 1, 0], [1, 1, 5, 5]),
+])
+def test_optimize_matches_brute_force(coefs, objective, total, minimums, caps):
+    scores = objective_scores(coefs, objective)
+    lower = np.zeros(len(coefs.names)) if minimums is None else np.array(minimums, dtype=float)
+    surfaces = optimize_allocation(coefs, total, objective, minimums=minimums, caps=caps)
+
+    assert surfaces.sum() <= total
+    assert np.all(surfaces >= lower) and np.all(surfaces <= np.array(caps))
+    assert np.allclose(surfaces, np.round(surfaces))
+    assert scores @ surfaces == pytest.approx(brute_force(scores, total, lower, caps))
+
+
+def test_small_cap_keeps_one_square_metre(coefs):
+    """Un plafond positif inférieur à 1 m² (laitue pour 2 personnes) garde 1 m² en mode entier."""
+    caps = [0.17, 0.17, 0.17, 0.17]
+    surfaces = optimize_allocation(coefs, 30, "co2", caps=caps)
+    np.testing.assert_array_equal(surfaces, [1, 1, 1, 1])
+
+
+def test_minimums_above_total_raise(coefs):
+    with pytest.raises(ValueError):
+        optimize_allocation(coefs, 3, minimums=[2, 2, 0, 0])
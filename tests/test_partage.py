@@ -0,0 +1,85 @@
+import os
+import pytest
+from ecoyield import chemins, partage, stockage
+
+
+def prix_2009():
+    df = stockage.read_frame("Prix_eau")
+    return float(df.loc[df["Annee"] == 2009, "Prix_m3"].iloc[0])
+
+
+def modifier_prix_eau(projet, valeur):
+    path = projet / "Prix_eau.csv"
+    lignes = path.read_text(encoding="utf-8").splitlines()
+    lignes[1] = f"2009;{valeur};1.81"
+    path.write_text("\n".join(lignes) + "\n", encoding="utf-8")
+
+
+def test_publish_contains_every_table(projet):
+    version = partage.publish()
+    assert partage.current_version() == version
+    with chemins.reading_from(partage.version_path(version)):
+        assert stockage.convert_all() == []
+        for name in stockage.TABLES:
+            assert stockage.read_table(name).num_rows > 0, name
+
+
+def test_published_version_is_immutable(projet):
+    """Modifier un export après publication ne touche pas la version servie."""
+    old = partage.publish()
+    modifier_prix_eau(projet, 123.45)
+    assert prix_2009() == pytest.approx(123.45)
+
+    with chemins.reading_from(partage.version_path(old)):
+        assert prix_2009() == pytest.approx(3.62)
+
+    new = partage.publish()
+    assert new != old
+    with chemins.reading_from(partage.version_path(new)):
+        assert prix_2009() == pytest.approx(123.45)
+    assert partage.publish() == new     # rien de changé : pas de nouvelle version
+
+
+def test_data_plane_swaps_on_publish(projet):
+    plane = partage.DataPlane()
+    partage.publish()
+    before = plane.current()
+    assert before.get("prix", prix_2009) == pytest.approx(3.62)
+
+    modifier_prix_eau(projet, 123.45)
+    partage.publish()
+    after = plane.current()
+    assert after is not before and plane.swaps == 2
+    assert after.get("prix", prix_2009) == pytest.approx(123.45)
+    # Une session qui tient encore l'ancienne version continue de la lire
+    assert before.get("prix", prix_2009) == pytest.approx(3.62)
+
+
+def test_interrupted_publish_keeps_current_version(projet, monkeypatch):
+    """Une publication interrompue pendant la copie laisse CURRENT sur la version précédente."""
+    old = partage.publish()
+    modifier_prix_eau(projet, 123.45)
+
+    def coupure(*args):
+        raise RuntimeError("coupure pendant la publication")
+
+    with monkeypatch.context() as m:
+        m.setattr(partage.os, "link", coupure)
+        with pytest.raises(RuntimeError):
+            partage.publish()
+
+    assert partage.current_version() == old
+    versions = os.listdir(os.path.join(chemins.DATA_DIR, partage.VERSIONS_DIR))
+    assert sorted(v for v in versions if not v.endswith(".tmp")) == [old]
+
+    # La publication suivante reprend de zéro et remplace le dossier temporaire abandonné
+    new = partage.publish()
+    assert partage.current_version() == new
+    assert not any(v.endswith(".tmp") for v in os.listdir(os.path.join(chemins.DATA_DIR, partage.VERSIONS_DIR)))
+
+
+def test_missing_table_blocks_publish(projet):
+    os.remove(projet / "Prix_eau.csv")
+    with pytest.raises(FileNotFoundError, match="Prix_eau"):
+        partage.publish()
+    assert partage.current_version() is None
@@ -0,0 +1,70 @@
+import textwrap
+import pytest
+from ecoyield.pipeline import Stage, needs_run, load_state, run_pipeline
+
+# Deux étapes écrites dans le dossier de test : une source fixe et un calcul dérivé
+MODULE = textwrap.dedent("""
+    def creer():
+        with open("source.csv", "w", encoding="utf-8") as f:
+            f.write("x\\n1\\n2\\n")
+
+    def doubler():
+        with open("source.csv", encoding="utf-8") as f:
+            valeurs = [int(v) for v in f.read().split()[1:]]
+        with open("double.csv", "w", encoding="utf-8") as f:
+            f.write("x\\n" + "".join(f"{2 * v}\\n" for v in valeurs))
+""")
+
+STAGES = (
+    Stage("source", "fixe", "etapes_test:creer", (), ("source.csv",)),
+    Stage("double", "derive", "etapes_test:doubler", ("source.csv",), ("double.csv",)),
+)
+
+
+@pytest.fixture
+def dossier(tmp_path, monkeypatch):
+    (tmp_path / "etapes_test.py").write_text(MODULE, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def run(**options):
+    return sorted(run_pipeline(stages=STAGES, state_path=".pipeline_state.json", publish=False, **options))
+
+
+def test_second_run_skips_everything(dossier):
+    assert run() == ["double", "source"]
+    assert run() == []
+    assert (dossier / "double.csv").read_text() == "x\n2\n4\n"
+
+
+def test_csv_edit_reruns_only_dependents(dossier):
+    run()
+    (dossier / "source.csv").write_text("x\n5\n", encoding="utf-8")
+    # La source « fixe » n'est pas relancée : son export modifié est repris tel quel
+    assert run() == ["double"]
+    assert (dossier / "double.csv").read_text() == "x\n10\n"
+    assert run() == []
+
+
+def test_output_edited_by_hand_is_rebuilt(dossier):
+    run()
+    (dossier / "double.csv").write_text("x\n0\n", encoding="utf-8")
+    assert needs_run(STAGES[1], load_state(".pipeline_state.json")) == "sorties modifiées"
+    assert run() == ["double"]
+    assert (dossier / "double.csv").read_text() == "x\n2\n4\n"
+
+
+def test_missing_output_and_force(dossier):
+    run()
+    (dossier / "source.csv").unlink()
+    # La source est recréée à l'identique : l'empreinte de contenu épargne l'étape dérivée
+    assert run() == ["source"]
+    assert run(force=("double",)) == ["double"]
+
+
+def test_dry_run_changes_nothing(dossier):
+    assert run(dry_run=True) == []
+    assert not (dossier / "source.csv").exists()
+    assert not (dossier / ".pipeline_state.json").exists()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ecoyield.prix import price_index_from_frame
+
+
+@pytest.fixture
+def index():
+    """Tomate relevée en janvier (deux relevés) et avril ; Carotte seulement en février."""
+    df = pd.DataFrame({
+        "Date": pd.to_datetime(["2024-01-05", "2024-01-20", "2024-04-01", "2024-02-10"]),
+        "Categorie": ["Tomate", "Tomate", "Tomate", "Carotte"],
+        "Prix": [2.0, 4.0, 6.0, 1.5],
+    })
+    return price_index_from_frame(df)
+
+
+def test_grille_dense_interpolee(index):
+    assert index.categories == ("Carotte", "Tomate") and len(index) == 4
+    assert index.end == np.datetime64("2024-04")
+    # Moyenne des relevés de janvier, puis interpolation linéaire jusqu'en avril
+    np.testing.assert_allclose(index.prices[:, 1], [3.0, 4.0, 5.0, 6.0])
+    # Un seul relevé : prolongé avant et après
+    np.testing.assert_allclose(index.prices[:, 0], 1.5)
+    assert not index.prices.flags.writeable
+
+
+def test_recherche(index):
+    assert index.price("Tomate", np.datetime64("2024-03")) == 5.0
+    # Hors plage : mois couvert le plus proche
+    assert index.price("Tomate", "2023-06") == 3.0
+    assert index.price("Tomate", "2030-01") == 6.0
+    np.testing.assert_allclose(index.lookup(["Tomate", "Carotte"], ["2024-02", "2024-04"]), [[4.0, 1.5], [6.0, 1.5]])
+    with pytest.raises(KeyError):
+        index.price("Cactus", "2024-01")
+
+
+def test_between_sans_copie(index):
+    months, prices = index.between("2024-02", "2024-03")
+    assert list(months.astype(str)) == ["2024-02", "2024-03"]
+    assert np.shares_memory(prices, index.prices)
+    _, tomates = index.between("2024-02", "2024-03", ["Tomate"])
+    np.testing.assert_allclose(tomates[:, 0], [4.0, 5.0])
+
+
+def test_profil_saisonnier(index):
+    profile = index.seasonal_profile(["Tomate"])
+    assert profile.shape == (12, 1)
+    np.testing.assert_allclose(profile[:4, 0], [3.0, 4.0, 5.0, 6.0])
+    assert np.isnan(profile[4:]).all()
+    np.testing.assert_allclose(index.seasonal_factors(["Tomate"])[:4, 0], [2 / 3, 8 / 9, 10 / 9, 4 / 3])
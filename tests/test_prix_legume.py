@@ -0,0 +1,48 @@
+import threading
+import pytest
+import AUTO_prix_legume
+from AUTO_prix_legume import DriverPool, scan_recent_selenium
+
+
+def sans_chrome(self):
+    raise OSError("chrome introuvable")
+
+
+def test_failed_creation_releases_its_slot(monkeypatch):
+    monkeypatch.setattr(DriverPool, "_creer", sans_chrome)
+    pool = DriverPool(size=1, attente=1)
+    for _ in range(3):
+        with pytest.raises(OSError):
+            with pool.driver():
+                pass
+    assert pool.created == 0
+
+
+def test_selenium_fallback_without_chrome_fails_fast(monkeypatch):
+    """Sans Chrome (ni selenium), le repli lève une erreur au lieu de bloquer les tâches suivantes."""
+    monkeypatch.setattr(DriverPool, "_creer", sans_chrome)
+
+    def lire_page(pool, url, nom=None):
+        with pool.driver():
+            return []
+
+    monkeypatch.setattr(AUTO_prix_legume, "lire_page_selenium", lire_page)
+    liens = [(f"Légume {i}", f"http://127.0.0.1/{i}") for i in range(5)]
+    erreurs = []
+
+    def lancer():
+        try:
+            scan_recent_selenium(liens)
+        except Exception as e:
+            erreurs.append(e)
+
+    thread = threading.Thread(target=lancer, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive() and len(erreurs) == 1
+
+
+def test_scan_recent_survives_missing_chrome(monkeypatch):
+    monkeypatch.setattr(DriverPool, "_creer", sans_chrome)
+    monkeypatch.setattr(AUTO_prix_legume, "collect", lambda *args, **kwargs: ([("Carotte", "http://127.0.0.1/carotte")], []))
+    assert AUTO_prix_legume.scan_recent().empty
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from ecoyield.simulation import allocation_matrix, plans_from_dicts, simulate, simulate_batch
+
+PLANS = [
+    {"Tomate": 10, "Carotte": 5},
+    {"Laitue": 2.5},
+    {"Tomate": 1, "Carotte": 1, "Laitue": 1, "Poireau": 1},
+    {},
+]
+
+
+@pytest.mark.parametrize("years", [1, 3, 10])
+def test_simulate_batch_matches_simulate(coefs, years):
+    """Chaque ligne du calcul par lots est identique à la simulation du plan seul."""
+    investments = np.array([300.0, 150.0, 0.0, 50.0])
+    rates = np.array([1.7, 3.0, 0.0, 2.4])
+    batch = simulate_batch(plans_from_dicts(PLANS, coefs.names), coefs, years, investments, rates)
+
+    for row, plan in enumerate(PLANS):
+        single = simulate(allocation_matrix(plan, coefs.names, years), coefs, investments[row], rates[row])
+        np.testing.assert_array_equal(batch.years, single.years)
+        for field in ("garden_net", "bank_value", "co2", "kilos", "annual_value"):
+            np.testing.assert_allclose(getattr(batch, field)[row], getattr(single, field), rtol=1e-12, atol=1e-9, err_msg=field)
+
+
+def test_simulate_batch_broadcasts_scalars(coefs):
+    """Un investissement et un taux scalaires s'appliquent à tous les plans."""
+    batch = simulate_batch(plans_from_dicts(PLANS, coefs.names), coefs, 5, 200.0, 1.7)
+    assert batch.garden_net.shape == (len(PLANS), 6)
+    np.testing.assert_allclose(batch.bank_value[:, -1], 200.0 * 1.017 ** 5)
@@ -0,0 +1,30 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+from ecoyield import stockage
+
+
+@pytest.fixture
+def dossier(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def prix_eau(*valeurs):
+    return pd.DataFrame({"Annee": range(2020, 2020 + len(valeurs)), "Prix_m3": valeurs, "Prix_m2": [v / 2 for v in valeurs]})
+
+
+def test_decimals_read_back_exactly_without_conversion(dossier):
+    stockage.write_table(prix_eau(2.03, 4.17, 3.62), "Prix_eau")
+    table = stockage.read_table("Prix_eau")
+    assert table.schema.field("Prix_m3").type == pa.float64()
+    assert stockage.read_frame("Prix_eau")["Prix_m3"].tolist() == [2.03, 4.17, 3.62]
+    # Colonne numérique sans valeur manquante : relue depuis le fichier mappé, sans copie
+    assert table.column("Prix_m3").chunk(0).to_numpy(zero_copy_only=True).tolist() == [2.03, 4.17, 3.62]
+
+
+def test_edited_csv_rebuilds_arrow(dossier):
+    stockage.write_table(prix_eau(2.03), "Prix_eau")
+    (dossier / "Prix_eau.csv").write_text("Annee;Prix_m3;Prix_m2\n2020;9.99;4.995\n", encoding="utf-8")
+    assert stockage.read_frame("Prix_eau")["Prix_m3"].tolist() == [9.99]
+    assert stockage._fresh_arrow("Prix_eau") is not None
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from ecoyield.unites import convertir_en_kg
+
+
+def test_conversion_par_categorie_puis_generique():
+    df = pd.DataFrame({
+        "Categorie": ["tomate", "Laitue", "Carotte", "Tomate", "Radis", "Poireau"],
+        "Unite": ["pièce", "pièce", "500 g", "barquette", "botte", "kg"],
+        "Prix": [0.3, 0.9, 1.0, 1.5, 1.2, 2.4],
+    })
+    converti = convertir_en_kg(df)
+    # La botte (poids inconnu) est écartée, le prix au kg est laissé tel quel
+    assert list(converti.index) == [0, 1, 2, 3, 5]
+    assert (converti["Unite"] == "kg").all()
+    np.testing.assert_allclose(converti["Prix"], [2.0, 2.0, 2.0, 6.0, 2.4])
+    # L'entrée n'est pas modifiée
+    assert df.loc[0, "Prix"] == 0.3 and df.loc[0, "Unite"] == "pièce"
+
+
+def test_unite_inconnue_conservee():
+    df = pd.DataFrame({"Categorie": ["Carotte", "Carotte"], "Unite": ["pièce", "colis 10 kg"], "Prix": [0.2, 9.0]})
+    converti = convertir_en_kg(df)
+    assert list(converti["Unite"]) == ["pièce", "colis 10 kg"]
+    assert list(converti["Prix"]) == [0.2, 9.0]
+
+
+def test_table_personnalisee():
+    table = pd.DataFrame([("*", "pièce", 200), ("Concombre", "pièce", 400)], columns=["Categorie", "Unite", "Poids_g"])
+    df = pd.DataFrame({"Categorie": ["Concombre", "Courgette"], "Unite": ["pièce", "pièce"], "Prix": [1.0, 1.0]})
+    np.testing.assert_allclose(convertir_en_kg(df, table)["Prix"], [2.5, 5.0])